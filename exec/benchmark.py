@@ -0,0 +1,398 @@
+import argparse
+import datetime
+import functools
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from tess.agent import Agent
+from tess.batch import MatchBatch
+from tess.match_outcome import MatchOutcome
+from tess.match_result import MatchResult
+from tess.rating_store import RatingStore
+from tess.team import Team
+from tess.tess_core import TESSCore
+
+# -----------------------------------------------------------------------------
+# Benchmark grid. Results are keyed by every field except the measurements, so
+# two result files can be compared entry by entry (see --compare).
+# -----------------------------------------------------------------------------
+TEAM_SIZES = [1, 2, 5, 16, 64]
+POPULATIONS = [1000, 100000, 1000000]
+FULL_POPULATIONS = [1000, 100000, 1000000, 10000000]
+BATCH_SIZES = [1, 64, 1024, 16384]
+
+# Team A outcome weights (WIN, DRAW, LOSS) of each outcome mix.
+OUTCOME_MIXES = {
+    "win_loss": [0.5, 0.0, 0.5], 
+    "with_draws": [0.4, 0.2, 0.4], 
+    "all_draws": [0.0, 1.0, 0.0]
+}
+
+# Fields holding measurements rather than benchmark parameters.
+MEASUREMENT_FIELDS = {"matches_per_s", "calls_per_s", "latency_us", "bytes_per_agent"}
+
+
+def environment(
+) -> dict:
+    """
+    Describes the machine and code version the benchmarks ran on.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], 
+            cwd=os.path.dirname(os.path.abspath(__file__)), 
+            capture_output=True, 
+            text=True, 
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit, 
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(), 
+        "python": platform.python_version(), 
+        "numpy": np.__version__, 
+        "platform": platform.platform(), 
+        "processor": platform.processor(), 
+        "cpu_count": os.cpu_count()
+    }
+
+
+def random_matches(
+        rng: random.Random, 
+        population: int, 
+        team_size: int, 
+        n_matches: int, 
+        outcome_mix: str
+) -> list:
+    """
+    Draws matches between random agent indices: (members A, members B, ranks A, ranks B, outcome).
+    """
+    outcomes = rng.choices(
+        [MatchOutcome.WIN, MatchOutcome.DRAW, MatchOutcome.LOSS], 
+        weights=OUTCOME_MIXES[outcome_mix], 
+        k=n_matches
+    )
+    matches = []
+    for outcome in outcomes:
+        players = rng.sample(range(population), 2 * team_size)
+        ranks_A = list(range(1, team_size + 1))
+        ranks_B = list(range(1, team_size + 1))
+        rng.shuffle(ranks_A)
+        rng.shuffle(ranks_B)
+        matches.append((players[:team_size], players[team_size:], ranks_A, ranks_B, outcome))
+
+    return matches
+
+
+def latency_summary(
+        latencies_ns: list
+) -> dict:
+    """
+    Returns the mean and percentiles of per-call latencies, in microseconds.
+    """
+    latencies = np.asarray(latencies_ns, dtype=np.float64) / 1000.0
+
+    return {
+        "mean": float(latencies.mean()), 
+        "p50": float(np.percentile(latencies, 50)), 
+        "p90": float(np.percentile(latencies, 90)), 
+        "p99": float(np.percentile(latencies, 99))
+    }
+
+
+def time_calls(
+        calls: list, 
+        repeats: int
+) -> tuple:
+    """
+    Times a list of zero-argument calls ``repeats`` times with the garbage collector off.
+
+    Returns:
+        tuple: Elapsed seconds and per-call latencies (ns) of the fastest repeat.
+    """
+    best = None
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            latencies = []
+            start = time.perf_counter()
+            for call in calls:
+                call_start = time.perf_counter_ns()
+                call()
+                latencies.append(time.perf_counter_ns() - call_start)
+            elapsed = time.perf_counter() - start
+
+            if best is None or elapsed < best[0]:
+                best = (elapsed, latencies)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return best
+
+
+def bench_update_game(
+        rng: random.Random, 
+        agents: list, 
+        team_size: int, 
+        outcome_mix: str, 
+        n_matches: int, 
+        repeats: int
+) -> dict:
+    """
+    Times TESSCore.update_game one match at a time over a population of Agent objects.
+    """
+    population = len(agents)
+    tess = TESSCore()
+    calls = []
+    for members_A, members_B, ranks_A, ranks_B, outcome in random_matches(rng, population, team_size, n_matches, outcome_mix):
+        team_A = Team([agents[i] for i in members_A])
+        team_B = Team([agents[i] for i in members_B])
+        match_res = MatchResult(
+            outcome, 
+            {agents[i].id: rank for i, rank in zip(members_A, ranks_A)}, 
+            {agents[i].id: rank for i, rank in zip(members_B, ranks_B)}
+        )
+        calls.append(functools.partial(tess.update_game, team_A, team_B, match_res))
+
+    elapsed, latencies = time_calls(calls, repeats)
+
+    return {"matches_per_s": n_matches / elapsed, "latency_us": latency_summary(latencies)}
+
+
+def bench_team_methods(
+        rng: random.Random, 
+        team_size: int, 
+        n_calls: int, 
+        repeats: int
+) -> list:
+    """
+    Times Team.update_ratings, Team._compute_indiv_expected_all and Team._computE_indiv_expected.
+    """
+    agents = [Agent(str(i), rng.gauss(1500, 200)) for i in range(team_size)]
+    team = Team(agents)
+    rankings = {agent.id: rank for rank, agent in enumerate(agents, start=1)}
+    results = []
+
+    benchmarks = [
+        ("Team.update_ratings", lambda: team.update_ratings(0.5, MatchOutcome.DRAW, rankings, 32, 0.5, 400)), 
+        ("Team._compute_indiv_expected_all", lambda: team._compute_indiv_expected_all(400)), 
+        ("Team._computE_indiv_expected", lambda: team._computE_indiv_expected(agents[0], 400))
+    ]
+    for name, call in benchmarks:
+        elapsed, latencies = time_calls([call] * n_calls, repeats)
+
+        results.append({
+            "benchmark": name, 
+            "team_size": team_size, 
+            "calls_per_s": n_calls / elapsed, 
+            "latency_us": latency_summary(latencies)
+        })
+
+    return results
+
+
+def bench_update_games_batch(
+        np_rng: np.random.Generator, 
+        store: RatingStore, 
+        team_size: int, 
+        batch_size: int, 
+        n_matches: int, 
+        repeats: int
+) -> dict:
+    """
+    Times TESSCore.update_games_batch on a RatingStore, ``batch_size`` matches per call.
+    """
+    population = len(store)
+    n_batches = max(n_matches // batch_size, 1)
+    batches = []
+    for _ in range(n_batches):
+        # Each match draws 2 * team_size distinct agents
+        players = np.array([np_rng.choice(population, 2 * team_size, replace=False) for _ in range(batch_size)])
+        ranks = np.argsort(np_rng.random((2 * batch_size, team_size)), axis=1) + 1
+        batches.append(MatchBatch(
+            members=players.ravel(), 
+            team_offsets=np.arange(0, 2 * team_size * batch_size + 1, team_size), 
+            ranks=ranks.ravel(), 
+            outcomes=np_rng.choice([1.0, 0.5, 0.0], batch_size)
+        ))
+
+    tess = TESSCore()
+    calls = [functools.partial(tess.update_games_batch, store.ratings, batch) for batch in batches]
+    elapsed, latencies = time_calls(calls, repeats)
+
+    return {"matches_per_s": n_batches * batch_size / elapsed, "latency_us": latency_summary(latencies)}
+
+
+def bench_memory(
+        population: int
+) -> list:
+    """
+    Measures the memory held per agent by Agent objects and by a RatingStore.
+    """
+    results = []
+
+    tracemalloc.start()
+    agents = [Agent(str(i)) for i in range(population)]
+    agent_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del agents
+
+    tracemalloc.start()
+    store = RatingStore(capacity=population)
+    for i in range(population):
+        store.add(str(i))
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+
+    results.append({"benchmark": "memory.Agent", "population": population, "bytes_per_agent": agent_bytes / population})
+    results.append({"benchmark": "memory.RatingStore", "population": population, "bytes_per_agent": store_bytes / population})
+
+    return results
+
+
+def run(
+        populations: list, 
+        n_matches: int, 
+        repeats: int = 3, 
+        seed: int = 0
+) -> list:
+    """
+    Runs the whole benchmark grid and returns one record per measurement.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    results = []
+
+    def report(record):
+        results.append(record)
+        print(json.dumps(record), file=sys.stderr)
+
+    # Step 1: Per-match update path across team sizes, populations and outcome mixes
+    for population in populations:
+        agents = [Agent(str(i)) for i in range(population)]
+        for team_size in TEAM_SIZES:
+            if 2 * team_size > population:
+                continue
+            for outcome_mix in OUTCOME_MIXES:
+                # Large teams cost more per match; keep each run to a similar duration
+                matches = max(n_matches // team_size, 50)
+                record = {"benchmark": "TESSCore.update_game", "population": population, "team_size": team_size, "outcomes": outcome_mix}
+                record.update(bench_update_game(rng, agents, team_size, outcome_mix, matches, repeats))
+                report(record)
+        del agents
+
+    # Step 2: Team methods in isolation
+    for team_size in TEAM_SIZES:
+        for record in bench_team_methods(rng, team_size, max(n_matches // team_size, 50), repeats):
+            report(record)
+
+    # Step 3: Batch path across batch sizes and populations
+    for population in populations:
+        store = RatingStore.from_arrays([str(i) for i in range(population)], np.full(population, 1500.0))
+        for batch_size in BATCH_SIZES:
+            record = {"benchmark": "TESSCore.update_games_batch", "population": population, "team_size": 5, "batch_size": batch_size}
+            record.update(bench_update_games_batch(np_rng, store, 5, batch_size, max(n_matches, batch_size), repeats))
+            report(record)
+        del store
+
+    # Step 4: Memory per agent
+    for population in populations:
+        for record in bench_memory(population):
+            report(record)
+
+    return results
+
+
+def result_key(
+        record: dict
+) -> tuple:
+    """
+    Returns the benchmark parameters identifying a record.
+    """
+    return tuple(sorted((field, value) for field, value in record.items() if field not in MEASUREMENT_FIELDS))
+
+
+def compare(
+        baseline: dict, 
+        current: dict, 
+        threshold: float = 0.1
+) -> int:
+    """
+    Prints the change of every throughput between two result files.
+
+    Returns:
+        int: Number of benchmarks whose throughput dropped by more than ``threshold``.
+    """
+    old = {result_key(record): record for record in baseline["results"]}
+    regressions = 0
+
+    for record in current["results"]:
+        before = old.get(result_key(record))
+        metric = "matches_per_s" if "matches_per_s" in record else "calls_per_s"
+        if before is None or metric not in record:
+            continue
+
+        ratio = record[metric] / before[metric]
+        flag = "REGRESSION" if ratio < 1 - threshold else ""
+        regressions += bool(flag)
+        label = ", ".join(f"{field}={value}" for field, value in result_key(record))
+        print(f"{ratio:6.2f}x  {label}  {flag}")
+
+    return regressions
+
+
+def main(
+) -> None:
+    """
+    Runs the benchmark suite and writes the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description="TESS benchmark suite")
+    parser.add_argument("--output", default="-", help="JSON result file ('-' for stdout)")
+    parser.add_argument("--matches", type=int, default=2000, help="matches timed per configuration")
+    parser.add_argument("--populations", type=int, nargs="+", default=None, help="agent populations to benchmark")
+    parser.add_argument("--full", action="store_true", help="include the 10M-agent population")
+    parser.add_argument("--repeats", type=int, default=3, help="timed repeats per configuration (the fastest is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated matches")
+    parser.add_argument("--compare", metavar="BASELINE", help="result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="throughput drop reported as a regression")
+    args = parser.parse_args()
+
+    populations = args.populations or (FULL_POPULATIONS if args.full else POPULATIONS)
+    output = {
+        "environment": environment(), 
+        "config": {"matches": args.matches, "populations": populations, "repeats": args.repeats, "seed": args.seed}, 
+        "results": run(populations, args.matches, args.repeats, args.seed)
+    }
+
+    text = json.dumps(output, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, output, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
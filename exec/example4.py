@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from tess.simulate import simulate_seeds
+from tess.tess_core import TESSCore
+
+
+def main(
+        n_agents: int = 100000, 
+        n_rounds: int = 200, 
+        team_size: int = 5, 
+        seeds: tuple = (0, 1, 2, 3)
+) -> None:
+    """
+    Simulates rating convergence over a large population and prints the convergence curve.
+
+    Unlike example2.py and example3.py, which apply one match at a time, every round
+    of this simulation (n_agents / (2 * team_size) agent-disjoint matches) is generated
+    and applied in a single vectorized pass, and independent seeds run in parallel.
+
+    Args:
+        n_agents (int): Population size (default is 100000).
+        n_rounds (int): Number of rounds per seed (default is 200).
+        team_size (int): Number of agents per team (default is 5).
+        seeds (tuple): Seeds of the independent runs (default is (0, 1, 2, 3)).
+    """
+    curves = simulate_seeds(
+        seeds, 
+        n_agents=n_agents, 
+        n_rounds=n_rounds, 
+        team_size=team_size, 
+        tess=TESSCore(K=32, alpha=0.5, scale=400), 
+        draw_prob=0.05, 
+        rank_noise=100.0, 
+        record_every=max(n_rounds // 20, 1)
+    )
+
+    # Print the mean Spearman correlation between ratings and true skills over time
+    print(f"{'matches':>12}  {'spearman':>8}  {'std':>6}")
+    for matches, mean, std in zip(curves["matches"], curves["mean"], curves["std"]):
+        print(f"{matches:>12}  {mean:>8.4f}  {std:>6.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from tess.agent import Agent
+from tess.concurrent import ConcurrentTESS
+from tess.match_outcome import MatchOutcome
+from tess.match_result import MatchResult
+from tess.team import Team
+from tess.tess_core import TESSCore
+
+
+def worker(
+        update_game, 
+        agents: list, 
+        n_matches: int, 
+        team_size: int, 
+        seed: int, 
+        errors: list
+) -> None:
+    """
+    Plays random matches between random teams drawn from the shared population.
+
+    Args:
+        update_game (Callable): The update to stress (ConcurrentTESS or plain TESSCore).
+        agents (list): The shared population.
+        n_matches (int): Number of matches to play.
+        team_size (int): Number of agents per team (at least 2, so every update is zero-sum).
+        seed (int): Seed of this worker's random generator.
+        errors (list): Collects the exceptions raised in the worker.
+    """
+    rng = random.Random(seed)
+    try:
+        for _ in range(n_matches):
+            players = rng.sample(agents, 2 * team_size)
+            team_A = Team(players[:team_size])
+            team_B = Team(players[team_size:])
+            match_res = MatchResult(
+                team_A_outcome=rng.choice(list(MatchOutcome)), 
+                rankings_A={agent.id: rank for rank, agent in enumerate(team_A.agents, 1)}, 
+                rankings_B={agent.id: rank for rank, agent in enumerate(team_B.agents, 1)}
+            )
+            update_game(team_A, team_B, match_res)
+    except Exception as e:
+        errors.append(e)
+
+
+def main(
+) -> None:
+    """
+    Stress-tests ConcurrentTESS: many threads update a small, heavily shared population.
+
+    Two properties are checked:
+        - the total rating is conserved (every update is zero-sum), which catches lost updates;
+        - replaying the matches sequentially, in the order the TESSCore listener saw them,
+          gives exactly the same ratings, which catches updates computed from an
+          inconsistent snapshot (the listener runs while the match's stripes are held,
+          so its order is a valid serial order).
+
+    Run with ``--unsafe`` to drive the plain TESSCore from the same threads instead.
+    """
+    parser = argparse.ArgumentParser(description="Stress test of concurrent TESS updates.")
+    parser.add_argument("--threads", type=int, default=8, help="Number of worker threads.")
+    parser.add_argument("--matches", type=int, default=5000, help="Matches per thread.")
+    parser.add_argument("--agents", type=int, default=200, help="Population size (small means more contention).")
+    parser.add_argument("--team-size", type=int, default=5, help="Number of agents per team (at least 2).")
+    parser.add_argument("--stripes", type=int, default=64, help="Number of lock stripes.")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a deadlock is reported.")
+    parser.add_argument("--unsafe", action="store_true", help="Use TESSCore.update_game without locks.")
+    args = parser.parse_args()
+
+    if args.team_size < 2:
+        parser.error("--team-size must be at least 2 (single-agent teams are not zero-sum).")
+
+    # Switch threads as often as possible to expose races
+    sys.setswitchinterval(1e-6)
+
+    agents = [Agent(f"agent_{i}", 1500.0) for i in range(args.agents)]
+    tess = TESSCore(K=32, alpha=0.5, scale=400)
+    update_game = tess.update_game if args.unsafe else ConcurrentTESS(tess, n_stripes=args.stripes).update_game
+    initial_total = sum(agent.rating for agent in agents)
+
+    # Records the matches in the order they were applied
+    applied = []
+    tess.add_listener(
+        lambda team_A, team_B, match_res, deltas_A, deltas_B: applied.append(
+            ([agent.id for agent in team_A.agents], [agent.id for agent in team_B.agents], match_res)
+        )
+    )
+
+    errors = []
+    threads = [
+        threading.Thread(
+            target=worker, 
+            args=(update_game, agents, args.matches, args.team_size, seed, errors), 
+            daemon=True
+        )
+        for seed in range(args.threads)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    deadline = start + args.timeout
+    for thread in threads:
+        thread.join(max(deadline - time.perf_counter(), 0.0))
+    elapsed = time.perf_counter() - start
+
+    if any(thread.is_alive() for thread in threads):
+        print(f"FAIL: workers still running after {args.timeout:.0f}s (deadlock?)")
+        sys.exit(1)
+
+    if errors:
+        print(f"FAIL: {len(errors)} worker(s) raised, e.g. {errors[0]!r}")
+        sys.exit(1)
+
+    total = sum(agent.rating for agent in agents)
+    drift = total - initial_total
+    n_matches = args.threads * args.matches
+    print(f"{n_matches} matches on {args.threads} threads in {elapsed:.2f}s ({n_matches / elapsed:.0f} matches/s)")
+    print(f"total rating {total:.6f} (initial {initial_total:.6f}, drift {drift:.3e})")
+
+    # Rounding alone stays many orders of magnitude below this bound
+    if abs(drift) > 1e-6 * args.agents:
+        print("FAIL: the total rating is not conserved")
+        sys.exit(1)
+
+    # Sequential replay in the recorded order must match exactly
+    replayed = {agent.id: Agent(agent.id, 1500.0) for agent in agents}
+    sequential = TESSCore(K=tess.K, alpha=tess.alpha, scale=tess.scale)
+    for ids_A, ids_B, match_res in applied:
+        sequential.update_game(Team([replayed[id] for id in ids_A]), Team([replayed[id] for id in ids_B]), match_res)
+
+    mismatches = sum(replayed[agent.id].rating != agent.rating for agent in agents)
+    print(f"sequential replay of {len(applied)} matches: {mismatches} rating(s) differ")
+    if len(applied) != n_matches or mismatches:
+        print("FAIL: the concurrent updates are not equivalent to a serial order")
+        sys.exit(1)
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,7 @@ setup(
     packages=find_packages(where="tess"),  # Alternatively, if you renamed your package, adjust accordingly
     package_dir={"": "tess"},  # This tells setuptools to look for packages in the "tess" directory
     install_requires=[
-        # List any external dependencies here, e.g.:
-        # "numpy>=1.19.0",
+        "numpy>=1.19.0",
     ],
     entry_points={
         # Optionally, you can create console scripts to run your examples:
@@ -20,11 +19,12 @@ setup(
             "tess-example1=exec.example1:main",
             "tess-example2=exec.example2:main",
             "tess-example3=exec.example3:main",
+            "tess-example4=exec.example4:main",
         ],
     },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.8",
 )
@@ -9,16 +9,69 @@ __version__ = "0.1.0"
 
 # Import key classes to expose them as part of the package API.
 from .agent import Agent
+from .batch import MatchBatch
+from .concurrent import ConcurrentTESS
+from .history import HistoryRecorder
+from .id_registry import IdRegistry
+from .instrumentation import Instrumentation
+from .journal import DeltaJournal
+from .ingest import MatchLogIngester, read_match_log
+from .leaderboard import Leaderboard
+from .league import LeagueTable
 from .match_outcome import MatchOutcome
-from .match_result import MatchResult
+from .match_result import IndexedMatchResult, MatchResult
+from .match_log import MatchLogReader, MatchLogWriter, convert_match_log
+from .matchmaker import Matchmaker
+from .multi_team_result import MultiTeamResult
+from .predict import Predictor
+from .rating_store import RatingStore, StoreAgent
+from .replay import replay_parallel
+from .server import RatingServer
+from .sharding import ShardedTESS
+from .simulate import simulate, simulate_seeds
+from .snapshot import load_snapshot, write_snapshot
+from .sqlite_store import SQLiteStore
+from .sweep import param_grid, random_params, sweep
 from .team import Team
+from .timeline import MatchTimeline
 from .tess_core import TESSCore
 
 # Optionally, define __all__ to specify the public API.
 __all__ = [
     "Agent",
+    "ConcurrentTESS",
+    "DeltaJournal",
+    "HistoryRecorder",
+    "IdRegistry",
+    "IndexedMatchResult",
+    "Instrumentation",
+    "Leaderboard",
+    "LeagueTable",
+    "MatchBatch",
+    "MatchLogIngester",
+    "MatchLogReader",
+    "MatchLogWriter",
+    "Matchmaker",
     "MatchOutcome",
     "MatchResult",
+    "MatchTimeline",
+    "MultiTeamResult",
+    "Predictor",
+    "RatingServer",
+    "RatingStore",
+    "ShardedTESS",
+    "SQLiteStore",
+    "StoreAgent",
     "Team",
     "TESSCore",
+    "convert_match_log",
+    "load_snapshot",
+    "param_grid",
+    "random_params",
+    "read_match_log",
+    "replay_parallel",
+    "simulate",
+    "simulate_seeds",
+    "sweep",
+    "write_snapshot",
 ]
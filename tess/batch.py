@@ -0,0 +1,449 @@
+from collections import defaultdict
+from typing import List, Sequence
+
+import numpy as np
+
+
+def _index_array(
+        values: Sequence[int]
+) -> np.ndarray:
+    """
+    Returns ``values`` as a signed integer array, without copying one that already is.
+    """
+    array = np.asarray(values)
+
+    return array if array.dtype.kind == "i" else array.astype(np.int64)
+
+
+class MatchBatch:
+    """
+    Columnar description of many two-team matches, addressed by agent index.
+
+    Teams are stored back to back in a single flat array, team A of match i first
+    and team B of match i second, so team ``t`` of the batch occupies
+    ``members[team_offsets[t]:team_offsets[t + 1]]``. Every team must have at
+    least one member and an agent may appear at most once per match; the latter is
+    checked by ``waves``, which every batch update schedules through before applying
+    anything.
+
+    Attributes:
+        _members (np.ndarray): Flat array of agent indices (int64 unless given in another signed integer type).
+        _team_offsets (np.ndarray): Team boundaries into ``_members`` (length 2 * M + 1).
+        _ranks (np.ndarray): In-team rankings aligned with ``_members`` (1 is best).
+        _outcomes (np.ndarray): Outcome value of team A for each match (1.0, 0.5 or 0.0).
+
+    Methods:
+        from_lists(members_A, members_B, ranks_A, ranks_B, outcomes): Builds a batch from per-match lists.
+        from_results(results): Builds a batch from IndexedMatchResults.
+        take(match_indices): Returns a new batch holding the selected matches in the given order.
+        waves(): Groups matches into waves of agent-disjoint matches.
+    """
+
+    def __init__(
+            self, 
+            members: np.ndarray, 
+            team_offsets: np.ndarray, 
+            ranks: np.ndarray, 
+            outcomes: np.ndarray
+    ):
+        """
+        Initializes a MatchBatch from its flat columns.
+
+        Columns that already are signed integer arrays (e.g. memory-mapped int32 members
+        of a binary match log) are used as they are, without a copy.
+
+        Args:
+            members (np.ndarray): Flat array of agent indices, teams A and B of each match interleaved.
+            team_offsets (np.ndarray): Team boundaries into ``members`` (length 2 * M + 1, starting at 0).
+            ranks (np.ndarray): In-team rankings aligned with ``members`` (1 is best).
+            outcomes (np.ndarray): Outcome value of team A for each match.
+        """
+        self._members = _index_array(members)
+        self._team_offsets = _index_array(team_offsets)
+        self._ranks = _index_array(ranks)
+        self._outcomes = np.asarray(outcomes, dtype=np.float64)
+
+        if len(self._team_offsets) != 2 * len(self._outcomes) + 1:
+            raise ValueError("team_offsets must hold exactly two teams per outcome.")
+
+        if len(self._ranks) != len(self._members):
+            raise ValueError("ranks must be aligned with members.")
+
+        if len(self._outcomes) and np.any(np.diff(self._team_offsets) < 1):
+            raise ValueError("Every team in a batch needs at least one member.")
+
+    @classmethod
+    def from_lists(
+            cls, 
+            members_A: Sequence[Sequence[int]], 
+            members_B: Sequence[Sequence[int]], 
+            ranks_A: Sequence[Sequence[int]], 
+            ranks_B: Sequence[Sequence[int]], 
+            outcomes: Sequence[float]
+    ) -> "MatchBatch":
+        """
+        Builds a batch from per-match lists of agent indices and rankings.
+
+        Args:
+            members_A (Sequence[Sequence[int]]): Agent indices of team A, one list per match.
+            members_B (Sequence[Sequence[int]]): Agent indices of team B, one list per match.
+            ranks_A (Sequence[Sequence[int]]): In-team rankings of team A, aligned with ``members_A``.
+            ranks_B (Sequence[Sequence[int]]): In-team rankings of team B, aligned with ``members_B``.
+            outcomes (Sequence[float]): Outcome value of team A for each match
+                (a MatchOutcome ``value``, e.g. 1.0 for a win).
+
+        Returns:
+            MatchBatch: The columnar batch.
+        """
+        members = []
+        ranks = []
+        sizes = []
+
+        for team_A, team_B, rank_A, rank_B in zip(members_A, members_B, ranks_A, ranks_B):
+            members.extend(team_A)
+            members.extend(team_B)
+            ranks.extend(rank_A)
+            ranks.extend(rank_B)
+            sizes.append(len(team_A))
+            sizes.append(len(team_B))
+
+        team_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=team_offsets[1:])
+
+        return cls(members, team_offsets, ranks, outcomes)
+
+    @classmethod
+    def from_results(
+            cls, 
+            results: Sequence["IndexedMatchResult"]
+    ) -> "MatchBatch":
+        """
+        Builds a batch from IndexedMatchResults, whose member indices become the agent indices.
+
+        Each result already holds both teams back to back, so their arrays are
+        concatenated directly.
+
+        Args:
+            results (Sequence[IndexedMatchResult]): The matches, in chronological order.
+
+        Returns:
+            MatchBatch: The columnar batch.
+        """
+        sizes = np.empty(2 * len(results), dtype=np.int64)
+        sizes[0::2] = [len(m.members_A) for m in results]
+        sizes[1::2] = [len(m.members_B) for m in results]
+
+        team_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=team_offsets[1:])
+
+        return cls(
+            members=np.concatenate([m.members for m in results]) if results else [], 
+            team_offsets=team_offsets, 
+            ranks=np.concatenate([m.ranks for m in results]) if results else [], 
+            outcomes=[m.team_A_outcome.value for m in results]
+        )
+
+    @property
+    def members(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the flat array of agent indices.
+        """
+        return self._members
+
+    @property
+    def team_offsets(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the team boundaries into the members array.
+        """
+        return self._team_offsets
+
+    @property
+    def ranks(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the in-team rankings aligned with the members array.
+        """
+        return self._ranks
+
+    @property
+    def outcomes(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the outcome value of team A for each match.
+        """
+        return self._outcomes
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of matches in the batch.
+        """
+        return len(self._outcomes)
+
+    def take(
+            self, 
+            match_indices: np.ndarray
+    ) -> "MatchBatch":
+        """
+        Returns a new batch holding the selected matches in the given order.
+
+        Args:
+            match_indices (np.ndarray): Indices of the matches to keep.
+
+        Returns:
+            MatchBatch: The selected matches.
+        """
+        match_indices = np.asarray(match_indices, dtype=np.int64)
+        team_indices = np.empty(2 * len(match_indices), dtype=np.int64)
+        team_indices[0::2] = 2 * match_indices
+        team_indices[1::2] = 2 * match_indices + 1
+
+        starts = self._team_offsets[team_indices]
+        sizes = self._team_offsets[team_indices + 1] - starts
+        positions = _segment_positions(starts, sizes)
+
+        team_offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=team_offsets[1:])
+
+        return MatchBatch(
+            members=self._members[positions], 
+            team_offsets=team_offsets, 
+            ranks=self._ranks[positions], 
+            outcomes=self._outcomes[match_indices]
+        )
+
+    def waves(
+            self
+    ) -> List[np.ndarray]:
+        """
+        Groups matches into waves of agent-disjoint matches.
+
+        A match is placed in the wave right after the latest wave that already holds
+        one of its agents, so matches sharing an agent keep their relative order while
+        independent matches are pulled forward. Applying the waves one after another
+        therefore gives the same ratings as applying the matches sequentially.
+
+        Returns:
+            List[np.ndarray]: Match indices of each wave, in application order.
+
+        Raises:
+            ValueError: If an agent appears twice in a match (its deltas would overwrite each other).
+        """
+        if not len(self):
+            return []
+
+        members = self._members.tolist()
+        match_offsets = self._team_offsets[0::2].tolist()
+        # Agent index -> last wave that touched it; a dict when few agents span a large index range
+        n_agents = max(members) + 1
+        last_wave = [-1] * n_agents if n_agents <= 4 * len(members) else defaultdict(lambda: -1)
+        match_wave = []
+
+        for start, end in zip(match_offsets, match_offsets[1:]):
+            agents = members[start:end]
+            wave = 1 + max([last_wave[agent] for agent in agents])
+            for agent in agents:
+                if last_wave[agent] == wave:  # Only an earlier member of this match can be in this wave
+                    raise ValueError(f"Agent {agent} appears twice in match {len(match_wave)}.")
+                last_wave[agent] = wave
+            match_wave.append(wave)
+
+        match_wave = np.asarray(match_wave, dtype=np.int64)
+        order = np.argsort(match_wave, kind="stable")
+        bounds = np.searchsorted(match_wave[order], np.arange(1, match_wave[order[-1]] + 1))
+
+        return np.split(order, bounds)
+
+
+def _segment_positions(
+        starts: np.ndarray, 
+        sizes: np.ndarray
+) -> np.ndarray:
+    """
+    Expands (start, size) segments into the flat positions they cover.
+
+    Args:
+        starts (np.ndarray): First position of each segment.
+        sizes (np.ndarray): Length of each segment.
+
+    Returns:
+        np.ndarray: Concatenated ``arange(start, start + size)`` of all segments.
+    """
+    total = int(sizes.sum())
+    seg_begin = np.cumsum(sizes) - sizes  # Where each segment begins in the output
+    within = np.arange(total, dtype=np.int64) - np.repeat(seg_begin, sizes)
+
+    return np.repeat(starts, sizes) + within
+
+
+def batch_deltas(
+        ratings: np.ndarray, 
+        batch: MatchBatch, 
+        K: float, 
+        alpha: float, 
+        scale: float
+) -> np.ndarray:
+    """
+    Computes the TESS rating deltas of every member of a batch in one vectorized pass.
+
+    All matches are evaluated against the same ``ratings``, so the result only equals
+    sequential updates when the matches are agent-disjoint (see ``MatchBatch.waves``).
+
+    ``ratings`` may carry leading dimensions (e.g. shape (P, N) for P rating systems
+    evaluated side by side), in which case ``K``, ``alpha`` and ``scale`` may be arrays
+    broadcasting against them (e.g. of shape (P, 1)).
+
+    ``K``, ``alpha`` and ``scale`` may also be 1-D arrays holding one value per match,
+    so matches rated under different parameters (e.g. of different leagues) are
+    still evaluated in a single pass.
+
+    Args:
+        ratings (np.ndarray): Current ratings indexed by agent index along the last axis.
+        batch (MatchBatch): The matches to evaluate.
+        K (float): The Elo rating adjustment factor (or one per match).
+        alpha (float): Weight given to team performance vs. individual performance (or one per match).
+        scale (float): The Elo scaling factor (or one per match).
+
+    Returns:
+        np.ndarray: Rating delta of each entry of ``batch.members`` (along the last axis).
+    """
+    members = batch.members
+    team_offsets = batch.team_offsets
+    starts = team_offsets[:-1]
+    sizes = np.diff(team_offsets)
+    n_teams = len(sizes)
+
+    if n_teams == 0:
+        return np.zeros(ratings.shape[:-1] + (0,), dtype=np.float64)
+
+    r = ratings[..., members]
+
+    # Step 1: Compute average team ratings
+    avg = np.add.reduceat(r, starts, axis=-1) / sizes
+    avg_A = avg[..., 0::2]
+    avg_B = avg[..., 1::2]
+
+    # Step 2: Compute expected win probabilities and outcomes for each team
+    E_team = np.empty(avg.shape, dtype=np.float64)
+    E_team[..., 0::2] = 1.0 / (1 + 10 ** ((avg_B - avg_A) / scale))
+    E_team[..., 1::2] = 1.0 / (1 + 10 ** ((avg_A - avg_B) / scale))
+
+    O_team = np.empty(n_teams, dtype=np.float64)
+    O_team[0::2] = batch.outcomes
+    O_team[1::2] = 1.0 - batch.outcomes
+
+    # Steps 3-5: Team and zero-sum individual components of each member
+    K, alpha, scale = (
+        np.repeat(param, 2) if np.ndim(param) == 1 else param  # Per-match values -> per-team values
+        for param in (K, alpha, scale)
+    )
+
+    return _member_deltas(r, avg, O_team, E_team, team_offsets, batch.ranks, K, alpha, scale)
+
+
+def _member_deltas(
+        r: np.ndarray, 
+        avg: np.ndarray, 
+        O_team: np.ndarray, 
+        E_team: np.ndarray, 
+        team_offsets: np.ndarray, 
+        ranks: np.ndarray, 
+        K: float, 
+        alpha: float, 
+        scale: float
+) -> np.ndarray:
+    """
+    Combines the team component and the zero-sum individual component of every member.
+
+    Shared by every kernel that has already computed each team's score ``O_team`` and
+    expectation ``E_team``, however many opponents the teams had.
+
+    Args:
+        r (np.ndarray): Ratings of the members, teams back to back (along the last axis).
+        avg (np.ndarray): Average rating of each team.
+        O_team (np.ndarray): Actual score of each team.
+        E_team (np.ndarray): Expected score of each team.
+        team_offsets (np.ndarray): Team boundaries into the members (length T + 1).
+        ranks (np.ndarray): In-team rankings aligned with the members (1 is best).
+        K (float): The Elo rating adjustment factor (or a 1-D array with one per team).
+        alpha (float): Weight given to team performance vs. individual performance (or one per team).
+        scale (float): The Elo scaling factor (or one per team).
+
+    Returns:
+        np.ndarray: Rating delta of each member.
+    """
+    starts = team_offsets[:-1]
+    sizes = np.diff(team_offsets)
+    team_of = np.repeat(np.arange(len(sizes)), sizes)
+
+    # Per-team parameters are expanded to their members; scalars and leading-dimension
+    # arrays broadcast as they are.
+    K_m, alpha_m, scale_m = (
+        param[team_of] if np.ndim(param) == 1 else param
+        for param in (K, alpha, scale)
+    )
+
+    # Step 1: Team component (single-member teams take the whole K-update)
+    single = sizes < 2
+    team_delta = np.where(
+        single, 
+        K * (O_team - E_team), 
+        K * alpha * (O_team - E_team) / sizes
+    )
+
+    # Step 2: Individual component from in-team pairwise expectations
+    n = sizes[team_of]
+    denom = np.maximum(n - 1, 1)
+    S_indiv = (n - ranks) / denom
+    E_indiv = _pairwise_expected(r, avg[..., team_of], team_of, starts, n, scale_m) / denom
+    indiv_deltas = K_m * (1 - alpha_m) * (S_indiv - E_indiv)
+
+    # Step 3: Make the individual component zero-sum within each team
+    avg_indiv = np.add.reduceat(indiv_deltas, starts, axis=-1) / sizes
+    adjusted = np.where(single[team_of], 0.0, indiv_deltas - avg_indiv[..., team_of])
+
+    return team_delta[..., team_of] + adjusted
+
+
+def _pairwise_expected(
+        r: np.ndarray, 
+        pivot: np.ndarray, 
+        team_of: np.ndarray, 
+        starts: np.ndarray, 
+        n: np.ndarray, 
+        scale: float
+) -> np.ndarray:
+    """
+    Sums each member's expected score against every teammate.
+
+    Uses ``1 / (1 + 10 ** ((r_j - r_i) / scale)) == q_i / (q_i + q_j)`` with
+    ``q = 10 ** ((r - pivot) / scale)``, so only one exponentiation is needed per member.
+
+    Args:
+        r (np.ndarray): Ratings of the members (along the last axis).
+        pivot (np.ndarray): Per-member centering value (the team average) to keep ``q`` in range.
+        team_of (np.ndarray): Team index of each member.
+        starts (np.ndarray): First member position of each team.
+        n (np.ndarray): Team size of each member.
+        scale (float): The Elo scaling factor (or an array with one per member).
+
+    Returns:
+        np.ndarray: Sum of pairwise expected scores of each member (self-comparison excluded).
+    """
+    q = 10 ** ((r - pivot) / scale)
+
+    # Every member is paired with each member of its own team (including itself).
+    pair_i = np.repeat(np.arange(r.shape[-1]), n)
+    pair_j = _segment_positions(starts[team_of], n)
+    q_i = q[..., pair_i]
+    p = q_i / (q_i + q[..., pair_j])
+
+    # The self-pair always contributes exactly 0.5.
+    return np.add.reduceat(p, np.cumsum(n) - n, axis=-1) - 0.5
@@ -0,0 +1,129 @@
+import threading
+from typing import List, Tuple, Union
+
+from .match_result import IndexedMatchResult, MatchResult
+from .team import Team
+from .tess_core import TESSCore
+
+
+class ConcurrentTESS:
+    """
+    Thread-safe front end to ``TESSCore.update_game`` using striped per-agent locks.
+
+    Every agent ID hashes to one of ``n_stripes`` locks. An update acquires the
+    stripes of all its players, deduplicated and in increasing stripe order, so two
+    updates never wait on each other in a cycle and cannot deadlock. While they are
+    held no other update can touch any of the match's players, so the team averages
+    and expected scores are computed from a consistent snapshot of their ratings,
+    and matches with disjoint players (on disjoint stripes) proceed concurrently
+    instead of queueing behind one global lock.
+
+    Listeners of the wrapped TESSCore are called while the stripes are held, one
+    match at a time, so they see the ratings right after their match and need no
+    locking of their own. With instrumentation attached, matches and updated agents
+    are counted but phases are not timed.
+
+    Agents must not be added to a RatingStore concurrently with updates (growing
+    the store replaces its ratings array): create every agent before starting the
+    workers. RatingStore subscribers are notified from the worker threads.
+
+    Attributes:
+        _tess (TESSCore): The rating system applying the matches.
+        _stripes (List[threading.Lock]): The striped agent locks.
+        _serial_lock (threading.Lock): Serializes listener calls and counters.
+
+    Methods:
+        tess (property): Returns the wrapped TESSCore.
+        update_game(team_A, team_B, match_res): Applies a match, safe to call from any thread.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            n_stripes: int = 1024
+    ):
+        """
+        Initializes the striped locks.
+
+        Args:
+            tess (TESSCore): The rating system applying the matches.
+            n_stripes (int, optional): Number of agent locks; more stripes mean fewer
+                false conflicts between unrelated players (default: 1024).
+        """
+        if n_stripes < 1:
+            raise ValueError("At least one lock stripe is needed.")
+
+        self._tess = tess
+        self._stripes = [threading.Lock() for _ in range(n_stripes)]
+        self._serial_lock = threading.Lock()
+
+    @property
+    def tess(
+        self
+    ) -> TESSCore:
+        """
+        Returns the wrapped TESSCore.
+        """
+        return self._tess
+
+    def _stripes_of(
+            self, 
+            team_A: Team, 
+            team_B: Team
+    ) -> List[threading.Lock]:
+        """
+        Returns the locks guarding the players of both teams, in canonical (increasing stripe) order.
+        """
+        n = len(self._stripes)
+        indices = sorted({hash(agent.id) % n for team in (team_A, team_B) for agent in team.agents})
+
+        return [self._stripes[i] for i in indices]
+
+    def update_game(
+            self, 
+            team_A: Team, 
+            team_B: Team, 
+            match_res: Union[MatchResult, IndexedMatchResult]
+    ) -> Tuple[List[float], List[float]]:
+        """
+        Updates the Elo ratings of all players in team A and team B, like ``TESSCore.update_game``.
+
+        Safe to call from several threads at once; calls sharing a player are applied
+        one after the other, in the order they acquire its stripe.
+
+        Args:
+            team_A (Team): The first team participating in the match.
+            team_B (Team): The second team participating in the match.
+            match_res (Union[MatchResult, IndexedMatchResult]): Match outcomes and individual rankings.
+
+        Returns:
+            Tuple[List[float], List[float]]: The deltas applied to team A's and team B's agents.
+        """
+        tess = self._tess
+        locks = self._stripes_of(team_A, team_B)
+
+        for lock in locks:
+            lock.acquire()
+        try:
+            # Step 1: Read every rating and compute the deltas before any write
+            deltas_A, deltas_B = tess.compute_deltas(team_A, team_B, match_res)
+
+            # Step 2: Apply them while no other update can touch these players
+            for agent, delta in zip(team_A.agents, deltas_A):
+                agent.update_rating(delta)
+
+            for agent, delta in zip(team_B.agents, deltas_B):
+                agent.update_rating(delta)
+
+            # Step 3: Report the match, one at a time across threads
+            instrumentation = tess.instrumentation
+            if tess._listeners or instrumentation is not None:
+                with self._serial_lock:
+                    if instrumentation is not None:
+                        instrumentation.match_applied(len(team_A.agents) + len(team_B.agents))
+                    tess._notify_listeners(team_A, team_B, match_res, deltas_A, deltas_B)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        return deltas_A, deltas_B
@@ -0,0 +1,386 @@
+import array
+import bisect
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .match_result import MatchResult
+from .team import Team
+
+
+def _last_rows(
+        agents: np.ndarray, 
+        ratings: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the distinct agents of some rows (sorted) and the rating of each one's last row.
+    """
+    # Last row of each agent: first occurrence in the reversed rows
+    unique, last = np.unique(np.asarray(agents)[::-1], return_index=True)
+
+    return unique, np.asarray(ratings)[len(agents) - 1 - last]
+
+
+class HistoryRecorder:
+    """
+    Append-only, chunked, columnar log of every rating change applied by a TESSCore.
+
+    Register the recorder with ``TESSCore.add_listener``; for each match it appends
+    one row per player with the match ID, the player's interned agent index, the
+    applied delta and the new rating. Rows are buffered in typed arrays and written
+    every ``chunk_size`` rows as a directory of ``.npy`` columns, so the update path
+    only pays for a few appends per player.
+
+    Each chunk also stores these indexes:
+        - ``agent_sorted`` / ``by_agent``: the agent column sorted (stable) and the
+          permutation sorting it, so one agent's rows are found by binary search;
+        - ``last_agent`` / ``last_rating``: the agents updated in the chunk and their
+          rating at its end, a sparse snapshot no larger than the chunk's rows;
+        - ``snapshot`` (every ``snapshot_every`` chunks only): every known agent's
+          rating at the end of the chunk.
+    A point-in-time snapshot starts from the closest full snapshot, applies the
+    sparse snapshots of at most ``snapshot_every - 1`` chunks and replays the rows
+    of a single chunk.
+
+    Match IDs are taken from ``MatchResult.match_id`` (the previous ID + 1 when it is
+    None) and must never decrease. The recorder is a listener, so it only sees a
+    match after its ratings were updated: a decreasing match ID raises ``ValueError``
+    with the match applied but not recorded. Callers replaying out-of-order data must
+    check the IDs before ``update_game``. Agent IDs are interned in ``ids.jsonl``, one
+    JSON value per line, in the order they were first seen.
+
+    Attributes:
+        _path (str): Directory holding the log.
+        _chunk_size (int): Number of rows per chunk.
+        _snapshot_every (int): Number of chunks between full snapshots.
+        _ids (list): Agent ID of each agent index.
+        _index (Dict[str, int]): Agent ID -> agent index.
+        _n_saved_ids (int): Number of IDs already written to ``ids.jsonl``.
+        _chunks (List[str]): Directory of each written chunk, in order.
+        _first_matches (List[int]): First match ID of each written chunk.
+        _full_snapshots (List[int]): Indexes of the chunks holding a full snapshot, in order.
+        _last_ratings (array.array): Latest rating of each agent index.
+        _last_match (int): Latest recorded match ID (-1 if none).
+        _buffer (Dict[str, array.array]): Rows not yet written, per column.
+
+    Methods:
+        __call__(team_A, team_B, match_res, deltas_A, deltas_B): Records a match (TESSCore listener).
+        flush(): Writes the buffered rows as a new chunk.
+        close(): Flushes the buffered rows.
+        agent_history(id): Returns every (match ID, delta, rating) of an agent.
+        rating_at(id, match_id): Returns an agent's rating right after a given match.
+        snapshot_at(match_id): Returns every agent's rating right after a given match.
+    """
+
+    def __init__(
+            self, 
+            path: str, 
+            chunk_size: int = 1000000, 
+            snapshot_every: int = 16
+    ):
+        """
+        Opens the log in ``path``, creating it if needed; existing chunks are kept and appended to.
+
+        Args:
+            path (str): Directory holding the log.
+            chunk_size (int, optional): Number of rows per chunk (default: 1000000).
+            snapshot_every (int, optional): Number of chunks between full snapshots of
+                every agent's rating (default: 16).
+        """
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1.")
+
+        self._path = path
+        self._chunk_size = chunk_size
+        self._snapshot_every = snapshot_every
+        self._ids = []
+        self._index = {}
+        self._chunks = []
+        self._first_matches = []
+        self._full_snapshots = []
+        self._last_ratings = array.array("d")
+        self._last_match = -1
+        self._buffer = self._empty_buffer()
+
+        os.makedirs(path, exist_ok=True)
+
+        ids_path = os.path.join(path, "ids.jsonl")
+        if os.path.exists(ids_path):
+            with open(ids_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._intern(json.loads(line))
+        self._n_saved_ids = len(self._ids)
+
+        for name in sorted(os.listdir(path)):
+            if name.startswith("chunk_") and not name.endswith(".tmp"):
+                chunk = os.path.join(path, name)
+                if os.path.exists(os.path.join(chunk, "snapshot.npy")):
+                    self._full_snapshots.append(len(self._chunks))
+                self._chunks.append(chunk)
+                self._first_matches.append(int(self._load(chunk, "match")[0]))
+
+        if self._chunks:
+            self._last_match = int(self._load(self._chunks[-1], "match")[-1])
+            self._last_ratings.extend(self._ratings_after(len(self._chunks) - 1).tolist())
+
+        # IDs saved by a flush that crashed before its chunk was written have no rating yet
+        self._last_ratings.extend([float("nan")] * (len(self._ids) - len(self._last_ratings)))
+
+    @staticmethod
+    def _empty_buffer(
+    ) -> Dict[str, array.array]:
+        """
+        Returns empty typed arrays for each column.
+        """
+        return {"match": array.array("q"), "agent": array.array("q"), "delta": array.array("d"), "rating": array.array("d")}
+
+    @staticmethod
+    def _load(
+            chunk: str, 
+            column: str
+    ) -> np.ndarray:
+        """
+        Memory-maps one column of a written chunk.
+        """
+        return np.load(os.path.join(chunk, column + ".npy"), mmap_mode="r")
+
+    def _intern(
+            self, 
+            id
+    ) -> int:
+        """
+        Returns the agent index of an ID, assigning the next one if it is new.
+        """
+        index = self._index.get(id)
+        if index is None:
+            index = len(self._ids)
+            self._index[id] = index
+            self._ids.append(id)
+
+        return index
+
+    def __call__(
+            self, 
+            team_A: Team, 
+            team_B: Team, 
+            match_res: MatchResult, 
+            deltas_A: List[float], 
+            deltas_B: List[float]
+    ) -> None:
+        """
+        Records the rating changes of one match (signature of a TESSCore listener).
+        """
+        match_id = match_res.match_id
+        if match_id is None:
+            match_id = self._last_match + 1
+        elif match_id < self._last_match:
+            raise ValueError(f"Match ID {match_id} is older than the last recorded match {self._last_match}.")
+        self._last_match = match_id
+
+        buffer = self._buffer
+        last_ratings = self._last_ratings
+
+        for team, deltas in ((team_A, deltas_A), (team_B, deltas_B)):
+            for agent, delta in zip(team.agents, deltas):
+                index = self._intern(agent.id)
+                rating = agent.rating
+                if index == len(last_ratings):
+                    last_ratings.append(rating)
+                else:
+                    last_ratings[index] = rating
+
+                buffer["match"].append(match_id)
+                buffer["agent"].append(index)
+                buffer["delta"].append(delta)
+                buffer["rating"].append(rating)
+
+        if len(buffer["match"]) >= self._chunk_size:
+            self.flush()
+
+    def flush(
+            self
+    ) -> None:
+        """
+        Writes the buffered rows as a new chunk (no-op if the buffer is empty).
+
+        New IDs are appended to ``ids.jsonl`` first and the chunk directory is written
+        under a temporary name and renamed, so a crash never leaves a partial chunk.
+        """
+        if not self._buffer["match"]:
+            return
+
+        # Step 1: Persist the newly interned agent IDs
+        if self._n_saved_ids < len(self._ids):
+            with open(os.path.join(self._path, "ids.jsonl"), "a", encoding="utf-8") as f:
+                for id in self._ids[self._n_saved_ids:]:
+                    f.write(json.dumps(id) + "\n")
+            self._n_saved_ids = len(self._ids)
+
+        # Step 2: Write the columns and indexes of the chunk
+        columns = self._buffer_columns()
+        by_agent = np.argsort(columns["agent"], kind="stable")
+        columns["by_agent"] = by_agent
+        columns["agent_sorted"] = columns["agent"][by_agent]
+        columns["last_agent"], columns["last_rating"] = _last_rows(columns["agent"], columns["rating"])
+        full = not self._full_snapshots or len(self._chunks) - self._full_snapshots[-1] >= self._snapshot_every
+        if full:
+            columns["snapshot"] = np.array(self._last_ratings, dtype=np.float64)
+
+        chunk = os.path.join(self._path, f"chunk_{len(self._chunks):06d}")
+        tmp_chunk = chunk + ".tmp"
+        os.makedirs(tmp_chunk, exist_ok=True)
+        for name, column in columns.items():
+            np.save(os.path.join(tmp_chunk, name + ".npy"), column)
+        os.replace(tmp_chunk, chunk)
+
+        if full:
+            self._full_snapshots.append(len(self._chunks))
+        self._chunks.append(chunk)
+        self._first_matches.append(int(columns["match"][0]))
+        self._buffer = self._empty_buffer()
+
+    def close(
+            self
+    ) -> None:
+        """
+        Writes any buffered rows; the recorder can still be queried afterwards.
+        """
+        self.flush()
+
+    def _buffer_columns(
+            self
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns copies of the buffered rows as numpy columns.
+        """
+        return {
+            "match": np.array(self._buffer["match"], dtype=np.int64), 
+            "agent": np.array(self._buffer["agent"], dtype=np.int64), 
+            "delta": np.array(self._buffer["delta"], dtype=np.float64), 
+            "rating": np.array(self._buffer["rating"], dtype=np.float64)
+        }
+
+    def _ratings_after(
+            self, 
+            c: int
+    ) -> np.ndarray:
+        """
+        Returns the rating of every agent index at the end of chunk ``c`` (NaN if it had not played).
+
+        Starts from the last full snapshot up to chunk ``c`` and applies the sparse
+        snapshots of the chunks after it.
+        """
+        s = bisect.bisect_right(self._full_snapshots, c) - 1
+        if s >= 0:
+            start = self._full_snapshots[s]
+            ratings = np.array(self._load(self._chunks[start], "snapshot"))
+            start += 1
+        else:
+            start = 0
+            ratings = np.empty(0, dtype=np.float64)
+
+        for chunk in self._chunks[start:c + 1]:
+            agents = self._load(chunk, "last_agent")
+            if len(agents) and agents[-1] >= len(ratings):
+                grown = np.full(int(agents[-1]) + 1, np.nan)
+                grown[:len(ratings)] = ratings
+                ratings = grown
+            ratings[agents] = self._load(chunk, "last_rating")
+
+        return ratings
+
+    def agent_history(
+            self, 
+            id
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns every recorded change of an agent, oldest first.
+
+        Args:
+            id: The agent's ID.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Match IDs, deltas and ratings
+                right after each match (empty if the agent has no history).
+        """
+        index = self._index.get(id)
+        parts = {column: [] for column in ("match", "delta", "rating")}
+        if index is None:
+            return tuple(np.array(parts[column]) for column in parts)
+
+        for chunk in self._chunks:
+            agent_sorted = self._load(chunk, "agent_sorted")
+            lo = np.searchsorted(agent_sorted, index, side="left")
+            hi = np.searchsorted(agent_sorted, index, side="right")
+            if lo < hi:
+                rows = self._load(chunk, "by_agent")[lo:hi]
+                for column in parts:
+                    parts[column].append(self._load(chunk, column)[rows])
+
+        if self._buffer["match"]:
+            columns = self._buffer_columns()
+            rows = np.flatnonzero(columns["agent"] == index)
+            for column in parts:
+                parts[column].append(columns[column][rows])
+
+        return tuple(np.concatenate(parts[column]) for column in parts)
+
+    def rating_at(
+            self, 
+            id, 
+            match_id: int
+    ) -> float:
+        """
+        Returns an agent's rating right after a given match (None if it had not played yet).
+        """
+        matches, _, ratings = self.agent_history(id)
+        position = np.searchsorted(matches, match_id, side="right")
+
+        return float(ratings[position - 1]) if position > 0 else None
+
+    def snapshot_at(
+            self, 
+            match_id: int
+    ) -> Dict[str, float]:
+        """
+        Returns the rating of every agent that had played, right after a given match.
+
+        The ratings at the end of the chunk before the match are rebuilt from the
+        closest full and sparse snapshots, and only the rows of the following chunk
+        (or buffer) up to the match are replayed.
+        """
+        c = bisect.bisect_right(self._first_matches, match_id)
+        in_buffer = (
+            c == len(self._chunks) and
+            len(self._buffer["match"]) > 0 and
+            self._buffer["match"][0] <= match_id
+        )
+        if in_buffer:
+            c += 1
+        if c == 0:
+            return {}
+
+        # Step 1: Start from the ratings at the end of the chunk before
+        ratings = self._ratings_after(c - 2)
+
+        # Step 2: Replay the rows of that chunk (or of the buffer) up to the match
+        if in_buffer:
+            columns = self._buffer_columns()
+        else:
+            columns = {column: self._load(self._chunks[c - 1], column) for column in ("match", "agent", "rating")}
+
+        n_rows = np.searchsorted(columns["match"], match_id, side="right")
+        if n_rows:
+            agents, last_ratings = _last_rows(columns["agent"][:n_rows], columns["rating"][:n_rows])
+            grown = np.full(max(len(ratings), int(agents[-1]) + 1), np.nan)
+            grown[:len(ratings)] = ratings
+            grown[agents] = last_ratings
+            ratings = grown
+
+        return {
+            self._ids[i]: rating
+            for i, rating in enumerate(ratings.tolist())
+            if rating == rating  # NaN: no rating yet
+        }
@@ -0,0 +1,111 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class IdRegistry:
+    """
+    Interns agent IDs as dense integer indices.
+
+    The first ID interned gets index 0, the next new one index 1, and so on, so the
+    indices can address rows of a ratings array (e.g. a RatingStore filled in the
+    same order) and compact results such as ``IndexedMatchResult`` only carry small
+    integers instead of string IDs.
+
+    Attributes:
+        _ids (List[str]): ID of each index.
+        _index (Dict[str, int]): Mapping from ID to index.
+
+    Methods:
+        intern(id): Returns the index of an ID, assigning the next one if it is new.
+        intern_many(ids): Interns several IDs and returns their indices as an array.
+        index_of(id): Returns the index of an already interned ID.
+        id_of(index): Returns the ID interned at an index.
+        ids (property): Returns the interned IDs in index order.
+    """
+
+    def __init__(
+            self, 
+            ids: Iterable[str] = ()
+    ):
+        """
+        Initializes a registry, optionally pre-interning IDs in order.
+
+        Args:
+            ids (Iterable[str], optional): IDs to intern first, e.g. the rows of an existing table (default: none).
+        """
+        self._ids = []
+        self._index = {}
+
+        for id in ids:
+            self.intern(id)
+
+    def intern(
+            self, 
+            id: str
+    ) -> int:
+        """
+        Returns the index of an ID, assigning the next free index if it is new.
+        """
+        index = self._index.get(id)
+        if index is None:
+            index = self._index[id] = len(self._ids)
+            self._ids.append(id)
+
+        return index
+
+    def intern_many(
+            self, 
+            ids: Iterable[str]
+    ) -> np.ndarray:
+        """
+        Interns several IDs and returns their indices as an int32 array.
+        """
+        return np.array([self.intern(id) for id in ids], dtype=np.int32)
+
+    def index_of(
+            self, 
+            id: str
+    ) -> int:
+        """
+        Returns the index of an already interned ID.
+
+        Raises:
+            KeyError: If the ID was never interned.
+        """
+        return self._index[id]
+
+    def id_of(
+            self, 
+            index: int
+    ) -> str:
+        """
+        Returns the ID interned at the given index.
+        """
+        return self._ids[index]
+
+    @property
+    def ids(
+        self
+    ) -> List[str]:
+        """
+        Returns the interned IDs in index order.
+        """
+        return self._ids
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of interned IDs.
+        """
+        return len(self._ids)
+
+    def __contains__(
+            self, 
+            id: str
+    ) -> bool:
+        """
+        Returns whether the ID has been interned.
+        """
+        return id in self._index
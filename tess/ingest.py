@@ -0,0 +1,327 @@
+import csv
+import json
+import os
+from typing import Iterator, Tuple
+
+from .batch import MatchBatch
+from .match_outcome import MatchOutcome
+from .match_result import MatchResult
+from .rating_store import RatingStore
+from .snapshot import load_snapshot, write_snapshot
+from .tess_core import TESSCore
+
+# Fields of a match record, shared by the JSONL and CSV log formats.
+LOG_FIELDS = ["outcome", "rankings_A", "rankings_B"]
+
+
+def _parse_outcome(
+        value
+) -> MatchOutcome:
+    """
+    Parses a team A outcome given either by name ("WIN", "DRAW", "LOSS") or by value (1, 0.5, 0).
+    """
+    if isinstance(value, str):
+        if value.upper() in MatchOutcome.__members__:
+            return MatchOutcome[value.upper()]
+
+        value = float(value)
+
+    return MatchOutcome(float(value))
+
+
+def _parse_csv_rankings(
+        value: str
+) -> dict:
+    """
+    Parses CSV rankings written as ``id:rank`` pairs separated by ``;`` (e.g. ``a1:1;a2:2``).
+    """
+    rankings = {}
+    for pair in value.split(";"):
+        if pair:
+            id, rank = pair.rsplit(":", 1)
+            rankings[id] = int(rank)
+
+    return rankings
+
+
+def parse_match_record(
+        record: dict
+) -> MatchResult:
+    """
+    Builds a MatchResult from a decoded JSON match record.
+
+    Args:
+        record (dict): An object with an ``outcome`` (team A's outcome, by name or value)
+            and ``rankings_A`` / ``rankings_B`` objects mapping agent IDs to in-team ranks.
+
+    Returns:
+        MatchResult: The match; the team rosters are the keys of the rankings.
+    """
+    return MatchResult(
+        team_A_outcome=_parse_outcome(record["outcome"]), 
+        rankings_A={str(id): int(rank) for id, rank in record["rankings_A"].items()}, 
+        rankings_B={str(id): int(rank) for id, rank in record["rankings_B"].items()}
+    )
+
+
+def _detect_format(
+        path: str
+) -> str:
+    """
+    Infers the log format ("jsonl" or "csv") from the file extension.
+    """
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def iter_match_log(
+        path: str, 
+        fmt: str = None, 
+        offset: int = 0
+) -> Iterator[Tuple[MatchResult, int]]:
+    """
+    Lazily reads match records from a JSONL or CSV match log.
+
+    JSONL lines are objects with an ``outcome`` (team A's outcome, by name or value)
+    and ``rankings_A`` / ``rankings_B`` objects mapping agent IDs to in-team ranks.
+    CSV logs have a header with the same columns and write rankings as ``id:rank``
+    pairs separated by ``;``. The rosters of both teams are the keys of their rankings.
+
+    Only one line is held in memory at a time, so arbitrarily large logs can be read.
+
+    Args:
+        path (str): Path of the match log.
+        fmt (str, optional): "jsonl" or "csv" (default: inferred from the file extension).
+        offset (int, optional): Byte offset to resume reading from (default: start of file).
+
+    Yields:
+        Tuple[MatchResult, int]: Each match and the byte offset right after its record.
+    """
+    fmt = fmt or _detect_format(path)
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown match log format: {fmt}")
+
+    with open(path, "rb") as f:
+        header = None
+        if fmt == "csv":
+            header = next(csv.reader([f.readline().decode("utf-8")]))
+            missing = set(LOG_FIELDS) - set(header)
+            if missing:
+                raise ValueError(f"Match log {path} is missing columns: {sorted(missing)}")
+
+        if offset > f.tell():
+            f.seek(offset)
+
+        while True:
+            line = f.readline()
+            if not line:
+                break
+
+            text = line.decode("utf-8").strip()
+            if not text:
+                continue
+
+            if fmt == "jsonl":
+                match_res = parse_match_record(json.loads(text))
+            else:
+                record = dict(zip(header, next(csv.reader([text]))))
+                match_res = MatchResult(
+                    team_A_outcome=_parse_outcome(record["outcome"]), 
+                    rankings_A=_parse_csv_rankings(record["rankings_A"]), 
+                    rankings_B=_parse_csv_rankings(record["rankings_B"])
+                )
+
+            yield match_res, f.tell()
+
+
+def read_match_log(
+        path: str, 
+        fmt: str = None
+) -> Iterator[MatchResult]:
+    """
+    Lazily reads the matches of a JSONL or CSV match log (see ``iter_match_log``).
+
+    Args:
+        path (str): Path of the match log.
+        fmt (str, optional): "jsonl" or "csv" (default: inferred from the file extension).
+
+    Yields:
+        MatchResult: Each match, in log order.
+    """
+    for match_res, _ in iter_match_log(path, fmt):
+        yield match_res
+
+
+class MatchLogIngester:
+    """
+    Streams a match log through TESS with bounded memory and periodic checkpoints.
+
+    Matches are read lazily, grouped into batches of at most ``batch_size`` matches
+    and applied with ``TESSCore.update_games_batch``. Every ``checkpoint_every``
+    matches, the ratings and the position in the log are written atomically to
+    ``checkpoint_path`` as a rating snapshot (with the store's decay state, if
+    enabled); a later ``run`` on the same log resumes from there.
+
+    Attributes:
+        _tess (TESSCore): The rating system applying the matches.
+        _store (RatingStore): The ratings being updated.
+        _checkpoint_path (str): Where checkpoints are written (None disables checkpoints).
+        _checkpoint_every (int): Number of matches between two checkpoints.
+        _batch_size (int): Maximum number of matches applied in one batch.
+        _offset (int): Byte offset in the log right after the last applied match.
+        _matches_applied (int): Number of matches applied so far.
+
+    Methods:
+        store (property): Returns the rating store.
+        matches_applied (property): Returns the number of matches applied so far.
+        run(path, fmt): Applies a match log, resuming from the last checkpoint if any.
+        checkpoint(): Writes a checkpoint of the current state.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            store: RatingStore = None, 
+            checkpoint_path: str = None, 
+            checkpoint_every: int = 1000000, 
+            batch_size: int = 10000
+    ):
+        """
+        Initializes the ingester.
+
+        Args:
+            tess (TESSCore): The rating system applying the matches.
+            store (RatingStore, optional): The ratings to update (default: a new empty store).
+            checkpoint_path (str, optional): Where checkpoints are written (default: no checkpoints).
+            checkpoint_every (int, optional): Number of matches between checkpoints (default: 1000000).
+            batch_size (int, optional): Maximum number of matches applied in one batch (default: 10000).
+        """
+        self._tess = tess
+        self._store = RatingStore() if store is None else store
+        self._checkpoint_path = checkpoint_path
+        self._checkpoint_every = checkpoint_every
+        self._batch_size = batch_size
+        self._offset = 0
+        self._matches_applied = 0
+
+    @property
+    def store(
+        self
+    ) -> RatingStore:
+        """
+        Returns the rating store.
+        """
+        return self._store
+
+    @property
+    def matches_applied(
+        self
+    ) -> int:
+        """
+        Returns the number of matches applied so far.
+        """
+        return self._matches_applied
+
+    def run(
+            self, 
+            path: str, 
+            fmt: str = None
+    ) -> int:
+        """
+        Applies every match of a log, resuming from the last checkpoint if one exists.
+
+        Args:
+            path (str): Path of the match log.
+            fmt (str, optional): "jsonl" or "csv" (default: inferred from the file extension).
+
+        Returns:
+            int: The total number of matches applied, including those before the resumed checkpoint.
+        """
+        resumable = self._checkpoint_path and os.path.exists(self._checkpoint_path)
+        if resumable and not self._matches_applied:
+            self._restore()
+
+        pending = []
+        since_checkpoint = self._matches_applied % self._checkpoint_every
+        for match_res, offset in iter_match_log(path, fmt, self._offset):
+            pending.append(match_res)
+
+            if len(pending) == self._batch_size:
+                self._apply(pending, offset)
+                since_checkpoint += len(pending)
+                pending = []
+
+            if since_checkpoint + len(pending) == self._checkpoint_every:
+                if pending:
+                    self._apply(pending, offset)
+                    pending = []
+
+                self.checkpoint()
+                since_checkpoint = 0
+
+        if pending:
+            self._apply(pending, offset)
+
+        if self._checkpoint_path:
+            self.checkpoint()
+
+        return self._matches_applied
+
+    def _apply(
+            self, 
+            matches: list, 
+            offset: int
+    ) -> None:
+        """
+        Applies a list of matches as one batch and advances the log position to ``offset``.
+        """
+        store = self._store
+        members_A = [[store.agent(id).index for id in m.rankings_A] for m in matches]
+        members_B = [[store.agent(id).index for id in m.rankings_B] for m in matches]
+        batch = MatchBatch.from_lists(
+            members_A=members_A, 
+            members_B=members_B, 
+            ranks_A=[list(m.rankings_A.values()) for m in matches], 
+            ranks_B=[list(m.rankings_B.values()) for m in matches], 
+            outcomes=[m.team_A_outcome.value for m in matches]
+        )
+
+        store.settle(batch.members)
+        self._tess.update_games_batch(store.ratings, batch)
+        store.touch(batch.members)
+        store.notify(batch.members)
+        self._offset = offset
+        self._matches_applied += len(matches)
+
+    def checkpoint(
+            self
+    ) -> None:
+        """
+        Atomically writes the ratings (settled, with the decay state) and the log position
+        to the checkpoint path.
+        """
+        write_snapshot(
+            path=self._checkpoint_path, 
+            store=self._store, 
+            tess=self._tess, 
+            meta={"offset": self._offset, "matches_applied": self._matches_applied}
+        )
+
+    def _restore(
+            self
+    ) -> None:
+        """
+        Loads the ratings and the log position from the checkpoint path.
+        """
+        if len(self._store):
+            raise ValueError("Cannot resume from a checkpoint into a non-empty RatingStore.")
+
+        checkpoint, _, meta = load_snapshot(self._checkpoint_path)
+        for index, rating in enumerate(checkpoint.ratings.tolist()):
+            self._store.add(checkpoint.id_of(index), rating)
+
+        decay = checkpoint.decay_state()
+        if decay is not None:
+            self._store.restore_decay(*decay)
+
+        self._offset = meta["offset"]
+        self._matches_applied = meta["matches_applied"]
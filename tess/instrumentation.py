@@ -0,0 +1,217 @@
+import time
+from typing import Callable, Dict
+
+# Phases of TESSCore.update_game, timed separately.
+PHASES = ("team_averages", "expectations", "individual_deltas", "application")
+
+# Counters maintained by TESSCore and Team.
+COUNTERS = ("matches", "agents_updated", "single_agent_fallbacks", "missing_rank_errors")
+
+# Histogram bucket b counts durations d (in ns) with d.bit_length() == b, i.e. 2**(b-1) <= d < 2**b.
+_N_BUCKETS = 64
+
+
+class Histogram:
+    """
+    Histogram of durations with power-of-two nanosecond buckets.
+
+    Recording a duration is a bit_length and a list increment, so it is cheap enough
+    for the hot path; quantiles are resolved to the upper bound of their bucket.
+
+    Attributes:
+        _buckets (List[int]): Number of durations in each bucket.
+        _count (int): Number of recorded durations.
+        _total_ns (int): Sum of the recorded durations, in nanoseconds.
+        _max_ns (int): Longest recorded duration, in nanoseconds.
+    """
+
+    def __init__(
+            self
+    ):
+        """
+        Initializes an empty histogram.
+        """
+        self._buckets = [0] * _N_BUCKETS
+        self._count = 0
+        self._total_ns = 0
+        self._max_ns = 0
+
+    def record(
+            self, 
+            duration_ns: int
+    ) -> None:
+        """
+        Records one duration, in nanoseconds.
+        """
+        self._buckets[min(duration_ns.bit_length(), _N_BUCKETS - 1)] += 1
+        self._count += 1
+        self._total_ns += duration_ns
+        if duration_ns > self._max_ns:
+            self._max_ns = duration_ns
+
+    def quantile(
+            self, 
+            q: float
+    ) -> float:
+        """
+        Returns an upper bound of the q-quantile of the recorded durations, in seconds.
+        """
+        if not self._count:
+            return 0.0
+
+        target = q * self._count
+        seen = 0
+        for bucket, count in enumerate(self._buckets):
+            seen += count
+            if seen >= target and count:
+                return min(2 ** bucket, self._max_ns) / 1e9
+
+        return self._max_ns / 1e9
+
+    def summary(
+            self
+    ) -> dict:
+        """
+        Returns the count, total, mean, max and p50/p90/p99 (seconds) and the non-empty buckets.
+        """
+        return {
+            "count": self._count, 
+            "total": self._total_ns / 1e9, 
+            "mean": self._total_ns / self._count / 1e9 if self._count else 0.0, 
+            "max": self._max_ns / 1e9, 
+            "p50": self.quantile(0.5), 
+            "p90": self.quantile(0.9), 
+            "p99": self.quantile(0.99), 
+            # Upper bound of each non-empty bucket (seconds) -> count
+            "buckets": {2 ** bucket / 1e9: count for bucket, count in enumerate(self._buckets) if count}
+        }
+
+
+class Instrumentation:
+    """
+    Opt-in counters and phase timings for TESSCore and Team.
+
+    Attach an instance with ``TESSCore.instrument``; while none is attached the
+    update path only pays for a few None checks. Counters:
+
+        - ``matches``: matches applied;
+        - ``agents_updated``: agent ratings changed;
+        - ``single_agent_fallbacks``: one-agent teams that took the whole K-update;
+        - ``missing_rank_errors``: updates rejected because an agent had no ranking.
+
+    Each phase of ``update_game`` (see ``PHASES``) gets a duration histogram. An
+    exporter callback receives ``snapshot()`` on ``export()``, and automatically every
+    ``export_every`` matches if set.
+
+    Attributes:
+        _counters (Dict[str, int]): Counter values.
+        _histograms (Dict[str, Histogram]): Duration histogram of each phase.
+        _exporter (Callable[[dict], None]): Receives the snapshots.
+        _export_every (int): Matches between automatic exports (0 disables them).
+
+    Methods:
+        increment(name, n): Adds to a counter.
+        observe(phase, duration_ns): Records the duration of a phase.
+        match_applied(n_agents): Counts a match and exports if due.
+        matches_applied(n_matches, n_agents): Counts a batch of matches and exports if due.
+        snapshot(): Returns the counters and phase summaries.
+        export(): Sends a snapshot to the exporter.
+        reset(): Clears all counters and histograms.
+    """
+
+    def __init__(
+            self, 
+            exporter: Callable[[dict], None] = None, 
+            export_every: int = 0
+    ):
+        """
+        Initializes empty counters and histograms.
+
+        Args:
+            exporter (Callable[[dict], None], optional): Receives the snapshots (default: None).
+            export_every (int, optional): Matches between automatic exports, 0 for none (default: 0).
+        """
+        self._exporter = exporter
+        self._export_every = export_every
+        self.reset()
+
+    def reset(
+            self
+    ) -> None:
+        """
+        Clears all counters and histograms.
+        """
+        self._counters = {name: 0 for name in COUNTERS}
+        self._histograms = {phase: Histogram() for phase in PHASES}
+
+    def increment(
+            self, 
+            name: str, 
+            n: int = 1
+    ) -> None:
+        """
+        Adds ``n`` to a counter (created on first use if it is not one of ``COUNTERS``).
+        """
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(
+            self, 
+            phase: str, 
+            duration_ns: int
+    ) -> None:
+        """
+        Records the duration of a phase, in nanoseconds.
+        """
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            histogram = self._histograms[phase] = Histogram()
+
+        histogram.record(duration_ns)
+
+    def match_applied(
+            self, 
+            n_agents: int
+    ) -> None:
+        """
+        Counts an applied match and its updated agents, exporting a snapshot if one is due.
+        """
+        self.matches_applied(1, n_agents)
+
+    def matches_applied(
+            self, 
+            n_matches: int, 
+            n_agents: int
+    ) -> None:
+        """
+        Counts applied matches and their updated agents, exporting one snapshot if the
+        matches counter crossed a multiple of ``export_every``.
+        """
+        counters = self._counters
+        before = counters["matches"]
+        counters["matches"] = before + n_matches
+        counters["agents_updated"] += n_agents
+
+        every = self._export_every
+        if every and (before + n_matches) // every > before // every:
+            self.export()
+
+    def snapshot(
+            self
+    ) -> Dict[str, dict]:
+        """
+        Returns the counters and the summary of each phase histogram.
+        """
+        return {
+            "timestamp": time.time(), 
+            "counters": dict(self._counters), 
+            "phases": {phase: histogram.summary() for phase, histogram in self._histograms.items()}
+        }
+
+    def export(
+            self
+    ) -> None:
+        """
+        Sends a snapshot to the exporter, if any.
+        """
+        if self._exporter is not None:
+            self._exporter(self.snapshot())
@@ -0,0 +1,241 @@
+import bisect
+import heapq
+from collections import OrderedDict
+from typing import List
+
+from .match_result import MatchResult
+from .team import Team
+from .tess_core import TESSCore
+
+
+class DeltaJournal:
+    """
+    Bounded in-memory journal of the deltas applied by ``TESSCore.update_game``, for cheap undo.
+
+    The journal registers itself as a listener of the TESSCore and keeps the teams,
+    result and per-player deltas of the last ``capacity`` matches, keyed by match ID
+    (``MatchResult.match_id``, or the previous ID + 1 when it is None). A listener
+    cannot fail once the ratings have changed, so a match whose ID is already
+    journaled is renumbered to the next free ID after the previous one instead of
+    being rejected; ``last_match`` gives the ID the latest match was journaled under.
+
+    ``undo(match_id)`` reverts one of them. If none of its players has played since,
+    that only subtracts its deltas, in O(team size). Otherwise the matches that
+    depend on it are found through a per-player index: a later match is affected if
+    it involves a player of the undone match or of an already affected match. Only
+    these matches are rolled back (newest first) and re-applied in their original
+    order from the corrected ratings; every other match keeps its deltas.
+
+    Listeners are not called for the rollback and the re-applied matches, so
+    consumers of the original updates (e.g. a HistoryRecorder) are not corrected.
+
+    Only matches that reach the TESSCore listeners are journaled: ``update_game``,
+    ConcurrentTESS, RatingServer and ``LeagueTable.update_game``. Matches applied
+    by ``TESSCore.update_games_batch``, ``update_multi_game``,
+    ``LeagueTable.update_games_batch`` or directly to a RatingStore (replays, shards,
+    timelines) are not. If such a match involves a journaled player, undoing an
+    earlier match of that player neither rolls it back nor re-applies it, so the
+    resulting ratings are wrong.
+
+    Attributes:
+        _tess (TESSCore): The rating system whose matches are journaled.
+        _capacity (int): Maximum number of journaled matches.
+        _entries (OrderedDict): Sequence number -> [match ID, team A, team B, result, deltas A, deltas B].
+        _seq_of (Dict[int, int]): Match ID -> sequence number.
+        _by_agent (Dict[str, List[int]]): Agent ID -> sequence numbers of its journaled matches, in order.
+        _next_seq (int): Sequence number of the next journaled match.
+        _last_match (int): Latest journaled match ID (-1 if none).
+
+    Methods:
+        __call__(team_A, team_B, match_res, deltas_A, deltas_B): Journals a match (TESSCore listener).
+        __contains__(match_id): Returns whether a match can still be undone.
+        last_match: ID of the latest journaled match.
+        undo(match_id): Reverts a match and re-applies the matches that depend on it.
+        close(): Stops journaling.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            capacity: int = 100000
+    ):
+        """
+        Initializes an empty journal and registers it as a listener of ``tess``.
+
+        Args:
+            tess (TESSCore): The rating system whose matches are journaled.
+            capacity (int, optional): Maximum number of journaled matches; the oldest
+                ones are forgotten first (default: 100000).
+        """
+        self._tess = tess
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self._seq_of = {}
+        self._by_agent = {}
+        self._next_seq = 0
+        self._last_match = -1
+
+        tess.add_listener(self)
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops journaling the matches of the TESSCore.
+        """
+        self._tess.remove_listener(self)
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of journaled matches.
+        """
+        return len(self._entries)
+
+    def __contains__(
+            self, 
+            match_id: int
+    ) -> bool:
+        """
+        Returns whether the match is journaled (and can therefore be undone).
+        """
+        return match_id in self._seq_of
+
+    @property
+    def last_match(
+        self
+    ) -> int:
+        """
+        Returns the ID the latest match was journaled under (-1 if none).
+        """
+        return self._last_match
+
+    def __call__(
+            self, 
+            team_A: Team, 
+            team_B: Team, 
+            match_res: MatchResult, 
+            deltas_A: List[float], 
+            deltas_B: List[float]
+    ) -> None:
+        """
+        Journals the deltas of one match (signature of a TESSCore listener).
+        """
+        match_id = match_res.match_id
+        if match_id is None or match_id in self._seq_of:
+            # Renumber rather than raise: the ratings have already changed
+            match_id = self._last_match + 1
+            while match_id in self._seq_of:
+                match_id += 1
+        self._last_match = match_id
+
+        seq = self._next_seq
+        self._next_seq += 1
+        self._entries[seq] = [match_id, team_A, team_B, match_res, list(deltas_A), list(deltas_B)]
+        self._seq_of[match_id] = seq
+
+        for team in (team_A, team_B):
+            for agent in team.agents:
+                self._by_agent.setdefault(agent.id, []).append(seq)
+
+        if len(self._entries) > self._capacity:
+            self._forget(next(iter(self._entries)))
+
+    def _forget(
+            self, 
+            seq: int
+    ) -> List:
+        """
+        Removes a match from the journal and returns its entry.
+        """
+        entry = self._entries.pop(seq)
+        del self._seq_of[entry[0]]
+
+        for team in (entry[1], entry[2]):
+            for agent in team.agents:
+                seqs = self._by_agent[agent.id]
+                del seqs[bisect.bisect_left(seqs, seq)]
+                if not seqs:
+                    del self._by_agent[agent.id]
+
+        return entry
+
+    def _affected(
+            self, 
+            seq: int
+    ) -> List[int]:
+        """
+        Returns the sequence numbers of the matches after ``seq`` that depend on it, in order.
+        """
+        entries = self._entries
+        by_agent = self._by_agent
+        dirty = set()
+        affected = []
+        pending = [seq]
+        queued = {seq}
+
+        # Matches are visited in order, so a player is dirty from its first affected match on
+        # and every later match of a dirty player is affected.
+        while pending:
+            current = heapq.heappop(pending)
+            if current != seq:
+                affected.append(current)
+
+            _, team_A, team_B, _, _, _ = entries[current]
+            for team in (team_A, team_B):
+                for agent in team.agents:
+                    if agent.id in dirty:
+                        continue
+                    dirty.add(agent.id)
+
+                    seqs = by_agent[agent.id]
+                    for later in seqs[bisect.bisect_right(seqs, current):]:
+                        if later not in queued:
+                            queued.add(later)
+                            heapq.heappush(pending, later)
+
+        return affected
+
+    def undo(
+            self, 
+            match_id: int
+    ) -> List[int]:
+        """
+        Reverts a journaled match and re-applies the later matches that depend on it.
+
+        Args:
+            match_id (int): ID of the match to revert.
+
+        Returns:
+            List[int]: IDs of the re-applied matches, in order (empty if no player of
+                the match has played since).
+
+        Raises:
+            KeyError: If the match is not (or no longer) journaled.
+        """
+        seq = self._seq_of[match_id]
+        affected = self._affected(seq)
+        entries = self._entries
+
+        # Step 1: Roll back the affected matches, newest first, then the match itself
+        for current in reversed([seq] + affected):
+            _, team_A, team_B, _, deltas_A, deltas_B = entries[current]
+            for team, deltas in ((team_A, deltas_A), (team_B, deltas_B)):
+                for agent, delta in zip(team.agents, deltas):
+                    agent.update_rating(-delta)
+
+        self._forget(seq)
+
+        # Step 2: Re-apply the affected matches in their original order
+        for current in affected:
+            entry = entries[current]
+            team_A, team_B, match_res = entry[1], entry[2], entry[3]
+            deltas_A, deltas_B = self._tess.compute_deltas(team_A, team_B, match_res)
+            for team, deltas in ((team_A, deltas_A), (team_B, deltas_B)):
+                for agent, delta in zip(team.agents, deltas):
+                    agent.update_rating(delta)
+            entry[4] = deltas_A
+            entry[5] = deltas_B
+
+        return [entries[current][0] for current in affected]
@@ -0,0 +1,358 @@
+import bisect
+from typing import List, Tuple
+
+import numpy as np
+
+from .rating_store import RatingStore
+
+# Target number of keys per bucket of the sorted index.
+_BUCKET_LOAD = 1000
+
+
+class _SortedIndex:
+    """
+    Sorted multiset of keys stored as a list of sorted buckets.
+
+    A Fenwick tree over the bucket lengths gives the number of keys before any bucket
+    in O(log b), so insert, remove, position-of and key-at-position all run in
+    O(log n + bucket size) time.
+
+    Attributes:
+        _buckets (List[list]): Sorted buckets; every key of bucket i is <= every key of bucket i + 1.
+        _maxes (list): Largest key of each bucket.
+        _tree (List[int]): Fenwick tree over the bucket lengths.
+        _size (int): Total number of keys.
+    """
+
+    def __init__(
+            self, 
+            keys: list = ()
+    ):
+        """
+        Initializes the index from keys (sorted once).
+        """
+        keys = sorted(keys)
+        self._buckets = [keys[i:i + _BUCKET_LOAD] for i in range(0, len(keys), _BUCKET_LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._size = len(keys)
+        self._rebuild_tree()
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of keys.
+        """
+        return self._size
+
+    def _rebuild_tree(
+            self
+    ) -> None:
+        """
+        Rebuilds the Fenwick tree after buckets were split or removed.
+        """
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+
+        self._tree = tree
+
+    def _tree_add(
+            self, 
+            bucket: int, 
+            delta: int
+    ) -> None:
+        """
+        Adds ``delta`` to the length of a bucket in the Fenwick tree.
+        """
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _tree_prefix(
+            self, 
+            bucket: int
+    ) -> int:
+        """
+        Returns the number of keys in buckets before ``bucket``.
+        """
+        total = 0
+        i = bucket
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+
+        return total
+
+    def insert(
+            self, 
+            key
+    ) -> None:
+        """
+        Inserts a key, splitting its bucket when it grows past twice the target load.
+        """
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._size = 1
+            self._rebuild_tree()
+            return
+
+        b = min(bisect.bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[b]
+        bisect.insort(bucket, key)
+        self._maxes[b] = bucket[-1]
+        self._size += 1
+
+        if len(bucket) > 2 * _BUCKET_LOAD:
+            self._buckets[b:b + 1] = [bucket[:_BUCKET_LOAD], bucket[_BUCKET_LOAD:]]
+            self._maxes[b:b + 1] = [bucket[_BUCKET_LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(b, 1)
+
+    def remove(
+            self, 
+            key
+    ) -> None:
+        """
+        Removes a key (which must be present), dropping its bucket when it becomes empty.
+        """
+        b = bisect.bisect_left(self._maxes, key)
+        bucket = self._buckets[b]
+        del bucket[bisect.bisect_left(bucket, key)]
+        self._size -= 1
+
+        if bucket:
+            self._maxes[b] = bucket[-1]
+            self._tree_add(b, -1)
+        else:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._rebuild_tree()
+
+    def position(
+            self, 
+            key
+    ) -> int:
+        """
+        Returns the number of keys smaller than ``key``.
+        """
+        b = bisect.bisect_left(self._maxes, key)
+        if b == len(self._buckets):
+            return self._size
+
+        return self._tree_prefix(b) + bisect.bisect_left(self._buckets[b], key)
+
+    def _locate(
+            self, 
+            position: int
+    ) -> Tuple[int, int]:
+        """
+        Returns the (bucket, offset in bucket) of a 0-based position, descending the Fenwick tree.
+        """
+        b = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if b + step < len(self._tree) and self._tree[b + step] <= position:
+                b += step
+                position -= self._tree[b]
+            step >>= 1
+
+        return b, position
+
+    def at(
+            self, 
+            position: int
+    ):
+        """
+        Returns the key at a 0-based position in sorted order.
+        """
+        if not 0 <= position < self._size:
+            raise IndexError("position out of range")
+
+        b, offset = self._locate(position)
+
+        return self._buckets[b][offset]
+
+    def slice(
+            self, 
+            start: int, 
+            stop: int
+    ) -> list:
+        """
+        Returns the keys at positions [start, stop) in sorted order.
+        """
+        start = max(start, 0)
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+
+        b, offset = self._locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self._buckets[b][offset:offset + stop - start - len(keys)])
+            b += 1
+            offset = 0
+
+        return keys
+
+
+class Leaderboard:
+    """
+    Incrementally maintained global ranking of the agents of a RatingStore.
+
+    The leaderboard subscribes to the store's change notifications and only
+    repositions the agents whose rating changed, so rank-of, top-k, percentile and
+    range-around-player queries never sort the whole population. Rank 1 is the
+    highest rating; equal ratings are ordered by row index.
+
+    With inactivity decay enabled on the store, the first query of each day
+    settles the store (``RatingStore.settle``), so the rankings include the decay
+    due and only the decayed agents are repositioned.
+
+    Attributes:
+        _store (RatingStore): The ratings being ranked.
+        _index (_SortedIndex): Keys (-rating, row) in rank order.
+        _indexed (List[float]): Rating under which each row is currently indexed.
+        _settled_day (int): Store day at which pending decay was last applied.
+
+    Methods:
+        rank_of(id): Returns an agent's 1-based rank.
+        top(k): Returns the k highest-rated agents.
+        percentile(id): Returns the share of agents ranked below an agent, in percent.
+        around(id, radius): Returns the agents ranked within ``radius`` of an agent.
+        close(): Stops listening to rating changes.
+    """
+
+    def __init__(
+            self, 
+            store: RatingStore
+    ):
+        """
+        Builds the leaderboard from the store's current ratings and subscribes to its changes.
+
+        Args:
+            store (RatingStore): The ratings to rank.
+        """
+        self._store = store
+        store.settle()
+        self._settled_day = store.day
+        self._indexed = store.ratings.tolist()
+        self._index = _SortedIndex([(-rating, row) for row, rating in enumerate(self._indexed)])
+
+        store.subscribe(self._reposition)
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops listening to rating changes.
+        """
+        self._store.unsubscribe(self._reposition)
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of ranked agents.
+        """
+        self._sync()
+
+        return len(self._index)
+
+    def _reposition(
+            self, 
+            indices: np.ndarray
+    ) -> None:
+        """
+        Moves the given rows to their new place in the ranking.
+        """
+        self._sync()
+        ratings = self._store.ratings
+
+        for row in np.unique(indices).tolist():
+            rating = float(ratings[row])
+            old = self._indexed[row]
+            if rating != old:
+                self._index.remove((-old, row))
+                self._index.insert((-rating, row))
+                self._indexed[row] = rating
+
+    def _sync(
+            self
+    ) -> None:
+        """
+        Applies the decay due since the last settled day and adds the agents appended
+        to the store since the last call.
+        """
+        store = self._store
+        if store.day != self._settled_day:
+            self._settled_day = store.day
+            store.settle()  # Decayed rows come back through _reposition
+
+        ratings = store.ratings
+        for row in range(len(self._indexed), len(ratings)):
+            rating = float(ratings[row])
+            self._indexed.append(rating)
+            self._index.insert((-rating, row))
+
+    def _entry(
+            self, 
+            key: Tuple[float, int]
+    ) -> Tuple[str, float]:
+        """
+        Converts an index key into an (ID, rating) pair.
+        """
+        return self._store.id_of(key[1]), -key[0]
+
+    def rank_of(
+            self, 
+            id: str
+    ) -> int:
+        """
+        Returns the 1-based rank of an agent (1 is the highest rating).
+        """
+        self._sync()
+        row = self._store.index_of(id)
+
+        return self._index.position((-self._indexed[row], row)) + 1
+
+    def top(
+            self, 
+            k: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns the (ID, rating) of the ``k`` highest-rated agents, best first.
+        """
+        self._sync()
+
+        return [self._entry(key) for key in self._index.slice(0, k)]
+
+    def percentile(
+            self, 
+            id: str
+    ) -> float:
+        """
+        Returns the share of agents ranked below the given agent, in percent.
+        """
+        n = len(self)
+
+        return 100.0 * (n - self.rank_of(id)) / n
+
+    def around(
+            self, 
+            id: str, 
+            radius: int
+    ) -> List[Tuple[int, str, float]]:
+        """
+        Returns the (rank, ID, rating) of the agents ranked within ``radius`` places of an agent.
+        """
+        rank = self.rank_of(id)
+        start = max(rank - 1 - radius, 0)
+        keys = self._index.slice(start, rank + radius)
+
+        return [(start + i + 1,) + self._entry(key) for i, key in enumerate(keys)]
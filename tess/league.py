@@ -0,0 +1,403 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, batch_deltas
+from .match_result import IndexedMatchResult, MatchResult
+from .rating_store import RatingStore, StoreAgent
+from .snapshot import load_snapshot, write_snapshot
+from .tess_core import TESSCore
+
+
+class LeagueTable:
+    """
+    One columnar rating table shared by many leagues (queues, regions, ...), each with its own parameters.
+
+    Every (league, agent ID) pair is a row of a single RatingStore, with a league
+    column giving the league of each row, so the same player has an independent
+    rating in every league they play in. The K, alpha and scale of the leagues are
+    kept as parameter vectors indexed by league, and ``update_games_batch`` looks
+    them up per match, so a batch mixing matches from many leagues is applied in the
+    same vectorized waves as a single-league batch. This replaces one TESSCore and
+    one collection of Agent objects per league.
+
+    Rows are keyed by ``"<league>/<agent ID>"`` strings in the store (league names
+    cannot contain ``/``), so the store works with everything built on string IDs:
+    Leaderboard and Predictor over ``store`` (ranking every league together), and
+    listeners such as HistoryRecorder or SQLiteStore registered on ``tess(league)``,
+    which ``update_game`` notifies. ``save`` writes the table as a rating snapshot
+    with the league parameters in its metadata, and ``load`` restores it; the league
+    column is rebuilt from the key prefixes, as in ``from_store``.
+
+    Attributes:
+        _store (RatingStore): Ratings of every (league, agent) row, keyed by ``"<league>/<agent ID>"``.
+        _league_of (np.ndarray): League index of each row (int32, same capacity as the store).
+        _names (List[str]): Name of each league.
+        _index (Dict[str, int]): League name -> league index.
+        _K (np.ndarray): K of each league.
+        _alpha (np.ndarray): Alpha of each league.
+        _scale (np.ndarray): Scale of each league.
+        _cores (List[TESSCore]): TESSCore with the parameters of each league.
+
+    Methods:
+        from_store(store, leagues): Rebuilds a table around a store keyed by ``"<league>/<agent ID>"``.
+        load(path): Restores a table written by ``save``.
+        save(path): Writes the table as a rating snapshot.
+        add_league(name, K, alpha, scale): Registers a league and its parameters.
+        leagues (property): Returns the league names, in index order.
+        store (property): Returns the RatingStore holding every row.
+        league_column (property): Returns the league index of every row.
+        tess(league): Returns the TESSCore of a league.
+        row(league, id): Returns the row of an agent in a league, adding it if needed.
+        agent(league, id): Returns a store-backed agent of a league.
+        ratings(league): Returns the ratings of a league's agents.
+        batch(matches): Builds a MatchBatch and its league column from (league, MatchResult) pairs.
+        update_game(league, match_res): Applies one match of a league.
+        update_games_batch(batch, leagues): Applies matches from any leagues in vectorized waves.
+        update_games(matches): Builds and applies a batch of (league, MatchResult) pairs.
+    """
+
+    def __init__(
+            self, 
+            init_rating: float = 1500, 
+            capacity: int = 1024
+    ):
+        """
+        Initializes an empty table without leagues.
+
+        Args:
+            init_rating (float, optional): Rating of new (league, agent) rows (default: 1500).
+            capacity (int, optional): Initial number of preallocated rows (default: 1024).
+        """
+        self._store = RatingStore(init_rating=init_rating, capacity=capacity)
+        self._league_of = np.empty(max(capacity, 1), dtype=np.int32)
+        self._names = []
+        self._index = {}
+        self._K = np.empty(0, dtype=np.float64)
+        self._alpha = np.empty(0, dtype=np.float64)
+        self._scale = np.empty(0, dtype=np.float64)
+        self._cores = []
+
+    @classmethod
+    def from_store(
+            cls, 
+            store: RatingStore, 
+            leagues: Sequence[dict]
+    ) -> "LeagueTable":
+        """
+        Rebuilds a table around an existing store whose rows are keyed by ``"<league>/<agent ID>"``.
+
+        Args:
+            store (RatingStore): The ratings of every (league, agent) row (used, not copied).
+            leagues (Sequence[dict]): Name, K, alpha and scale of each league, in index order
+                (as saved by ``save``).
+
+        Returns:
+            LeagueTable: The table, with the league column rebuilt from the key prefixes.
+
+        Raises:
+            ValueError: If a row's key does not start with one of the leagues.
+        """
+        table = cls(init_rating=store.init_rating, capacity=1)
+        for league in leagues:
+            table.add_league(league["name"], K=league["K"], alpha=league["alpha"], scale=league["scale"])
+
+        index = table._index
+        league_of = np.empty(max(len(store), 1), dtype=np.int32)
+        for row in range(len(store)):
+            key = store.id_of(row)
+            league, separator, _ = key.partition("/")
+            league_index = index.get(league)
+            if league_index is None or not separator:
+                raise ValueError(f"Row {key} does not belong to any league of the table.")
+            league_of[row] = league_index
+
+        table._store = store
+        table._league_of = league_of
+
+        return table
+
+    @classmethod
+    def load(
+            cls, 
+            path: str, 
+            init_rating: float = 1500
+    ) -> "LeagueTable":
+        """
+        Restores a table written by ``save`` (see ``load_snapshot`` and ``from_store``).
+
+        Args:
+            path (str): Path of the snapshot.
+            init_rating (float, optional): Rating of (league, agent) rows added after loading (default: 1500).
+
+        Returns:
+            LeagueTable: The restored table.
+
+        Raises:
+            ValueError: If the snapshot was not written by ``LeagueTable.save``.
+        """
+        store, _, meta = load_snapshot(path, init_rating=init_rating)
+        if "leagues" not in meta:
+            raise ValueError(f"{path} is not a LeagueTable snapshot.")
+
+        return cls.from_store(store, meta["leagues"])
+
+    def save(
+            self, 
+            path: str
+    ) -> None:
+        """
+        Atomically writes the table as a rating snapshot (see ``write_snapshot``).
+
+        The ratings and decay state are the store's; the name and parameters of every
+        league are saved in the snapshot metadata.
+        """
+        leagues = [
+            {"name": name, "K": float(K), "alpha": float(alpha), "scale": float(scale)}
+            for name, K, alpha, scale in zip(self._names, self._K, self._alpha, self._scale)
+        ]
+
+        write_snapshot(path, self._store, TESSCore(), {"leagues": leagues})
+
+    def add_league(
+            self, 
+            name: str, 
+            K: float = 32, 
+            alpha: float = 0.7, 
+            scale: int = 400
+    ) -> int:
+        """
+        Registers a league with its own TESS parameters.
+
+        Args:
+            name (str): Unique name of the league.
+            K (float, optional): Elo rating adjustment factor (default: 32).
+            alpha (float, optional): Weight for team vs. individual performance (default: 0.7).
+            scale (int, optional): Scaling factor for Elo calculations (default: 400).
+
+        Returns:
+            int: The league index.
+        """
+        if name in self._index:
+            raise ValueError(f"League {name} already exists.")
+
+        if "/" in name:
+            raise ValueError("League names cannot contain '/'.")
+
+        index = len(self._names)
+        self._names.append(name)
+        self._index[name] = index
+        self._K = np.append(self._K, K)
+        self._alpha = np.append(self._alpha, alpha)
+        self._scale = np.append(self._scale, scale)
+        self._cores.append(TESSCore(K=K, alpha=alpha, scale=scale))
+
+        return index
+
+    @property
+    def leagues(
+        self
+    ) -> List[str]:
+        """
+        Returns the league names, in index order.
+        """
+        return self._names
+
+    @property
+    def store(
+        self
+    ) -> RatingStore:
+        """
+        Returns the RatingStore holding every (league, agent) row.
+        """
+        return self._store
+
+    @property
+    def league_column(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the league index of every row (a view, not a copy).
+        """
+        return self._league_of[:len(self._store)]
+
+    def tess(
+            self, 
+            league: str
+    ) -> TESSCore:
+        """
+        Returns the TESSCore with the parameters of a league (one per league, so
+        listeners and instrumentation can be attached to it).
+        """
+        return self._cores[self._index[league]]
+
+    def row(
+            self, 
+            league: str, 
+            id: str
+    ) -> int:
+        """
+        Returns the row of an agent in a league, adding it with the initial rating if needed.
+
+        Raises:
+            KeyError: If the league was never added.
+        """
+        league_index = self._index[league]
+        store = self._store
+        key = f"{league}/{id}"
+
+        row = store.find(key)
+        if row is None:
+            row = store.add(key)
+            if row == len(self._league_of):
+                self._league_of = np.resize(self._league_of, 2 * len(self._league_of))
+            self._league_of[row] = league_index
+
+        return row
+
+    def agent(
+            self, 
+            league: str, 
+            id: str
+    ) -> StoreAgent:
+        """
+        Returns a store-backed view of an agent's rating in a league (adding it if needed).
+        """
+        return StoreAgent(self._store, self.row(league, id))
+
+    def ratings(
+            self, 
+            league: str
+    ) -> Dict[str, float]:
+        """
+        Returns the rating of every agent of a league, keyed by agent ID.
+        """
+        rows = np.flatnonzero(self.league_column == self._index[league])
+        store = self._store
+        store.settle(rows)
+        ratings = store.ratings[rows].tolist()
+
+        prefix = len(league) + 1
+
+        return {store.id_of(row)[prefix:]: rating for row, rating in zip(rows.tolist(), ratings)}
+
+    def batch(
+            self, 
+            matches: Sequence[Tuple[str, MatchResult]]
+    ) -> Tuple[MatchBatch, np.ndarray]:
+        """
+        Builds a batch over the table's rows from (league, MatchResult) pairs.
+
+        Args:
+            matches (Sequence[Tuple[str, MatchResult]]): League and result of each match, in order.
+
+        Returns:
+            Tuple[MatchBatch, np.ndarray]: The batch and the league index of each match.
+        """
+        batch = MatchBatch.from_lists(
+            members_A=[[self.row(league, id) for id in m.rankings_A] for league, m in matches], 
+            members_B=[[self.row(league, id) for id in m.rankings_B] for league, m in matches], 
+            ranks_A=[list(m.rankings_A.values()) for _, m in matches], 
+            ranks_B=[list(m.rankings_B.values()) for _, m in matches], 
+            outcomes=[m.team_A_outcome.value for _, m in matches]
+        )
+        leagues = np.fromiter((self._index[league] for league, _ in matches), dtype=np.int64, count=len(matches))
+
+        return batch, leagues
+
+    def update_game(
+            self, 
+            league: str, 
+            match_res: MatchResult
+    ) -> Tuple[List[float], List[float]]:
+        """
+        Applies one match of a league with that league's parameters.
+
+        The rosters are the keys of the rankings, as in match logs. Listeners of the
+        league's TESSCore (``tess(league)``) are notified with the applied match.
+
+        Args:
+            league (str): The league of the match.
+            match_res (MatchResult): Match outcomes and individual rankings.
+
+        Returns:
+            Tuple[List[float], List[float]]: The deltas applied to team A's and team B's agents.
+        """
+        # Rows are keyed by (league, ID), so the result is addressed by row instead of ID.
+        indexed = IndexedMatchResult(
+            team_A_outcome=match_res.team_A_outcome, 
+            members_A=[self.row(league, id) for id in match_res.rankings_A], 
+            ranks_A=list(match_res.rankings_A.values()), 
+            members_B=[self.row(league, id) for id in match_res.rankings_B], 
+            ranks_B=list(match_res.rankings_B.values()), 
+            match_id=match_res.match_id
+        )
+        team_A = self._store.team_at(indexed.members_A)
+        team_B = self._store.team_at(indexed.members_B)
+        tess = self.tess(league)
+        deltas_A, deltas_B = tess.compute_deltas(team_A, team_B, indexed)
+
+        for team, deltas in ((team_A, deltas_A), (team_B, deltas_B)):
+            for agent, delta in zip(team.agents, deltas):
+                agent.update_rating(delta)
+
+        tess._notify_listeners(team_A, team_B, indexed, deltas_A, deltas_B)
+
+        return deltas_A, deltas_B
+
+    def update_games_batch(
+            self, 
+            batch: MatchBatch, 
+            leagues: np.ndarray
+    ) -> np.ndarray:
+        """
+        Applies matches from any number of leagues in vectorized waves.
+
+        Each wave gathers the K, alpha and scale of its matches' leagues into
+        per-match vectors for ``batch_deltas``. Rows of different leagues never
+        overlap, so matches of different leagues always share a wave and the result
+        equals applying each league's matches sequentially with its own TESSCore, up
+        to floating-point rounding.
+
+        Args:
+            batch (MatchBatch): The matches, over the table's rows (see ``batch``), in order.
+            leagues (np.ndarray): League index of each match.
+
+        Returns:
+            np.ndarray: The updated ratings of every row.
+        """
+        leagues = np.asarray(leagues, dtype=np.int64)
+        if len(leagues) != len(batch):
+            raise ValueError("leagues must hold one league index per match.")
+
+        store = self._store
+        store.settle(batch.members)
+        ratings = store.ratings
+
+        for wave in batch.waves():
+            sub_batch = batch.take(wave)
+            wave_leagues = leagues[wave]
+            # Matches in a wave are agent-disjoint, so members are unique here.
+            ratings[sub_batch.members] += batch_deltas(
+                ratings=ratings, 
+                batch=sub_batch, 
+                K=self._K[wave_leagues], 
+                alpha=self._alpha[wave_leagues], 
+                scale=self._scale[wave_leagues]
+            )
+
+        store.touch(batch.members)
+        store.notify(batch.members)
+
+        return ratings
+
+    def update_games(
+            self, 
+            matches: Sequence[Tuple[str, MatchResult]]
+    ) -> np.ndarray:
+        """
+        Applies (league, MatchResult) pairs from any leagues in one batch (see ``update_games_batch``).
+        """
+        batch, leagues = self.batch(matches)
+
+        return self.update_games_batch(batch, leagues)
@@ -0,0 +1,484 @@
+import array
+import mmap
+import os
+import struct
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from .batch import MatchBatch
+from .id_registry import IdRegistry
+from .ingest import read_match_log
+from .match_outcome import MatchOutcome
+from .match_result import IndexedMatchResult, MatchResult
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+MATCH_LOG_MAGIC = b"TESSMLOG"
+MATCH_LOG_VERSION = 1
+
+# magic, version, reserved (little-endian)
+_HEADER = struct.Struct("<8sII")
+
+# tag, number of newly interned IDs, matches, members, bytes of the new-ID blob
+_CHUNK = struct.Struct("<4sIQQQ")
+_CHUNK_TAG = b"CHNK"
+
+
+def _align(
+        offset: int, 
+        alignment: int = 8
+) -> int:
+    """
+    Rounds an offset up to the next multiple of ``alignment``.
+    """
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _chunk_layout(
+        offset: int, 
+        n_new_ids: int, 
+        n_matches: int, 
+        n_members: int, 
+        blob_length: int
+) -> dict:
+    """
+    Returns the absolute offset of every section of a chunk starting at ``offset``, and its end.
+
+    Sections follow the chunk header, each 8-byte aligned: the offsets of the new IDs
+    (uint64, relative to the blob), the UTF-8 ID blob, the outcome codes (uint8), the
+    team offsets (int64, 2 * matches + 1), the members (int32) and the ranks (int16).
+    """
+    layout = {"id_offsets": offset + _CHUNK.size}
+    layout["blob"] = layout["id_offsets"] + 8 * (n_new_ids + 1)
+    layout["outcomes"] = _align(layout["blob"] + blob_length)
+    layout["team_offsets"] = _align(layout["outcomes"] + n_matches)
+    layout["members"] = layout["team_offsets"] + 8 * (2 * n_matches + 1)
+    layout["ranks"] = _align(layout["members"] + 4 * n_members)
+    layout["end"] = _align(layout["ranks"] + 2 * n_members)
+
+    return layout
+
+
+class MatchLogWriter:
+    """
+    Appends matches to a binary, chunked, columnar match log.
+
+    Matches are buffered in typed arrays and written every ``chunk_size`` matches as
+    one chunk holding, column by column, the outcome code of team A (0 loss, 1 draw,
+    2 win), the team offsets, the interned agent indices (int32) and the ranks
+    (int16). Agent IDs are interned in the order they are first seen; each chunk
+    also stores the IDs it interned, so the file is self-contained and can be
+    appended to. Read it back with ``MatchLogReader``.
+
+    Attributes:
+        _path (str): Path of the log.
+        _file (BinaryIO): The log, opened for appending.
+        _registry (IdRegistry): Interned agent IDs.
+        _n_saved_ids (int): Number of IDs already written to the log.
+        _chunk_size (int): Number of matches per chunk.
+        _outcomes (array.array): Buffered outcome codes.
+        _sizes (array.array): Buffered team sizes (team A then team B of each match).
+        _members (array.array): Buffered agent indices.
+        _ranks (array.array): Buffered ranks.
+
+    Methods:
+        registry (property): Returns the registry interning the agent IDs.
+        write(match_res): Appends a MatchResult or IndexedMatchResult.
+        flush(): Writes the buffered matches as a new chunk.
+        close(): Flushes the buffered matches and closes the log.
+    """
+
+    def __init__(
+            self, 
+            path: str, 
+            chunk_size: int = 65536
+    ):
+        """
+        Opens the log in ``path``, creating it if needed; existing chunks are kept and appended to.
+
+        A chunk left incomplete by a crash is truncated away before appending.
+
+        Args:
+            path (str): Path of the log.
+            chunk_size (int, optional): Number of matches per chunk (default: 65536).
+        """
+        self._path = path
+        self._chunk_size = chunk_size
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            reader = MatchLogReader(path)
+            self._registry = reader.registry()
+            end = reader.end
+            reader.close()
+
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._registry = IdRegistry()
+            self._file = open(path, "wb")
+            self._file.write(_HEADER.pack(MATCH_LOG_MAGIC, MATCH_LOG_VERSION, 0))
+
+        self._n_saved_ids = len(self._registry)
+        self._outcomes = array.array("B")
+        self._sizes = array.array("q")
+        self._members = array.array("i")
+        self._ranks = array.array("h")
+
+    def __enter__(
+            self
+    ) -> "MatchLogWriter":
+        """
+        Returns the writer itself; the log is flushed and closed when the block exits.
+        """
+        return self
+
+    def __exit__(
+            self, 
+            *exc_info
+    ) -> None:
+        """
+        Flushes and closes the log.
+        """
+        self.close()
+
+    @property
+    def registry(
+        self
+    ) -> IdRegistry:
+        """
+        Returns the registry interning the agent IDs of the log.
+        """
+        return self._registry
+
+    def write(
+            self, 
+            match_res: Union[MatchResult, IndexedMatchResult]
+    ) -> None:
+        """
+        Appends one match.
+
+        The rosters of a MatchResult are the keys of its rankings, interned in order;
+        the member indices of an IndexedMatchResult must come from ``registry``.
+
+        Args:
+            match_res (Union[MatchResult, IndexedMatchResult]): The match to append.
+        """
+        if isinstance(match_res, MatchResult):
+            match_res = IndexedMatchResult.from_match_result(match_res, self._registry)
+
+        self._outcomes.append(int(2 * match_res.team_A_outcome.value))
+        self._sizes.append(len(match_res.members_A))
+        self._sizes.append(len(match_res.members_B))
+        self._members.extend(match_res.members.tolist())
+        self._ranks.extend(match_res.ranks.tolist())
+
+        if len(self._outcomes) >= self._chunk_size:
+            self.flush()
+
+    def flush(
+            self
+    ) -> None:
+        """
+        Writes the buffered matches as a new chunk (no-op if the buffer is empty).
+        """
+        if not self._outcomes:
+            return
+
+        # Step 1: IDs interned since the previous chunk
+        encoded = [id.encode("utf-8") for id in self._registry.ids[self._n_saved_ids:]]
+        blob = b"".join(encoded)
+        id_offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(id) for id in encoded], out=id_offsets[1:])
+
+        # Step 2: Team offsets relative to the chunk
+        n_matches = len(self._outcomes)
+        team_offsets = np.zeros(2 * n_matches + 1, dtype="<i8")
+        np.cumsum(self._sizes, out=team_offsets[1:])
+
+        # Step 3: Header and sections, padded to their aligned offsets
+        start = self._file.tell()
+        layout = _chunk_layout(start, len(encoded), n_matches, len(self._members), len(blob))
+        sections = [
+            ("id_offsets", id_offsets.tobytes()), 
+            ("blob", blob), 
+            ("outcomes", self._outcomes.tobytes()), 
+            ("team_offsets", team_offsets.tobytes()), 
+            ("members", np.asarray(self._members, dtype="<i4").tobytes()), 
+            ("ranks", np.asarray(self._ranks, dtype="<i2").tobytes())
+        ]
+
+        parts = [_CHUNK.pack(_CHUNK_TAG, len(encoded), n_matches, len(self._members), len(blob))]
+        position = start + _CHUNK.size
+        for name, data in sections:
+            parts.append(b"\0" * (layout[name] - position))
+            parts.append(data)
+            position = layout[name] + len(data)
+        parts.append(b"\0" * (layout["end"] - position))
+
+        self._file.write(b"".join(parts))
+        self._file.flush()
+
+        self._n_saved_ids = len(self._registry)
+        self._outcomes = array.array("B")
+        self._sizes = array.array("q")
+        self._members = array.array("i")
+        self._ranks = array.array("h")
+
+    def close(
+            self
+    ) -> None:
+        """
+        Flushes the buffered matches and closes the log.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class MatchLogReader:
+    """
+    Reads a binary match log written by ``MatchLogWriter`` through ``mmap``.
+
+    Opening the log only walks the chunk headers and decodes the interned IDs; the
+    team offsets, members and ranks of a chunk are returned as read-only array
+    views of the mapped file, so they go to ``TESSCore.update_games_batch`` without
+    being parsed or copied. Only the outcome codes (one byte per match) are decoded.
+    A trailing chunk left incomplete by a crash is ignored.
+
+    Attributes:
+        _buffer (mmap.mmap): The mapped log.
+        _chunks (List[dict]): Layout and match count of each complete chunk.
+        _ids (List[str]): Agent ID of each interned index.
+        _end (int): Byte offset right after the last complete chunk.
+
+    Methods:
+        ids (property): Returns the agent ID of each interned index.
+        registry(): Returns an IdRegistry holding the interned IDs.
+        n_chunks (property): Returns the number of chunks.
+        chunk(i): Returns the matches of one chunk as a MatchBatch.
+        batches(): Yields the MatchBatch of every chunk, in order.
+        results(): Yields every match as an IndexedMatchResult.
+        apply(tess, store): Applies the whole log to the ratings of a store.
+        close(): Unmaps the log.
+    """
+
+    def __init__(
+            self, 
+            path: str
+    ):
+        """
+        Maps the log in ``path`` and indexes its chunks.
+
+        Args:
+            path (str): Path of the log.
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a TESS match log.")
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != MATCH_LOG_MAGIC:
+            raise ValueError(f"{path} is not a TESS match log.")
+
+        if version != MATCH_LOG_VERSION:
+            raise ValueError(f"Unsupported match log version {version} in {path}.")
+
+        self._buffer = buffer
+        self._chunks = []
+        self._ids = []
+
+        offset = _HEADER.size
+        while offset + _CHUNK.size <= size:
+            tag, n_new_ids, n_matches, n_members, blob_length = _CHUNK.unpack_from(buffer, offset)
+            layout = _chunk_layout(offset, n_new_ids, n_matches, n_members, blob_length)
+            if tag != _CHUNK_TAG or layout["end"] > size:
+                break  # Incomplete trailing chunk
+
+            id_offsets = np.frombuffer(buffer, dtype="<u8", count=n_new_ids + 1, offset=layout["id_offsets"]).tolist()
+            blob = buffer[layout["blob"]:layout["blob"] + blob_length]
+            self._ids.extend(blob[start:end].decode("utf-8") for start, end in zip(id_offsets, id_offsets[1:]))
+
+            layout["n_matches"] = n_matches
+            layout["n_members"] = n_members
+            self._chunks.append(layout)
+            offset = layout["end"]
+
+        self._end = offset
+
+    @property
+    def ids(
+        self
+    ) -> List[str]:
+        """
+        Returns the agent ID of each interned index.
+        """
+        return self._ids
+
+    def registry(
+            self
+    ) -> IdRegistry:
+        """
+        Returns a new IdRegistry holding the interned IDs, in index order.
+        """
+        return IdRegistry(self._ids)
+
+    @property
+    def end(
+        self
+    ) -> int:
+        """
+        Returns the byte offset right after the last complete chunk.
+        """
+        return self._end
+
+    @property
+    def n_chunks(
+        self
+    ) -> int:
+        """
+        Returns the number of complete chunks.
+        """
+        return len(self._chunks)
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of matches in the log.
+        """
+        return sum(layout["n_matches"] for layout in self._chunks)
+
+    def chunk(
+            self, 
+            i: int
+    ) -> MatchBatch:
+        """
+        Returns the matches of chunk ``i`` as a MatchBatch over views of the mapped file.
+
+        Member indices are the log's interned indices (see ``ids``).
+        """
+        layout = self._chunks[i]
+        buffer = self._buffer
+        n_matches = layout["n_matches"]
+        n_members = layout["n_members"]
+
+        outcomes = np.frombuffer(buffer, dtype=np.uint8, count=n_matches, offset=layout["outcomes"])
+
+        return MatchBatch(
+            members=np.frombuffer(buffer, dtype="<i4", count=n_members, offset=layout["members"]), 
+            team_offsets=np.frombuffer(buffer, dtype="<i8", count=2 * n_matches + 1, offset=layout["team_offsets"]), 
+            ranks=np.frombuffer(buffer, dtype="<i2", count=n_members, offset=layout["ranks"]), 
+            outcomes=outcomes * 0.5
+        )
+
+    def batches(
+            self
+    ) -> Iterator[MatchBatch]:
+        """
+        Yields the MatchBatch of every chunk, in log order.
+        """
+        for i in range(len(self._chunks)):
+            yield self.chunk(i)
+
+    def results(
+            self
+    ) -> Iterator[IndexedMatchResult]:
+        """
+        Yields every match as an IndexedMatchResult whose ``match_id`` is its position in the log.
+
+        Pair each result with teams built from its members (e.g. ``RatingStore.team_at``)
+        to apply it with ``TESSCore.update_game``.
+        """
+        match_id = 0
+        for batch in self.batches():
+            members = batch.members
+            ranks = batch.ranks
+            offsets = batch.team_offsets.tolist()
+            outcomes = batch.outcomes.tolist()
+
+            for i, outcome in enumerate(outcomes):
+                start, split, end = offsets[2 * i:2 * i + 3]
+                yield IndexedMatchResult(
+                    team_A_outcome=MatchOutcome(outcome), 
+                    members_A=members[start:split], 
+                    ranks_A=ranks[start:split], 
+                    members_B=members[split:end], 
+                    ranks_B=ranks[split:end], 
+                    match_id=match_id
+                )
+                match_id += 1
+
+    def apply(
+            self, 
+            tess: TESSCore, 
+            store: RatingStore
+    ) -> RatingStore:
+        """
+        Applies every match of the log to the ratings of ``store``, chunk by chunk.
+
+        Agents missing from the store are added with its initial rating. When the
+        store's rows follow the log's interned indices (e.g. an empty store) the
+        mapped member columns are used as they are; otherwise they are remapped to
+        the store's rows. Store listeners are notified of every changed row.
+
+        Args:
+            tess (TESSCore): The rating system to apply.
+            store (RatingStore): The ratings to update.
+
+        Returns:
+            RatingStore: The updated store.
+        """
+        rows = np.fromiter((store.agent(id).index for id in self._ids), dtype=np.int64, count=len(self._ids))
+        remap = not np.array_equal(rows, np.arange(len(rows)))
+
+        for batch in self.batches():
+            if remap:
+                batch = MatchBatch(rows[batch.members], batch.team_offsets, batch.ranks, batch.outcomes)
+            store.settle(batch.members)
+            tess.update_games_batch(store.ratings, batch)
+            store.touch(batch.members)
+            store.notify(batch.members)
+
+        return store
+
+    def close(
+            self
+    ) -> None:
+        """
+        Unmaps the log, or leaves the mapping to be released with the last array view still in use.
+        """
+        try:
+            self._buffer.close()
+        except BufferError:
+            pass  # Batches returned by chunk() still reference the mapping
+
+
+def convert_match_log(
+        src: str, 
+        dst: str, 
+        fmt: str = None, 
+        chunk_size: int = 65536
+) -> int:
+    """
+    Converts a JSONL or CSV match log (see ``read_match_log``) to a binary match log.
+
+    Args:
+        src (str): Path of the JSONL or CSV log.
+        dst (str): Path of the binary log (appended to if it exists).
+        fmt (str, optional): "jsonl" or "csv" (default: inferred from the extension of ``src``).
+        chunk_size (int, optional): Number of matches per chunk (default: 65536).
+
+    Returns:
+        int: Number of matches converted.
+    """
+    n = 0
+    with MatchLogWriter(dst, chunk_size=chunk_size) as writer:
+        for match_res in read_match_log(src, fmt):
+            writer.write(match_res)
+            n += 1
+
+    return n
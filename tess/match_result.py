@@ -1,3 +1,8 @@
+from typing import Sequence
+
+import numpy as np
+
+from .id_registry import IdRegistry
 from .match_outcome import MatchOutcome
 
 
@@ -10,19 +15,22 @@ class MatchResult:
         _team_B_outcome (MatchOutcome): The outcome of team B, determined automatically from team A's outcome.
         _rankings_A (dict): A dictionary mapping agent IDs to their rankings in team A.
         _rankings_B (dict): A dictionary mapping agent IDs to their rankings in team B.
+        _match_id (int): Optional identifier of the match (None if not given).
     
     Methods:
         team_A_outcome (property): Returns the match outcome for team A.
         team_B_outcome (property): Returns the match outcome for team B.
         rankings_A (property): Returns the rankings of players in team A.
         rankings_B (property): Returns the rankings of players in team B.
+        match_id (property): Returns the identifier of the match, if any.
     """
 
     def __init__(
             self, 
             team_A_outcome: MatchOutcome, 
             rankings_A: dict, 
-            rankings_B: dict
+            rankings_B: dict,
+            match_id: int = None
     ):
         """
         Initializes a MatchResult instance with the outcomes and player rankings.
@@ -31,10 +39,12 @@ class MatchResult:
             team_A_outcome (MatchOutcome): The outcome of team A.
             rankings_A (dict): A dictionary mapping agent IDs to rankings in team A (1 is highest).
             rankings_B (dict): A dictionary mapping agent IDs to rankings in team B (1 is highest).
+            match_id (int, optional): Identifier of the match, e.g. its position in a match log (default: None).
         """
         self._team_A_outcome = team_A_outcome
         self._rankings_A = rankings_A
         self._rankings_B = rankings_B
+        self._match_id = match_id
 
         # Automatically determine team B's outcome based on team A's outcome
         if self._team_A_outcome == MatchOutcome.WIN:
@@ -81,3 +91,200 @@ class MatchResult:
         Returns the rankings of players in team B.
         """
         return self._rankings_B
+
+    @property
+    def match_id(
+        self
+    ) -> int:
+        """
+        Returns the identifier of the match (None if not given).
+        """
+        return self._match_id
+
+
+class IndexedMatchResult:
+    """
+    Compact MatchResult variant addressing players by interned index instead of ID.
+
+    Both teams' member indices are kept in one int32 array and their rankings in one
+    int16 array (team A first, then team B), so a queued result holds two small
+    arrays rather than two dicts of string IDs. Rankings are aligned with the
+    members, so applying the result needs no ID lookups (see ``TESSCore.update_game``).
+
+    Attributes:
+        _team_A_outcome (MatchOutcome): The outcome of team A (WIN, DRAW, LOSS).
+        _members (np.ndarray): Member indices of team A followed by those of team B (int32).
+        _ranks (np.ndarray): In-team rankings aligned with ``_members`` (int16, 1 is best).
+        _size_A (int): Number of members of team A.
+        _match_id (int): Optional identifier of the match (None if not given).
+
+    Methods:
+        from_match_result(match_res, registry): Interns the IDs of a MatchResult.
+        to_match_result(registry): Returns the equivalent MatchResult keyed by ID.
+        team_A_outcome (property): Returns the match outcome for team A.
+        team_B_outcome (property): Returns the match outcome for team B.
+        members (property): Returns the member indices of both teams, team A first.
+        ranks (property): Returns the rankings of both teams, aligned with members.
+        members_A (property): Returns the member indices of team A.
+        members_B (property): Returns the member indices of team B.
+        ranks_A (property): Returns the rankings of team A, aligned with members_A.
+        ranks_B (property): Returns the rankings of team B, aligned with members_B.
+        match_id (property): Returns the identifier of the match, if any.
+    """
+
+    __slots__ = ("_team_A_outcome", "_members", "_ranks", "_size_A", "_match_id")
+
+    def __init__(
+            self, 
+            team_A_outcome: MatchOutcome, 
+            members_A: Sequence[int], 
+            ranks_A: Sequence[int], 
+            members_B: Sequence[int], 
+            ranks_B: Sequence[int], 
+            match_id: int = None
+    ):
+        """
+        Initializes an IndexedMatchResult from member indices and aligned rankings.
+
+        Args:
+            team_A_outcome (MatchOutcome): The outcome of team A.
+            members_A (Sequence[int]): Interned indices of team A's members.
+            ranks_A (Sequence[int]): Rankings of team A, aligned with ``members_A`` (1 is highest).
+            members_B (Sequence[int]): Interned indices of team B's members.
+            ranks_B (Sequence[int]): Rankings of team B, aligned with ``members_B`` (1 is highest).
+            match_id (int, optional): Identifier of the match (default: None).
+        """
+        if len(members_A) != len(ranks_A) or len(members_B) != len(ranks_B):
+            raise ValueError("Rankings must be aligned with the members of each team.")
+
+        self._team_A_outcome = team_A_outcome
+        self._members = np.concatenate((members_A, members_B)).astype(np.int32)
+        self._ranks = np.concatenate((ranks_A, ranks_B)).astype(np.int16)
+        self._size_A = len(members_A)
+        self._match_id = match_id
+
+    @classmethod
+    def from_match_result(
+            cls, 
+            match_res: MatchResult, 
+            registry: IdRegistry
+    ) -> "IndexedMatchResult":
+        """
+        Builds the compact form of a MatchResult, interning its agent IDs.
+
+        Args:
+            match_res (MatchResult): The result keyed by agent ID.
+            registry (IdRegistry): Registry interning the IDs.
+
+        Returns:
+            IndexedMatchResult: The same result, members in the order of the rankings dicts.
+        """
+        rankings_A = match_res.rankings_A
+        rankings_B = match_res.rankings_B
+
+        return cls(
+            team_A_outcome=match_res.team_A_outcome, 
+            members_A=registry.intern_many(rankings_A), 
+            ranks_A=list(rankings_A.values()), 
+            members_B=registry.intern_many(rankings_B), 
+            ranks_B=list(rankings_B.values()), 
+            match_id=match_res.match_id
+        )
+
+    def to_match_result(
+            self, 
+            registry: IdRegistry
+    ) -> MatchResult:
+        """
+        Returns the equivalent MatchResult keyed by agent ID.
+
+        Args:
+            registry (IdRegistry): Registry that interned the member indices.
+        """
+        return MatchResult(
+            team_A_outcome=self._team_A_outcome, 
+            rankings_A={registry.id_of(i): r for i, r in zip(self.members_A.tolist(), self.ranks_A.tolist())}, 
+            rankings_B={registry.id_of(i): r for i, r in zip(self.members_B.tolist(), self.ranks_B.tolist())}, 
+            match_id=self._match_id
+        )
+
+    @property
+    def team_A_outcome(
+        self
+    ) -> MatchOutcome:
+        """
+        Returns the outcome of team A.
+        """
+        return self._team_A_outcome
+
+    @property
+    def team_B_outcome(
+        self
+    ) -> MatchOutcome:
+        """
+        Returns the outcome of team B (the complement of team A's).
+        """
+        return MatchOutcome(1.0 - self._team_A_outcome.value)
+
+    @property
+    def members(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the member indices of both teams, team A first.
+        """
+        return self._members
+
+    @property
+    def ranks(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the rankings of both teams, aligned with ``members``.
+        """
+        return self._ranks
+
+    @property
+    def members_A(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the member indices of team A (a view).
+        """
+        return self._members[:self._size_A]
+
+    @property
+    def members_B(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the member indices of team B (a view).
+        """
+        return self._members[self._size_A:]
+
+    @property
+    def ranks_A(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the rankings of team A, aligned with ``members_A`` (a view).
+        """
+        return self._ranks[:self._size_A]
+
+    @property
+    def ranks_B(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the rankings of team B, aligned with ``members_B`` (a view).
+        """
+        return self._ranks[self._size_A:]
+
+    @property
+    def match_id(
+        self
+    ) -> int:
+        """
+        Returns the identifier of the match (None if not given).
+        """
+        return self._match_id
@@ -0,0 +1,145 @@
+import bisect
+import time
+from typing import List
+
+from .agent import Agent
+from .team import Team
+from .tess_core import TESSCore
+
+
+class Matchmaker:
+    """
+    Splits a pool of agents into teams whose expected win probabilities are close to 0.5.
+
+    The team expectation in TESS only depends on the difference of average ratings,
+    so balancing teams means making their rating sums as equal as possible. Agents are
+    sorted once and dealt to teams in snake-draft order, which is already close to
+    balanced; a local search then swaps players between the strongest and weakest
+    team while it helps and the time budget allows.
+
+    Attributes:
+        _tess (TESSCore): The rating system whose expectations are balanced.
+        _time_budget (float): Seconds allowed for the local search.
+
+    Methods:
+        make_teams(agents, team_size): Splits a pool into balanced teams.
+        win_probability(team_A, team_B): Returns team A's expected score against team B.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            time_budget: float = 0.005
+    ):
+        """
+        Initializes the Matchmaker.
+
+        Args:
+            tess (TESSCore): The rating system whose expectations are balanced.
+            time_budget (float, optional): Seconds allowed for the local search (default: 0.005).
+        """
+        self._tess = tess
+        self._time_budget = time_budget
+
+    def win_probability(
+            self, 
+            team_A: Team, 
+            team_B: Team
+    ) -> float:
+        """
+        Returns team A's expected score against team B.
+        """
+        return self._tess._compute_team_expected(
+            team_rating=team_A.avg_rating(), 
+            opp_team_rating=team_B.avg_rating()
+        )
+
+    def make_teams(
+            self, 
+            agents: List[Agent], 
+            team_size: int
+    ) -> List[Team]:
+        """
+        Splits a pool of agents into balanced teams of ``team_size``.
+
+        If the pool does not divide evenly, the agents at the end of the pool are left
+        out, so earlier (e.g. longer-waiting) agents are placed first.
+
+        Args:
+            agents (List[Agent]): The pool of agents.
+            team_size (int): Number of agents per team.
+
+        Returns:
+            List[Team]: ``len(agents) // team_size`` teams with nearly equal average ratings.
+        """
+        n_teams = len(agents) // team_size if team_size > 0 else 0
+        if n_teams < 2:
+            raise ValueError("The pool must hold at least two full teams.")
+
+        deadline = time.perf_counter() + self._time_budget
+        pool = sorted(agents[:n_teams * team_size], key=lambda agent: agent.rating, reverse=True)
+
+        # Step 1: Snake draft (0, 1, ..., T-1, T-1, ..., 1, 0, ...) from the strongest agent down
+        rosters = [[] for _ in range(n_teams)]
+        for i, agent in enumerate(pool):
+            round_index, slot = divmod(i, n_teams)
+            team_index = slot if round_index % 2 == 0 else n_teams - 1 - slot
+            rosters[team_index].append(agent)
+
+        # Step 2: Local search between the strongest and the weakest team
+        # (rosters are kept sorted by rating, with a parallel list of ratings for bisect)
+        rosters = [sorted(roster, key=lambda agent: agent.rating) for roster in rosters]
+        ratings = [[agent.rating for agent in roster] for roster in rosters]
+        sums = [sum(team_ratings) for team_ratings in ratings]
+
+        while time.perf_counter() < deadline:
+            strong = max(range(n_teams), key=sums.__getitem__)
+            weak = min(range(n_teams), key=sums.__getitem__)
+            swap = self._best_swap(ratings[strong], ratings[weak], sums[strong] - sums[weak])
+            if swap is None:
+                break
+
+            i, j = swap
+            agent_i, r_i = rosters[strong].pop(i), ratings[strong].pop(i)
+            agent_j, r_j = rosters[weak].pop(j), ratings[weak].pop(j)
+
+            for team_index, agent, rating in ((strong, agent_j, r_j), (weak, agent_i, r_i)):
+                position = bisect.bisect_left(ratings[team_index], rating)
+                ratings[team_index].insert(position, rating)
+                rosters[team_index].insert(position, agent)
+                sums[team_index] += rating
+
+            sums[strong] -= r_i
+            sums[weak] -= r_j
+
+        return [Team(roster) for roster in rosters]
+
+    @staticmethod
+    def _best_swap(
+            strong: List[float], 
+            weak: List[float], 
+            gap: float
+    ) -> tuple:
+        """
+        Finds the swap between two sorted rating lists that most reduces their sum gap.
+
+        Swapping ratings ``s`` and ``w`` changes the gap to ``|gap - 2 * (s - w)|``, so for
+        each ``s`` the best partner is the ``w`` closest to ``s - gap / 2``.
+
+        Returns:
+            tuple: Positions (i, j) in ``strong`` and ``weak``, or None if no swap helps.
+        """
+        best = None
+        best_gap = gap
+
+        for i, s in enumerate(strong):
+            target = s - gap / 2
+            k = bisect.bisect_left(weak, target)
+            for j in (k - 1, k):
+                if 0 <= j < len(weak):
+                    new_gap = abs(gap - 2 * (s - weak[j]))
+                    if new_gap < best_gap - 1e-9:
+                        best = (i, j)
+                        best_gap = new_gap
+
+        return best
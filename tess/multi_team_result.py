@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+
+class MultiTeamResult:
+    """
+    Represents the outcome of a match between any number of teams (e.g. a battle royale of squads).
+
+    Every team has a placement (1 is best; equal placements are draws between those
+    teams) and in-team rankings of its players, as in ``MatchResult``.
+
+    Attributes:
+        _placements (List[int]): Placement of each team (1 is best).
+        _rankings (List[Dict[str, int]]): Mapping from agent IDs to in-team rankings, per team.
+        _match_id (int): Optional identifier of the match (None if not given).
+
+    Methods:
+        placements (property): Returns the placement of each team.
+        rankings (property): Returns the in-team rankings of each team.
+        n_teams (property): Returns the number of teams.
+        match_id (property): Returns the identifier of the match, if any.
+    """
+
+    def __init__(
+            self, 
+            placements: List[int], 
+            rankings: List[Dict[str, int]], 
+            match_id: int = None
+    ):
+        """
+        Initializes a MultiTeamResult with team placements and player rankings.
+
+        Args:
+            placements (List[int]): Placement of each team (1 is best; ties are draws).
+            rankings (List[Dict[str, int]]): For each team, in the same order, a dictionary
+                mapping agent IDs to rankings in that team (1 is highest).
+            match_id (int, optional): Identifier of the match (default: None).
+        """
+        if len(placements) != len(rankings):
+            raise ValueError("placements and rankings must describe the same teams.")
+
+        if len(placements) < 2:
+            raise ValueError("A match needs at least two teams.")
+
+        self._placements = list(placements)
+        self._rankings = list(rankings)
+        self._match_id = match_id
+
+    @property
+    def placements(
+        self
+    ) -> List[int]:
+        """
+        Returns the placement of each team (1 is best).
+        """
+        return self._placements
+
+    @property
+    def rankings(
+        self
+    ) -> List[Dict[str, int]]:
+        """
+        Returns the in-team rankings of each team.
+        """
+        return self._rankings
+
+    @property
+    def n_teams(
+        self
+    ) -> int:
+        """
+        Returns the number of teams.
+        """
+        return len(self._placements)
+
+    @property
+    def match_id(
+        self
+    ) -> int:
+        """
+        Returns the identifier of the match (None if not given).
+        """
+        return self._match_id
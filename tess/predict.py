@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .batch import _pairwise_expected
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+
+class Predictor:
+    """
+    Batch win-probability prediction with memoized team aggregates.
+
+    Rosters are lists of agent IDs of a RatingStore. For each roster the predictor
+    caches the team's average rating and its members' expected in-team scores. An
+    entry is only dropped when the rating of one of its members changes (the
+    predictor subscribes to the store's change notifications) or when the cache is
+    full, in which case the least recently used entry goes first. The rows of every
+    queried roster are settled first (``RatingStore.settle``), so pending inactivity
+    decay is applied and invalidates the affected entries before they are read.
+
+    Attributes:
+        _tess (TESSCore): The rating system whose expectations are computed.
+        _store (RatingStore): The ratings of the agents.
+        _max_entries (int): Maximum number of cached rosters.
+        _cache (OrderedDict): Roster (tuple of rows) -> (average rating, expected in-team scores).
+        _by_agent (Dict[int, Set[tuple]]): Row -> cached rosters containing that agent.
+
+    Methods:
+        predict(rosters_A, rosters_B): Scores many candidate matchups in one call.
+        team_rating(roster): Returns the (cached) average rating of a roster.
+        indiv_expected(roster): Returns the (cached) expected in-team score of each member.
+        close(): Stops listening to rating changes.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            store: RatingStore, 
+            max_entries: int = 100000
+    ):
+        """
+        Initializes the Predictor and subscribes it to the store's rating changes.
+
+        Args:
+            tess (TESSCore): The rating system whose expectations are computed.
+            store (RatingStore): The ratings of the agents.
+            max_entries (int, optional): Maximum number of cached rosters (default: 100000).
+        """
+        self._tess = tess
+        self._store = store
+        self._max_entries = max_entries
+        self._cache = OrderedDict()
+        self._by_agent = {}
+
+        store.subscribe(self._invalidate)
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops listening to rating changes (the cache must not be used afterwards).
+        """
+        self._store.unsubscribe(self._invalidate)
+
+    def _invalidate(
+            self, 
+            indices: np.ndarray
+    ) -> None:
+        """
+        Drops every cached roster containing one of the given rows.
+        """
+        for index in np.unique(indices).tolist():
+            for key in self._by_agent.pop(index, ()):
+                self._cache.pop(key, None)
+
+    def _aggregates(
+            self, 
+            rosters: Sequence[Sequence[str]]
+    ) -> List[Tuple[float, np.ndarray]]:
+        """
+        Returns (average rating, expected in-team scores) of each roster, computing
+        all missing entries in one vectorized pass.
+        """
+        store = self._store
+        keys = [tuple(store.index_of(id) for id in roster) for roster in rosters]
+        store.settle(np.fromiter((index for key in keys for index in key), dtype=np.int64))
+
+        # Step 1: Read the hits first, so inserting the missing rosters cannot evict them
+        entries = {}
+        for key in keys:
+            if key not in entries and key in self._cache:
+                self._cache.move_to_end(key)
+                entries[key] = self._cache[key]
+
+        # Step 2: Compute the missing rosters in one pass and cache them
+        missing = list(OrderedDict.fromkeys(key for key in keys if key not in entries))
+        if missing:
+            sizes = np.array([len(key) for key in missing], dtype=np.int64)
+            if np.any(sizes < 1):
+                raise ValueError("Every roster needs at least one member.")
+
+            members = np.fromiter((index for key in missing for index in key), dtype=np.int64)
+            starts = np.cumsum(sizes) - sizes
+            team_of = np.repeat(np.arange(len(missing)), sizes)
+            n = sizes[team_of]
+
+            r = store.ratings[members]
+            avg = np.add.reduceat(r, starts) / sizes
+            E_indiv = _pairwise_expected(r, avg[team_of], team_of, starts, n, self._tess.scale)
+            E_indiv = np.where(n > 1, E_indiv / np.maximum(n - 1, 1), 0.0)
+
+            for key, team_avg, start, size in zip(missing, avg.tolist(), starts.tolist(), sizes.tolist()):
+                entries[key] = (team_avg, E_indiv[start:start + size])
+                self._store_entry(key, entries[key])
+
+        return [entries[key] for key in keys]
+
+    def _store_entry(
+            self, 
+            key: tuple, 
+            entry: Tuple[float, np.ndarray]
+    ) -> None:
+        """
+        Caches an entry, evicting the least recently used one if the cache is full.
+        """
+        if len(self._cache) >= self._max_entries:
+            old_key, _ = self._cache.popitem(last=False)
+            for index in old_key:
+                rosters = self._by_agent.get(index)
+                if rosters is not None:
+                    rosters.discard(old_key)
+                    if not rosters:
+                        del self._by_agent[index]
+
+        self._cache[key] = entry
+        for index in key:
+            self._by_agent.setdefault(index, set()).add(key)
+
+    def team_rating(
+            self, 
+            roster: Sequence[str]
+    ) -> float:
+        """
+        Returns the average rating of a roster.
+        """
+        return self._aggregates([roster])[0][0]
+
+    def indiv_expected(
+            self, 
+            roster: Sequence[str]
+    ) -> np.ndarray:
+        """
+        Returns the expected in-team score of each member of a roster, in roster order.
+        """
+        return self._aggregates([roster])[0][1]
+
+    def predict(
+            self, 
+            rosters_A: Sequence[Sequence[str]], 
+            rosters_B: Sequence[Sequence[str]]
+    ) -> Tuple[np.ndarray, List[np.ndarray], List[np.ndarray]]:
+        """
+        Scores many candidate matchups (rosters_A[i] vs rosters_B[i]) in one vectorized call.
+
+        Args:
+            rosters_A (Sequence[Sequence[str]]): Agent IDs of team A of each candidate.
+            rosters_B (Sequence[Sequence[str]]): Agent IDs of team B of each candidate.
+
+        Returns:
+            Tuple[np.ndarray, List[np.ndarray], List[np.ndarray]]: Team A's expected score
+                for each candidate, and the expected in-team score of every member of
+                team A and of team B of each candidate.
+        """
+        if len(rosters_A) != len(rosters_B):
+            raise ValueError("rosters_A and rosters_B must have the same length.")
+
+        entries = self._aggregates(list(rosters_A) + list(rosters_B))
+        n = len(rosters_A)
+        avg = np.array([team_avg for team_avg, _ in entries], dtype=np.float64)
+
+        # Same formula as TESSCore._compute_team_expected, over all candidates at once
+        E_A = 1.0 / (1 + 10 ** ((avg[n:] - avg[:n]) / self._tess.scale))
+
+        return E_A, [E for _, E in entries[:n]], [E for _, E in entries[n:]]
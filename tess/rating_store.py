@@ -0,0 +1,584 @@
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+from .team import Team
+
+
+class StoreAgent:
+    """
+    Lightweight view of an agent whose rating lives in a RatingStore.
+
+    Behaves like an Agent (``id``, ``rating``, ``update_rating``) so it can be used in
+    a Team and passed to ``TESSCore.update_game``, but only holds a reference to the
+    store and its row index.
+
+    Attributes:
+        _store (RatingStore): The store holding the agent's rating.
+        _index (int): The agent's row in the store.
+
+    Methods:
+        id (property): Returns the agent's unique identifier.
+        index (property): Returns the agent's row in the store.
+        rating (property): Returns the agent's current Elo rating.
+        update_rating(delta: float): Adjusts the agent's rating by the given delta value.
+        __repr__(): Returns a string representation of the agent.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(
+            self, 
+            store: "RatingStore", 
+            index: int
+    ):
+        """
+        Initializes a view on row ``index`` of ``store``.
+
+        Args:
+            store (RatingStore): The store holding the agent's rating.
+            index (int): The agent's row in the store.
+        """
+        self._store = store
+        self._index = index
+
+    @property
+    def id(
+        self
+    ) -> str:
+        """
+        Returns the agent's unique identifier.
+        """
+        return self._store.id_of(self._index)
+
+    @property
+    def index(
+        self
+    ) -> int:
+        """
+        Returns the agent's row in the store.
+        """
+        return self._index
+
+    @property
+    def rating(
+        self
+    ) -> float:
+        """
+        Returns the agent's current Elo rating.
+        """
+        store = self._store
+        if store._decay_rate is not None:
+            store._settle_row(self._index)
+
+        return float(store._ratings[self._index])
+
+    def update_rating(
+            self, 
+            delta: float
+    ) -> None:
+        """
+        Updates the agent's rating by applying the given delta.
+
+        Args:
+            delta (float): The amount by which to adjust the agent's rating.
+        """
+        store = self._store
+        if store._decay_rate is not None:
+            store._settle_row(self._index)
+            store._last_active[self._index] = store._day
+            store._decays_applied[self._index] = 0
+
+        store._ratings[self._index] += delta
+
+        if store._listeners:
+            store.notify([self._index])
+
+    def __repr__(
+            self
+    ) -> str:
+        """
+        Returns a string representation of the agent.
+        """
+        return f"{self.id}: {self.rating:.2f}"
+
+
+class RatingStore:
+    """
+    Compact rating storage keeping every rating in one contiguous float64 array.
+
+    Agents are addressed by a dense row index, with an ID -> index map for lookups.
+    The ratings array can be handed directly to ``TESSCore.update_games_batch``, and
+    ``agent`` / ``team`` return store-backed views usable with ``TESSCore.update_game``.
+
+    Listeners registered with ``subscribe`` are told which rows changed. Updates
+    through store-backed agents notify them automatically; code writing to the
+    ``ratings`` array directly must call ``notify`` with the rows it changed.
+
+    With ``enable_decay``, every day boundary (``advance_day``) decays the rating of
+    each agent inactive for more than ``grace_days`` days toward a target,
+    ``r <- target + (1 - rate) * (r - target)``. Nothing is swept: the store keeps
+    each agent's last active day and applies the accumulated decay in closed form,
+    ``(1 - rate) ** days``, when a store-backed agent's rating is read or updated
+    (so when it enters ``TESSCore.update_game``). Code reading or writing the
+    ``ratings`` array directly calls ``settle`` first and ``touch`` after updating.
+
+    Attributes:
+        _init_rating (float): Rating given to newly added agents.
+        _ratings (np.ndarray): Backing array; only the first ``_size`` rows are in use.
+        _size (int): Number of agents in the store.
+        _ids (Sequence[str]): Agent ID of each row.
+        _index (Dict[str, int]): Mapping from agent ID to row (built on first lookup when None).
+        _listeners (List[Callable]): Callbacks receiving the rows whose rating changed.
+        _decay_rate (float): Fraction of the distance to the target lost per inactive day (None if disabled).
+        _decay_target (float): Rating that inactive agents decay toward.
+        _grace_days (int): Inactive days before decay starts.
+        _day (int): Current day.
+        _last_active (np.ndarray): Last day each row was updated (int64, same capacity as ``_ratings``).
+        _decays_applied (np.ndarray): Decay days already applied to each row since it was last active.
+
+    Methods:
+        from_arrays(ids, ratings): Wraps existing ID and rating columns without copying.
+        ratings (property): Returns the ratings of all agents as an array view.
+        init_rating (property): Returns the rating given to newly added agents.
+        add(id, rating): Adds an agent and returns its row index.
+        index_of(id): Returns the row index of an agent.
+        find(id): Returns the row index of an agent, or None if it is not in the store.
+        id_of(index): Returns the agent ID stored at a row.
+        agent(id): Returns a store-backed agent view, adding the agent if needed.
+        team(ids): Returns a Team of store-backed agents.
+        team_at(indices): Returns a Team of store-backed agents addressed by row.
+        subscribe(listener): Registers a callback for rating changes.
+        unsubscribe(listener): Removes a callback registered with subscribe.
+        notify(indices): Tells the listeners that the ratings of the given rows changed.
+        enable_decay(rate, target, grace_days): Enables lazy inactivity decay.
+        day (property): Returns the current day.
+        advance_day(days): Moves the clock forward.
+        settle(indices): Applies the pending decay of the given rows (all rows by default).
+        touch(indices): Marks the given rows as active today.
+        decay_state(): Returns the decay parameters, clock and per-row decay columns.
+        restore_decay(state, last_active, decays_applied): Restores a saved decay state.
+    """
+
+    def __init__(
+            self, 
+            init_rating: float = 1500, 
+            capacity: int = 1024
+    ):
+        """
+        Initializes an empty RatingStore.
+
+        Args:
+            init_rating (float, optional): Rating given to newly added agents (default: 1500).
+            capacity (int, optional): Initial number of preallocated rows (default: 1024).
+        """
+        self._init_rating = init_rating
+        self._ratings = np.empty(max(capacity, 1), dtype=np.float64)
+        self._size = 0
+        self._ids = []
+        self._index = {}
+        self._listeners = []
+        self._decay_rate = None  # Inactivity decay is disabled until enable_decay
+        self._decay_target = init_rating
+        self._grace_days = 0
+        self._day = 0
+        self._last_active = None
+        self._decays_applied = None
+
+    @classmethod
+    def from_arrays(
+            cls, 
+            ids: Sequence[str], 
+            ratings: np.ndarray, 
+            init_rating: float = 1500
+    ) -> "RatingStore":
+        """
+        Wraps existing ID and rating columns without copying them.
+
+        The ID -> row map is only built on the first lookup by ID, so wrapping a large
+        (e.g. memory-mapped) table is cheap as long as rows are addressed by index.
+
+        Args:
+            ids (Sequence[str]): Agent ID of each row.
+            ratings (np.ndarray): Float64 rating of each row.
+            init_rating (float, optional): Rating given to agents added later (default: 1500).
+
+        Returns:
+            RatingStore: A store backed by the given columns.
+        """
+        if len(ids) != len(ratings):
+            raise ValueError("ids and ratings must have the same length.")
+
+        store = cls(init_rating=init_rating, capacity=1)
+        store._ratings = ratings
+        store._size = len(ratings)
+        store._ids = ids
+        store._index = None
+
+        return store
+
+    def _id_index(
+            self
+    ) -> Dict[str, int]:
+        """
+        Returns the ID -> row map, building it on first use.
+        """
+        if self._index is None:
+            self._index = dict(zip(self._ids, range(len(self._ids))))
+
+        return self._index
+
+    @property
+    def ratings(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the ratings of all agents, indexed by row (a view, not a copy).
+        """
+        return self._ratings[:self._size]
+
+    @property
+    def init_rating(
+        self
+    ) -> float:
+        """
+        Returns the rating given to newly added agents.
+        """
+        return self._init_rating
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of agents in the store.
+        """
+        return self._size
+
+    def __contains__(
+            self, 
+            id: str
+    ) -> bool:
+        """
+        Returns whether an agent with the given ID is in the store.
+        """
+        return id in self._id_index()
+
+    def add(
+            self, 
+            id: str, 
+            rating: float = None
+    ) -> int:
+        """
+        Adds an agent to the store.
+
+        Args:
+            id (str): Unique identifier for the agent.
+            rating (float, optional): Initial rating (default: the store's init_rating).
+
+        Returns:
+            int: The row index of the new agent.
+        """
+        index_map = self._id_index()
+        if id in index_map:
+            raise ValueError(f"Agent {id} is already in the store.")
+
+        if not isinstance(self._ids, list):
+            self._ids = list(self._ids)  # Materialize a wrapped ID table before appending
+
+        if self._size == len(self._ratings):
+            grown = np.empty(2 * len(self._ratings), dtype=np.float64)
+            grown[:self._size] = self._ratings[:self._size]
+            self._ratings = grown
+
+        index = self._size
+        self._ratings[index] = self._init_rating if rating is None else rating
+
+        if self._decay_rate is not None:
+            if index == len(self._last_active):
+                self._last_active = np.resize(self._last_active, len(self._ratings))
+                self._decays_applied = np.resize(self._decays_applied, len(self._ratings))
+            self._last_active[index] = self._day
+            self._decays_applied[index] = 0
+        self._ids.append(id)
+        index_map[id] = index
+        self._size += 1
+
+        return index
+
+    def index_of(
+            self, 
+            id: str
+    ) -> int:
+        """
+        Returns the row index of the agent with the given ID.
+
+        Raises:
+            KeyError: If the agent is not in the store.
+        """
+        return self._id_index()[id]
+
+    def find(
+            self, 
+            id: str
+    ) -> int:
+        """
+        Returns the row index of the agent with the given ID (None if it is not in the
+        store; unlike ``agent``, it never adds the agent).
+        """
+        return self._id_index().get(id)
+
+    def id_of(
+            self, 
+            index: int
+    ) -> str:
+        """
+        Returns the ID of the agent stored at the given row.
+        """
+        return self._ids[index]
+
+    def agent(
+            self, 
+            id: str
+    ) -> StoreAgent:
+        """
+        Returns a store-backed view of an agent, adding it with the initial rating if needed.
+
+        Args:
+            id (str): Unique identifier for the agent.
+
+        Returns:
+            StoreAgent: A view on the agent's rating.
+        """
+        index = self.find(id)
+        if index is None:
+            index = self.add(id)
+
+        return StoreAgent(self, index)
+
+    def team(
+            self, 
+            ids: Iterable[str]
+    ) -> Team:
+        """
+        Returns a Team made of store-backed agents.
+
+        Args:
+            ids (Iterable[str]): IDs of the team members (added if not yet in the store).
+
+        Returns:
+            Team: The team, usable with ``TESSCore.update_game``.
+        """
+        return Team([self.agent(id) for id in ids])
+
+    def team_at(
+            self, 
+            indices: Iterable[int]
+    ) -> Team:
+        """
+        Returns a Team of store-backed agents addressed by row, without any ID lookup.
+
+        Pairs with ``IndexedMatchResult`` when the store's rows follow the registry
+        that interned the result (e.g. ``team_at(match_res.members_A)``).
+
+        Args:
+            indices (Iterable[int]): Rows of the team members, all already in the store.
+
+        Returns:
+            Team: The team, usable with ``TESSCore.update_game``.
+        """
+        return Team([StoreAgent(self, int(index)) for index in indices])
+
+    def subscribe(
+            self, 
+            listener: Callable[[np.ndarray], None]
+    ) -> None:
+        """
+        Registers a callback called with the rows whose rating changed.
+
+        Args:
+            listener (Callable[[np.ndarray], None]): Receives an array of row indices.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(
+            self, 
+            listener: Callable[[np.ndarray], None]
+    ) -> None:
+        """
+        Removes a callback registered with ``subscribe``.
+        """
+        self._listeners.remove(listener)
+
+    def notify(
+            self, 
+            indices: Sequence[int]
+    ) -> None:
+        """
+        Tells the listeners that the ratings of the given rows changed.
+
+        Args:
+            indices (Sequence[int]): The changed rows.
+        """
+        if not self._listeners:
+            return
+
+        indices = np.asarray(indices, dtype=np.int64)
+        for listener in self._listeners:
+            listener(indices)
+
+    def enable_decay(
+            self, 
+            rate: float, 
+            target: float = None, 
+            grace_days: int = 0
+    ) -> None:
+        """
+        Enables lazy inactivity decay; every agent in the store counts as active today.
+
+        Args:
+            rate (float): Fraction of the distance to ``target`` lost per inactive day.
+            target (float, optional): Rating inactive agents decay toward (default: the store's init_rating).
+            grace_days (int, optional): Inactive days before decay starts (default: 0).
+        """
+        if not 0 <= rate <= 1:
+            raise ValueError("The decay rate must be between 0 and 1.")
+
+        self._decay_rate = rate
+        self._decay_target = self._init_rating if target is None else target
+        self._grace_days = grace_days
+        self._last_active = np.full(len(self._ratings), self._day, dtype=np.int64)
+        self._decays_applied = np.zeros(len(self._ratings), dtype=np.int64)
+
+    @property
+    def day(
+        self
+    ) -> int:
+        """
+        Returns the current day.
+        """
+        return self._day
+
+    def advance_day(
+            self, 
+            days: int = 1
+    ) -> None:
+        """
+        Moves the clock forward by ``days`` day boundaries (O(1): decay is applied lazily).
+        """
+        if days < 0:
+            raise ValueError("The clock cannot move backward.")
+
+        self._day += days
+
+    def _settle_row(
+            self, 
+            index: int
+    ) -> None:
+        """
+        Applies the pending decay of one row.
+        """
+        # Boundaries ending days last_active + grace_days + 1 .. day - 1 decay the agent.
+        due = self._day - 1 - self._grace_days - int(self._last_active[index]) - int(self._decays_applied[index])
+        if due <= 0:
+            return
+
+        target = self._decay_target
+        self._ratings[index] = target + (1 - self._decay_rate) ** due * (self._ratings[index] - target)
+        self._decays_applied[index] += due
+
+        if self._listeners:
+            self.notify([index])
+
+    def settle(
+            self, 
+            indices: Sequence[int] = None
+    ) -> None:
+        """
+        Applies the pending decay of the given rows in one vectorized pass.
+
+        Call it before reading the ``ratings`` array directly, e.g. before a batch
+        update or a snapshot (without ``indices``, every row is settled).
+
+        Args:
+            indices (Sequence[int], optional): The rows to settle (default: all rows).
+        """
+        if self._decay_rate is None:
+            return
+
+        rows = np.arange(self._size) if indices is None else np.asarray(indices, dtype=np.int64)
+        due = self._day - 1 - self._grace_days - self._last_active[rows] - self._decays_applied[rows]
+        rows = rows[due > 0]
+        if not len(rows):
+            return
+
+        due = due[due > 0]
+        target = self._decay_target
+        self._ratings[rows] = target + (1 - self._decay_rate) ** due * (self._ratings[rows] - target)
+        # Assignments, not +=, so duplicated rows are counted once
+        self._decays_applied[rows] = self._decays_applied[rows] + due
+
+        self.notify(rows)
+
+    def touch(
+            self, 
+            indices: Sequence[int]
+    ) -> None:
+        """
+        Marks the given rows as active today (after updating their ratings directly).
+
+        Args:
+            indices (Sequence[int]): The updated rows.
+        """
+        if self._decay_rate is None:
+            return
+
+        self._last_active[indices] = self._day
+        self._decays_applied[indices] = 0
+
+    def decay_state(
+            self
+    ) -> Tuple[dict, np.ndarray, np.ndarray]:
+        """
+        Returns what is needed to save the decay state along with the ratings.
+
+        Settle the store first (``settle()``) so the saved ratings include every decay due.
+
+        Returns:
+            Tuple[dict, np.ndarray, np.ndarray]: The parameters and clock (``rate``,
+                ``target``, ``grace_days``, ``day``), and the last active day and the decay
+                days already applied of each row (views, not copies), or None if decay is disabled.
+        """
+        if self._decay_rate is None:
+            return None
+
+        state = {
+            "rate": self._decay_rate, 
+            "target": self._decay_target, 
+            "grace_days": self._grace_days, 
+            "day": self._day
+        }
+
+        return state, self._last_active[:self._size], self._decays_applied[:self._size]
+
+    def restore_decay(
+            self, 
+            state: dict, 
+            last_active: np.ndarray, 
+            decays_applied: np.ndarray
+    ) -> None:
+        """
+        Enables decay with a state saved by ``decay_state``, so inactivity clocks and
+        pending decay carry over a restart.
+
+        Args:
+            state (dict): The parameters and clock (``rate``, ``target``, ``grace_days``, ``day``).
+            last_active (np.ndarray): Last active day of each row.
+            decays_applied (np.ndarray): Decay days already applied to each row.
+        """
+        if len(last_active) != self._size or len(decays_applied) != self._size:
+            raise ValueError("The decay columns must hold one value per row.")
+
+        self._day = int(state["day"])
+        self.enable_decay(rate=state["rate"], target=state["target"], grace_days=state["grace_days"])
+        self._last_active[:self._size] = last_active
+        self._decays_applied[:self._size] = decays_applied
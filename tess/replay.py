@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, batch_deltas
+from .tess_core import TESSCore
+
+# Waves smaller than this are applied in the calling process, where IPC would cost more than it saves.
+MIN_PARALLEL_WAVE = 4096
+
+# Per-worker state set up by _init_worker: shared arrays and TESSCore parameters.
+_worker = {}
+
+
+def _share(
+        array: np.ndarray
+) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Copies an array into a new shared memory block.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, np.ndarray]: The block and an array view on it.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+
+    return block, view
+
+
+def _attach(
+        spec: Tuple[str, tuple, str]
+) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Attaches to a shared array described by (block name, shape, dtype).
+    """
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(
+        specs: Dict[str, Tuple[str, tuple, str]], 
+        params: Tuple[float, float, float]
+) -> None:
+    """
+    Attaches a pool worker to the shared ratings and batch columns.
+    """
+    blocks = []
+    arrays = {}
+    for key, spec in specs.items():
+        block, arrays[key] = _attach(spec)
+        blocks.append(block)
+
+    _worker["blocks"] = blocks  # Keep the blocks open for the lifetime of the worker
+    _worker["ratings"] = arrays.pop("ratings")
+    _worker["batch"] = MatchBatch(**arrays)
+    _worker["params"] = params
+
+
+def _apply_chunk(
+        ratings: np.ndarray, 
+        batch: MatchBatch, 
+        match_indices: np.ndarray, 
+        params: Tuple[float, float, float]
+) -> None:
+    """
+    Applies a set of agent-disjoint matches of ``batch`` to ``ratings`` in place.
+    """
+    K, alpha, scale = params
+    sub_batch = batch.take(match_indices)
+    deltas = batch_deltas(ratings=ratings, batch=sub_batch, K=K, alpha=alpha, scale=scale)
+    ratings[sub_batch.members] += deltas
+
+
+def _worker_apply(
+        match_indices: np.ndarray
+) -> None:
+    """
+    Pool task: applies a chunk of a wave to the shared ratings.
+    """
+    _apply_chunk(_worker["ratings"], _worker["batch"], match_indices, _worker["params"])
+
+
+def replay_parallel(
+        tess: TESSCore, 
+        ratings: np.ndarray, 
+        batch: MatchBatch, 
+        processes: int = None, 
+        min_parallel_wave: int = MIN_PARALLEL_WAVE
+) -> np.ndarray:
+    """
+    Replays a match history across a process pool over shared-memory ratings.
+
+    The history is split into waves of agent-disjoint matches (see ``MatchBatch.waves``),
+    which keeps the order of matches sharing an agent. Each wave is cut into one chunk
+    per worker; since no two matches of a wave touch the same agent, workers update
+    the shared ratings array without conflicts, and waves are separated by a barrier.
+    Every match is evaluated with the same kernel as ``TESSCore.update_games_batch``,
+    so the result is identical to a sequential replay.
+
+    Args:
+        tess (TESSCore): The rating system whose parameters are used.
+        ratings (np.ndarray): Float64 ratings indexed by agent index, updated in place.
+        batch (MatchBatch): The match history, in chronological order.
+        processes (int, optional): Number of worker processes (default: ``os.cpu_count()``).
+        min_parallel_wave (int, optional): Waves with fewer matches are applied in the
+            calling process (default: MIN_PARALLEL_WAVE).
+
+    Returns:
+        np.ndarray: The updated ``ratings`` array.
+    """
+    processes = processes or os.cpu_count() or 1
+    params = (tess.K, tess.alpha, tess.scale)
+    columns = {
+        "ratings": np.ascontiguousarray(ratings, dtype=np.float64), 
+        "members": batch.members, 
+        "team_offsets": batch.team_offsets, 
+        "ranks": batch.ranks, 
+        "outcomes": batch.outcomes, 
+    }
+
+    blocks = []
+    shared = {}
+    try:
+        for key, array in columns.items():
+            block, shared[key] = _share(array)
+            blocks.append(block)
+
+        specs = {
+            key: (block.name, array.shape, array.dtype.str)
+            for block, (key, array) in zip(blocks, shared.items())
+        }
+        shared_ratings = shared["ratings"]
+        waves = batch.waves()
+
+        pool = None
+        if processes > 1 and any(len(wave) >= min_parallel_wave for wave in waves):
+            pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(specs, params))
+
+        try:
+            for wave in waves:
+                if pool is None or len(wave) < min_parallel_wave:
+                    _apply_chunk(shared_ratings, batch, wave, params)
+                else:
+                    # map blocks until every chunk is applied: the barrier between waves.
+                    pool.map(_worker_apply, np.array_split(wave, processes))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        ratings[...] = shared_ratings
+        del shared_ratings
+
+    finally:
+        shared.clear()  # Drop the views so the blocks can be closed
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return ratings
@@ -0,0 +1,378 @@
+import asyncio
+import json
+from typing import List, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, batch_deltas
+from .ingest import parse_match_record
+from .match_result import MatchResult
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+
+def _check_match(
+        match_res: MatchResult
+) -> None:
+    """
+    Rejects a match that cannot be applied, before it touches the store or joins a micro-batch.
+
+    Raises:
+        ValueError: If a team has no players or a player is on both teams.
+    """
+    if not match_res.rankings_A or not match_res.rankings_B:
+        raise ValueError("Both teams need at least one player.")
+
+    shared = match_res.rankings_A.keys() & match_res.rankings_B.keys()
+    if shared:
+        raise ValueError(f"Players on both teams: {', '.join(sorted(shared))}.")
+
+
+class RatingServer:
+    """
+    Asyncio TCP server accepting match results and applying them in micro-batches.
+
+    The protocol is newline-delimited JSON. Each request line is a match record as in
+    JSONL match logs (``outcome``, ``rankings_A``, ``rankings_B``) with an optional
+    ``id`` echoed in the reply. Each reply line is either
+    ``{"id": ..., "ratings": {agent_id: new_rating, ...}}`` with the ratings of the
+    match's players right after that match, or ``{"id": ..., "error": "..."}``.
+
+    Requests arriving within ``batch_window`` seconds of each other (up to
+    ``max_batch``) are applied together, in arrival order, with the batch kernel.
+    At most ``max_pending`` requests may wait for a batch; beyond that new requests
+    are rejected right away with a ``"server busy"`` error so clients can back off.
+    Invalid matches (an empty team, a player on both teams) are rejected before they
+    are queued, so they never join a micro-batch or add players to the store.
+
+    Listeners of the TESSCore (e.g. HistoryRecorder, DeltaJournal, SQLiteStore) are
+    called for every applied match right after its wave, with the match's
+    store-backed teams and deltas, and attached instrumentation counts the matches.
+    Within a micro-batch, matches sharing a player reach the listeners in arrival
+    order; independent matches may reach them in wave order.
+
+    Attributes:
+        _tess (TESSCore): The rating system applying the matches.
+        _store (RatingStore): The ratings being updated.
+        _host (str): Interface to listen on.
+        _port (int): Port to listen on (0 picks a free port).
+        _batch_window (float): Seconds to wait for more requests after the first one of a batch.
+        _max_batch (int): Maximum number of matches applied in one micro-batch.
+        _queue (asyncio.Queue): Pending (match, future) pairs, bounded by ``max_pending``.
+        _server (asyncio.AbstractServer): The listening server once started.
+        _batcher (asyncio.Task): The task applying micro-batches once started.
+
+    Methods:
+        store (property): Returns the rating store.
+        port (property): Returns the port the server listens on.
+        start(): Starts listening and applying micro-batches.
+        serve_forever(): Starts the server and serves until cancelled.
+        close(): Stops the server.
+        submit(match_res): Queues a match and waits for its players' new ratings.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            store: RatingStore = None, 
+            host: str = "127.0.0.1", 
+            port: int = 8470, 
+            batch_window: float = 0.002, 
+            max_batch: int = 1024, 
+            max_pending: int = 16384
+    ):
+        """
+        Initializes the server (call ``start`` or ``serve_forever`` to run it).
+
+        Args:
+            tess (TESSCore): The rating system applying the matches.
+            store (RatingStore, optional): The ratings to update (default: a new empty store).
+            host (str, optional): Interface to listen on (default: "127.0.0.1").
+            port (int, optional): Port to listen on, 0 for any free port (default: 8470).
+            batch_window (float, optional): Seconds to wait for more requests after the first
+                one of a micro-batch (default: 0.002).
+            max_batch (int, optional): Maximum number of matches per micro-batch (default: 1024).
+            max_pending (int, optional): Maximum number of queued requests (default: 16384).
+        """
+        self._tess = tess
+        self._store = RatingStore() if store is None else store
+        self._host = host
+        self._port = port
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._max_pending = max_pending
+        self._queue = None
+        self._server = None
+        self._batcher = None
+
+    @property
+    def store(
+        self
+    ) -> RatingStore:
+        """
+        Returns the rating store.
+        """
+        return self._store
+
+    @property
+    def port(
+        self
+    ) -> int:
+        """
+        Returns the port the server listens on.
+        """
+        if self._server is not None:
+            return self._server.sockets[0].getsockname()[1]
+
+        return self._port
+
+    async def start(
+            self
+    ) -> None:
+        """
+        Starts listening for connections and applying micro-batches.
+        """
+        self._queue = asyncio.Queue(maxsize=self._max_pending)
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        self._server = await asyncio.start_server(self._handle_connection, self._host, self._port)
+
+    async def serve_forever(
+            self
+    ) -> None:
+        """
+        Starts the server and serves until cancelled.
+        """
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(
+            self
+    ) -> None:
+        """
+        Stops accepting connections and stops the micro-batch task.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+        self._server = None
+        self._batcher = None
+
+    async def submit(
+            self, 
+            match_res: MatchResult
+    ) -> dict:
+        """
+        Queues a match for the next micro-batch and waits until it is applied.
+
+        Args:
+            match_res (MatchResult): The match; the rosters are the keys of its rankings.
+
+        Returns:
+            dict: The new rating of each of the match's players.
+
+        Raises:
+            ValueError: If a team has no players or a player is on both teams.
+            asyncio.QueueFull: If ``max_pending`` requests are already waiting.
+        """
+        _check_match(match_res)
+
+        future = asyncio.get_event_loop().create_future()
+        self._queue.put_nowait((match_res, future))
+
+        return await future
+
+    async def _handle_connection(
+            self, 
+            reader: asyncio.StreamReader, 
+            writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Reads request lines from a client; each request is answered as soon as its batch is applied.
+        """
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                if line.strip():
+                    task = asyncio.ensure_future(self._handle_request(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def _handle_request(
+            self, 
+            line: bytes, 
+            writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Parses one request line, submits it and writes the reply line.
+        """
+        request_id = None
+        try:
+            record = json.loads(line)
+            request_id = record.get("id")
+            reply = {"id": request_id, "ratings": await self.submit(parse_match_record(record))}
+
+        except asyncio.QueueFull:
+            reply = {"id": request_id, "error": "server busy"}
+
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            reply = {"id": request_id, "error": f"invalid request: {e}"}
+
+        if not writer.is_closing():
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _run_batches(
+            self
+    ) -> None:
+        """
+        Collects queued requests into micro-batches and applies them, forever.
+        """
+        loop = asyncio.get_event_loop()
+
+        while True:
+            pending = [await self._queue.get()]
+            deadline = loop.time() + self._batch_window
+
+            while len(pending) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            pending = [(match_res, future) for match_res, future in pending if not future.cancelled()]
+            if not pending:
+                continue
+
+            try:
+                schedule = self._schedule([match_res for match_res, _ in pending])
+            except Exception:
+                # Nothing was written yet: fail the faulty matches only and apply the others
+                schedule = None
+                valid = []
+                for match_res, future in pending:
+                    try:
+                        self._schedule([match_res])
+                    except Exception as e:
+                        future.set_exception(e)
+                    else:
+                        valid.append((match_res, future))
+                pending = valid
+                if not pending:
+                    continue
+
+            try:
+                if schedule is None:
+                    schedule = self._schedule([match_res for match_res, _ in pending])
+                results = self._apply([match_res for match_res, _ in pending], *schedule)
+            except Exception as e:
+                # Earlier waves may already be applied, so the batch is never retried
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), ratings in zip(pending, results):
+                future.set_result(ratings)
+
+    def _schedule(
+            self, 
+            matches: List[MatchResult]
+    ) -> Tuple[MatchBatch, List[np.ndarray]]:
+        """
+        Checks a micro-batch and builds its batch and wave schedule, without changing any
+        rating (new players are added to the store).
+
+        Raises:
+            ValueError: If a match is invalid (see ``_check_match`` and ``MatchBatch.waves``).
+        """
+        store = self._store
+        for match_res in matches:
+            _check_match(match_res)
+
+        batch = MatchBatch.from_lists(
+            members_A=[[store.agent(id).index for id in match_res.rankings_A] for match_res in matches], 
+            members_B=[[store.agent(id).index for id in match_res.rankings_B] for match_res in matches], 
+            ranks_A=[list(match_res.rankings_A.values()) for match_res in matches], 
+            ranks_B=[list(match_res.rankings_B.values()) for match_res in matches], 
+            outcomes=[match_res.team_A_outcome.value for match_res in matches]
+        )
+
+        return batch, batch.waves()
+
+    def _apply(
+            self, 
+            matches: List[MatchResult], 
+            batch: MatchBatch, 
+            waves: List[np.ndarray]
+    ) -> List[dict]:
+        """
+        Applies a scheduled micro-batch and returns each match's players' ratings right after it.
+        """
+        store = self._store
+        tess = self._tess
+        store.settle(batch.members)
+        ratings = store.ratings
+        results = [None] * len(matches)
+
+        # Same wave schedule as TESSCore.update_games_batch; a match's players are read
+        # right after its wave, before any later match can touch them.
+        for wave in waves:
+            sub_batch = batch.take(wave)
+            deltas = batch_deltas(
+                ratings=ratings, 
+                batch=sub_batch, 
+                K=tess.K, 
+                alpha=tess.alpha, 
+                scale=tess.scale
+            )
+            ratings[sub_batch.members] += deltas
+
+            store.touch(sub_batch.members)
+            store.notify(sub_batch.members)
+
+            offsets = sub_batch.team_offsets.tolist()
+            deltas = deltas.tolist()
+            for k, i in enumerate(wave.tolist()):
+                match_res = matches[i]
+                results[i] = {
+                    id: float(ratings[store.index_of(id)])
+                    for rankings in (match_res.rankings_A, match_res.rankings_B) for id in rankings
+                }
+
+                if tess._listeners:
+                    start, split, end = offsets[2 * k], offsets[2 * k + 1], offsets[2 * k + 2]
+                    tess._notify_listeners(
+                        store.team_at(sub_batch.members[start:split]), 
+                        store.team_at(sub_batch.members[split:end]), 
+                        match_res, 
+                        deltas[start:split], 
+                        deltas[split:end]
+                    )
+
+        if tess.instrumentation is not None:
+            tess.instrumentation.matches_applied(len(batch), len(batch.members))
+
+        return results
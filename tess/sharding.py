@@ -0,0 +1,294 @@
+import multiprocessing
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, batch_deltas
+from .match_result import MatchResult
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+
+def shard_of(
+        id: str, 
+        n_shards: int
+) -> int:
+    """
+    Returns the shard owning an agent ID (stable across processes and runs, unlike ``hash``).
+    """
+    return zlib.crc32(id.encode("utf-8")) % n_shards
+
+
+def _shard_main(
+        conn, 
+        init_rating: float
+) -> None:
+    """
+    Event loop of a shard worker: owns a RatingStore for its slice of the agents.
+
+    Requests are tuples read from ``conn``:
+        ("get", ids): replies with the ratings of ``ids`` (new agents get the initial rating).
+        ("peek", ids): replies with the ratings of ``ids`` without adding agents (NaN if unknown).
+        ("add", ids, deltas): adds ``deltas`` to the ratings of ``ids``; no reply.
+        ("dump",): replies with a dict of every agent ID and rating in the shard.
+        ("stop",): exits the loop.
+    """
+    store = RatingStore(init_rating=init_rating)
+
+    while True:
+        request = conn.recv()
+        command = request[0]
+
+        if command == "get":
+            indices = [store.agent(id).index for id in request[1]]
+            conn.send(store.ratings[indices])
+
+        elif command == "peek":
+            conn.send(np.array(
+                [store.ratings[store.index_of(id)] if id in store else np.nan for id in request[1]], 
+                dtype=np.float64
+            ))
+
+        elif command == "add":
+            indices = [store.index_of(id) for id in request[1]]
+            store.ratings[indices] += request[2]
+
+        elif command == "dump":
+            conn.send({store.id_of(i): rating for i, rating in enumerate(store.ratings.tolist())})
+
+        elif command == "stop":
+            break
+
+    conn.close()
+
+
+class ShardedTESS:
+    """
+    Runs TESS over agents hash-partitioned across local worker processes.
+
+    Each shard process owns the ratings of its slice of the agents. For every match,
+    this coordinator gathers the ratings of the players from their owning shards,
+    computes the deltas with the TESSCore kernel and scatters the updates back.
+    Matches are coordinated one wave of agent-disjoint matches at a time and requests
+    to a shard are served in order over its pipe, so a match always reads ratings
+    that include every earlier match, including ones that crossed other shards.
+
+    Attributes:
+        _tess (TESSCore): The rating system whose parameters are used.
+        _n_shards (int): Number of shard processes.
+        _conns (List[Connection]): Coordinator end of each shard's pipe.
+        _processes (List[Process]): The shard processes.
+
+    Methods:
+        update_game(ids_A, ids_B, match_res): Applies one match.
+        update_games(matches): Applies a sequence of matches, one round trip per shard and wave.
+        rating(id): Returns the current rating of an agent (KeyError if it never played).
+        ratings(): Returns every agent's rating.
+        close(): Stops the shard processes.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            n_shards: int = 4, 
+            init_rating: float = 1500
+    ):
+        """
+        Starts the shard processes.
+
+        Args:
+            tess (TESSCore): The rating system whose parameters are used.
+            n_shards (int, optional): Number of shard processes (default: 4).
+            init_rating (float, optional): Rating of agents seen for the first time (default: 1500).
+        """
+        self._tess = tess
+        self._n_shards = n_shards
+        self._conns = []
+        self._processes = []
+
+        for _ in range(n_shards):
+            conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_main, args=(child_conn, init_rating), daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+    def __enter__(
+            self
+    ) -> "ShardedTESS":
+        """
+        Returns the service itself; the shards are stopped when the block exits.
+        """
+        return self
+
+    def __exit__(
+            self, 
+            *exc_info
+    ) -> None:
+        """
+        Stops the shard processes.
+        """
+        self.close()
+
+    def _gather(
+            self, 
+            ids: Sequence[str]
+    ) -> np.ndarray:
+        """
+        Fetches the ratings of ``ids`` from their owning shards, one request per shard.
+        """
+        by_shard = self._group(ids)
+        for shard, (positions, shard_ids) in by_shard.items():
+            self._conns[shard].send(("get", shard_ids))
+
+        ratings = np.empty(len(ids), dtype=np.float64)
+        for shard, (positions, shard_ids) in by_shard.items():
+            ratings[positions] = self._conns[shard].recv()
+
+        return ratings
+
+    def _scatter(
+            self, 
+            ids: Sequence[str], 
+            deltas: np.ndarray
+    ) -> None:
+        """
+        Sends the deltas of ``ids`` to their owning shards.
+        """
+        for shard, (positions, shard_ids) in self._group(ids).items():
+            self._conns[shard].send(("add", shard_ids, deltas[positions]))
+
+    def _group(
+            self, 
+            ids: Sequence[str]
+    ) -> Dict[int, Tuple[List[int], List[str]]]:
+        """
+        Groups IDs by owning shard as (positions in ``ids``, IDs) pairs.
+        """
+        groups = {}
+        for position, id in enumerate(ids):
+            positions, shard_ids = groups.setdefault(shard_of(id, self._n_shards), ([], []))
+            positions.append(position)
+            shard_ids.append(id)
+
+        return groups
+
+    def update_game(
+            self, 
+            ids_A: Sequence[str], 
+            ids_B: Sequence[str], 
+            match_res: MatchResult
+    ) -> None:
+        """
+        Updates the ratings of the players of one match on their owning shards.
+
+        Args:
+            ids_A (Sequence[str]): IDs of team A's players.
+            ids_B (Sequence[str]): IDs of team B's players.
+            match_res (MatchResult): An object containing match outcomes and individual rankings.
+        """
+        self.update_games([(ids_A, ids_B, match_res)])
+
+    def update_games(
+            self, 
+            matches: Sequence[Tuple[Sequence[str], Sequence[str], MatchResult]]
+    ) -> None:
+        """
+        Applies a sequence of matches in order.
+
+        The matches are split into waves of agent-disjoint matches; each wave costs a
+        single gather and a single scatter per shard, and its deltas are computed in
+        one vectorized pass.
+
+        Args:
+            matches (Sequence[Tuple[Sequence[str], Sequence[str], MatchResult]]):
+                (team A IDs, team B IDs, result) of each match, in chronological order.
+        """
+        local = {}  # Agent ID -> local index within this call
+        members_A, members_B, ranks_A, ranks_B = [], [], [], []
+
+        for ids_A, ids_B, match_res in matches:
+            for ids, rankings, members, ranks in (
+                (ids_A, match_res.rankings_A, members_A, ranks_A), 
+                (ids_B, match_res.rankings_B, members_B, ranks_B)
+            ):
+                missing = [id for id in ids if id not in rankings]
+                if missing:
+                    raise ValueError(f"Rank information missing for agent {missing[0]}.")
+
+                members.append([local.setdefault(id, len(local)) for id in ids])
+                ranks.append([rankings[id] for id in ids])
+
+        batch = MatchBatch.from_lists(
+            members_A=members_A, 
+            members_B=members_B, 
+            ranks_A=ranks_A, 
+            ranks_B=ranks_B, 
+            outcomes=[match_res.team_A_outcome.value for _, _, match_res in matches]
+        )
+        local_ids = list(local)
+        ratings = np.zeros(len(local_ids), dtype=np.float64)
+
+        for wave in batch.waves():
+            wave_batch = batch.take(wave)
+            wave_ids = [local_ids[index] for index in wave_batch.members.tolist()]
+
+            ratings[wave_batch.members] = self._gather(wave_ids)
+            deltas = batch_deltas(
+                ratings=ratings, 
+                batch=wave_batch, 
+                K=self._tess.K, 
+                alpha=self._tess.alpha, 
+                scale=self._tess.scale
+            )
+            self._scatter(wave_ids, deltas)
+
+    def rating(
+            self, 
+            id: str
+    ) -> float:
+        """
+        Returns the current rating of an agent; reading never adds the agent to its shard.
+
+        Raises:
+            KeyError: If the agent has never played.
+        """
+        conn = self._conns[shard_of(id, self._n_shards)]
+        conn.send(("peek", [id]))
+        rating = float(conn.recv()[0])
+        if rating != rating:  # NaN: unknown agent
+            raise KeyError(id)
+
+        return rating
+
+    def ratings(
+            self
+    ) -> Dict[str, float]:
+        """
+        Returns the rating of every agent known to any shard.
+        """
+        for conn in self._conns:
+            conn.send(("dump",))
+
+        ratings = {}
+        for conn in self._conns:
+            ratings.update(conn.recv())
+
+        return ratings
+
+    def close(
+            self
+    ) -> None:
+        """
+        Stops the shard processes.
+        """
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                conn.send(("stop",))
+            process.join()
+            conn.close()
+
+        self._conns = []
+        self._processes = []
@@ -0,0 +1,189 @@
+import functools
+import multiprocessing
+from typing import Dict, Sequence
+
+import numpy as np
+
+from .batch import MatchBatch, batch_deltas
+from .tess_core import TESSCore
+
+
+def spearman(
+        x: np.ndarray, 
+        y: np.ndarray
+) -> float:
+    """
+    Returns the Spearman rank correlation of two arrays (ties get their average rank).
+
+    Returns NaN when either array is constant, e.g. before any rating has moved.
+    """
+    rx = _average_ranks(x)
+    ry = _average_ranks(y)
+    rx -= rx.mean()
+    ry -= ry.mean()
+    denom = np.sqrt(np.dot(rx, rx) * np.dot(ry, ry))
+
+    return float(np.dot(rx, ry) / denom) if denom > 0 else float("nan")
+
+
+def _average_ranks(
+        values: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the 0-based rank of each value, tied values sharing their average rank.
+    """
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    sizes = np.diff(np.r_[starts, len(values)])
+
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(starts + (sizes - 1) / 2.0, sizes)
+
+    return ranks
+
+
+def simulate(
+        n_agents: int, 
+        n_rounds: int, 
+        team_size: int = 5, 
+        tess: TESSCore = None, 
+        skill_std: float = 200.0, 
+        skills: np.ndarray = None, 
+        outcome_scale: float = 400.0, 
+        draw_prob: float = 0.0, 
+        rank_noise: float = 100.0, 
+        init_rating: float = 1500, 
+        record_every: int = 1, 
+        seed: int = None
+) -> Dict[str, np.ndarray]:
+    """
+    Simulates rounds of random matches between agents of known true skill and applies them.
+
+    Every round shuffles the population and splits it into matches of two teams of
+    ``team_size`` (leftover agents sit the round out), so the matches of a round are
+    agent-disjoint and are generated and applied in one vectorized pass:
+
+        - team A wins with probability ``1 / (1 + 10 ** ((skill_B - skill_A) / outcome_scale))``
+          on average true skills, unless the match is a draw (probability ``draw_prob``);
+        - in-team rankings order players by ``skill + N(0, rank_noise)``, so a noise
+          of 0 ranks every team exactly by true skill.
+
+    Args:
+        n_agents (int): Population size.
+        n_rounds (int): Number of rounds to simulate.
+        team_size (int, optional): Number of agents per team (default: 5).
+        tess (TESSCore, optional): The rating system to apply (default: TESSCore()).
+        skill_std (float, optional): Standard deviation of the normal true-skill
+            distribution, centred on ``init_rating`` (default: 200.0).
+        skills (np.ndarray, optional): Explicit true skill of each agent (overrides ``skill_std``).
+        outcome_scale (float, optional): Logistic scale of team win probabilities (default: 400.0).
+        draw_prob (float, optional): Probability that a match is a draw (default: 0.0).
+        rank_noise (float, optional): Standard deviation of per-match performance noise (default: 100.0).
+        init_rating (float, optional): Initial rating of every agent (default: 1500).
+        record_every (int, optional): Rounds between convergence measurements (default: 1).
+        seed (int, optional): Seed of the random generator (default: None).
+
+    Returns:
+        Dict[str, np.ndarray]: ``matches`` (matches played at each measurement),
+            ``spearman`` (rank correlation of ratings with true skill at each
+            measurement), and the final ``ratings`` and true ``skills``.
+    """
+    tess = TESSCore() if tess is None else tess
+    rng = np.random.default_rng(seed)
+
+    if skills is None:
+        skills = rng.normal(init_rating, skill_std, n_agents)
+    skills = np.asarray(skills, dtype=np.float64)
+
+    n_matches = n_agents // (2 * team_size)
+    if n_matches < 1:
+        raise ValueError("The population must hold at least two full teams.")
+
+    n_playing = 2 * team_size * n_matches
+    ratings = np.full(n_agents, init_rating, dtype=np.float64)
+    team_offsets = np.arange(0, n_playing + 1, team_size, dtype=np.int64)
+    recorded_matches = []
+    recorded_spearman = []
+
+    for round_index in range(n_rounds):
+        # Step 1: Draw the rosters; row t of ``teams`` holds the members of team t (A, B, A, B, ...)
+        members = rng.permutation(n_agents)[:n_playing]
+        teams = members.reshape(2 * n_matches, team_size)
+
+        # Step 2: Team outcomes from average true skills
+        avg_skill = skills[teams].mean(axis=1)
+        p_win = 1.0 / (1 + 10 ** ((avg_skill[1::2] - avg_skill[0::2]) / outcome_scale))
+        outcomes = (rng.random(n_matches) < p_win).astype(np.float64)
+        if draw_prob > 0:
+            outcomes[rng.random(n_matches) < draw_prob] = 0.5
+
+        # Step 3: In-team rankings from noisy performances (1 is best)
+        performance = skills[teams] + rng.normal(0.0, rank_noise, teams.shape) if rank_noise > 0 else skills[teams]
+        ranks = np.argsort(np.argsort(-performance, axis=1, kind="stable"), axis=1) + 1
+
+        # Step 4: Apply the whole round at once
+        batch = MatchBatch(members, team_offsets, ranks.ravel(), outcomes)
+        ratings[members] += batch_deltas(
+            ratings=ratings, 
+            batch=batch, 
+            K=tess.K, 
+            alpha=tess.alpha, 
+            scale=tess.scale
+        )
+
+        if (round_index + 1) % record_every == 0 or round_index == n_rounds - 1:
+            recorded_matches.append((round_index + 1) * n_matches)
+            recorded_spearman.append(spearman(ratings, skills))
+
+    return {
+        "matches": np.asarray(recorded_matches, dtype=np.int64), 
+        "spearman": np.asarray(recorded_spearman, dtype=np.float64), 
+        "ratings": ratings, 
+        "skills": skills
+    }
+
+
+def _simulate_seed(
+        seed: int, 
+        kwargs: dict
+) -> Dict[str, np.ndarray]:
+    """
+    Runs ``simulate`` for one seed (a picklable pool task).
+    """
+    return simulate(seed=seed, **kwargs)
+
+
+def simulate_seeds(
+        seeds: Sequence[int], 
+        processes: int = None, 
+        **kwargs
+) -> Dict[str, np.ndarray]:
+    """
+    Runs independent simulations, one per seed, across worker processes.
+
+    Args:
+        seeds (Sequence[int]): Seed of each run.
+        processes (int, optional): Number of worker processes (default: one per CPU).
+        **kwargs: Arguments of ``simulate`` shared by every run.
+
+    Returns:
+        Dict[str, np.ndarray]: ``matches`` at each measurement, the ``spearman``
+            curve of every run (shape (seeds, measurements)), and its ``mean`` and
+            ``std`` over the runs.
+    """
+    task = functools.partial(_simulate_seed, kwargs=kwargs)
+    if processes == 1 or len(seeds) < 2:
+        runs = [task(seed) for seed in seeds]
+    else:
+        with multiprocessing.Pool(processes=processes) as pool:
+            runs = pool.map(task, seeds)
+
+    curves = np.array([run["spearman"] for run in runs])
+
+    return {
+        "matches": runs[0]["matches"], 
+        "spearman": curves, 
+        "mean": curves.mean(axis=0), 
+        "std": curves.std(axis=0)
+    }
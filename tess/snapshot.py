@@ -0,0 +1,234 @@
+import json
+import mmap
+import os
+import struct
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+SNAPSHOT_MAGIC = b"TESSSNAP"
+SNAPSHOT_VERSION = 2
+
+# magic, version, reserved, n_agents, K, alpha, scale,
+# meta_offset, meta_length, ids_offset, ratings_offset (little-endian)
+_HEADER_V1 = struct.Struct("<8sIIQdddQQQQ")
+
+# Version 2 adds the inactivity decay: rate (NaN when disabled), target, grace_days, day
+# and decay_offset, where the int64 last_active and decays_applied columns start.
+_HEADER = struct.Struct("<8sIIQdddQQQQddqqQ")
+
+
+def _align(
+        offset: int, 
+        alignment: int = 8
+) -> int:
+    """
+    Rounds an offset up to the next multiple of ``alignment``.
+    """
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class _SnapshotIds:
+    """
+    Read-only sequence of agent IDs decoded on demand from a memory-mapped snapshot.
+
+    Attributes:
+        _buffer (mmap.mmap): The mapped snapshot file.
+        _offsets (np.ndarray): Byte offsets of each ID in the buffer (length n + 1).
+    """
+
+    def __init__(
+            self, 
+            buffer: mmap.mmap, 
+            offsets: np.ndarray
+    ):
+        """
+        Initializes the ID table over an ID blob of the mapped snapshot.
+
+        Args:
+            buffer (mmap.mmap): The mapped snapshot file.
+            offsets (np.ndarray): Absolute byte offsets of each ID in the buffer (length n + 1).
+        """
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of IDs.
+        """
+        return len(self._offsets) - 1
+
+    def __getitem__(
+            self, 
+            index: int
+    ) -> str:
+        """
+        Decodes the ID stored at the given row.
+        """
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("snapshot ID index out of range")
+
+        start = int(self._offsets[index])
+        end = int(self._offsets[index + 1])
+
+        return self._buffer[start:end].decode("utf-8")
+
+    def __iter__(
+            self
+    ) -> Iterator[str]:
+        """
+        Decodes all IDs in row order, reading the ID blob in one go.
+        """
+        offsets = self._offsets.tolist()
+        base = offsets[0]
+        blob = self._buffer[base:offsets[-1]]
+
+        for start, end in zip(offsets, offsets[1:]):
+            yield blob[start - base:end - base].decode("utf-8")
+
+
+def write_snapshot(
+        path: str, 
+        store: RatingStore, 
+        tess: TESSCore, 
+        meta: dict = None
+) -> None:
+    """
+    Atomically writes a binary rating snapshot.
+
+    The file holds a fixed header (format version, agent count, the TESSCore
+    parameters K, alpha and scale, and the store's decay parameters and clock), an
+    optional JSON metadata block, the agent ID table (UTF-8 blob with an offsets
+    array), the 8-byte aligned float64 ratings array and, when decay is enabled, the
+    int64 last-active-day and applied-decay columns. It is written to a temporary
+    file, synced and renamed over ``path``.
+
+    The store is settled first (see ``RatingStore.settle``), so the saved ratings
+    include every decay due and a restored store continues exactly where it stopped.
+
+    Args:
+        path (str): Destination path.
+        store (RatingStore): The ratings to save.
+        tess (TESSCore): The rating system whose parameters are saved with the ratings.
+        meta (dict, optional): JSON-serializable metadata saved with the snapshot.
+    """
+    store.settle()
+    decay = store.decay_state()
+
+    n = len(store)
+    encoded = [store.id_of(i).encode("utf-8") for i in range(n)]
+    meta_bytes = json.dumps(meta or {}).encode("utf-8")
+
+    meta_offset = _HEADER.size
+    ids_offset = _align(meta_offset + len(meta_bytes))
+    blob_offset = ids_offset + 8 * (n + 1)
+
+    id_offsets = np.empty(n + 1, dtype="<u8")
+    id_offsets[0] = blob_offset
+    np.cumsum([len(id) for id in encoded], out=id_offsets[1:])
+    id_offsets[1:] += blob_offset
+
+    ratings_offset = _align(int(id_offsets[-1]))
+    decay_offset = ratings_offset + 8 * n if decay is not None else 0
+    state = decay[0] if decay is not None else {"rate": float("nan"), "target": 0.0, "grace_days": 0, "day": 0}
+
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, 
+        SNAPSHOT_VERSION, 
+        0, 
+        n, 
+        float(tess.K), 
+        float(tess.alpha), 
+        float(tess.scale), 
+        meta_offset, 
+        len(meta_bytes), 
+        ids_offset, 
+        ratings_offset, 
+        float(state["rate"]), 
+        float(state["target"]), 
+        int(state["grace_days"]), 
+        int(state["day"]), 
+        decay_offset
+    )
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b"\0" * (ids_offset - f.tell()))
+        f.write(id_offsets.tobytes())
+        f.write(b"".join(encoded))
+        f.write(b"\0" * (ratings_offset - f.tell()))
+        f.write(np.ascontiguousarray(store.ratings, dtype="<f8").tobytes())
+        if decay is not None:
+            f.write(np.ascontiguousarray(decay[1], dtype="<i8").tobytes())
+            f.write(np.ascontiguousarray(decay[2], dtype="<i8").tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)  # Atomic on POSIX and Windows
+
+
+def load_snapshot(
+        path: str, 
+        init_rating: float = 1500
+) -> Tuple[RatingStore, TESSCore, dict]:
+    """
+    Opens a binary rating snapshot with ``mmap`` without copying the ratings.
+
+    The file is mapped copy-on-write: the ratings array reads straight from the page
+    cache, and a page is only copied privately once an update writes to it, so the
+    file on disk is never modified. The ID -> row map is only built on the first
+    lookup by ID. A saved decay state is restored (see ``RatingStore.restore_decay``).
+    Version 1 snapshots, which have no decay state, are still read.
+
+    Args:
+        path (str): Path of the snapshot.
+        init_rating (float, optional): Rating given to agents added after loading (default: 1500).
+
+    Returns:
+        Tuple[RatingStore, TESSCore, dict]: The ratings, a TESSCore with the saved
+            parameters and the saved metadata.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if len(buffer) < _HEADER_V1.size:
+        raise ValueError(f"{path} is not a TESS snapshot.")
+
+    (magic, version, _, n, K, alpha, scale, 
+     meta_offset, meta_length, ids_offset, ratings_offset) = _HEADER_V1.unpack_from(buffer, 0)
+
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a TESS snapshot.")
+
+    if version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"Unsupported snapshot version {version} in {path}.")
+
+    decay_offset = 0
+    if version >= 2:
+        rate, target, grace_days, day, decay_offset = _HEADER.unpack_from(buffer, 0)[-5:]
+
+    meta = json.loads(buffer[meta_offset:meta_offset + meta_length].decode("utf-8"))
+    id_offsets = np.frombuffer(buffer, dtype="<u8", count=n + 1, offset=ids_offset)
+    ratings = np.frombuffer(buffer, dtype="<f8", count=n, offset=ratings_offset)
+
+    tess = TESSCore(K=K, alpha=alpha, scale=int(scale) if scale.is_integer() else scale)
+    store = RatingStore.from_arrays(_SnapshotIds(buffer, id_offsets), ratings, init_rating=init_rating)
+
+    if decay_offset:
+        store.restore_decay(
+            state={"rate": rate, "target": target, "grace_days": grace_days, "day": day}, 
+            last_active=np.frombuffer(buffer, dtype="<i8", count=n, offset=decay_offset), 
+            decays_applied=np.frombuffer(buffer, dtype="<i8", count=n, offset=decay_offset + 8 * n)
+        )
+
+    return store, tess, meta
@@ -0,0 +1,310 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Union
+
+from .match_outcome import MatchOutcome
+from .match_result import IndexedMatchResult, MatchResult
+from .rating_store import RatingStore, StoreAgent
+from .team import Team
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    id TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS agents_updated_at ON agents (updated_at);
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    outcome REAL NOT NULL,
+    rankings_A TEXT NOT NULL,
+    rankings_B TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+"""
+
+_UPSERT_AGENT = (
+    "INSERT INTO agents (id, rating, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET rating = excluded.rating, updated_at = excluded.updated_at"
+)
+
+_INSERT_MATCH = (
+    "INSERT OR REPLACE INTO matches (match_id, outcome, rankings_A, rankings_B, recorded_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+class SQLiteStore:
+    """
+    Persists agent ratings and match records in SQLite, with an in-memory RatingStore as cache.
+
+    Ratings are served from a RatingStore: on startup the ``warm_limit`` most recently
+    updated agents are loaded into it, and any other agent is loaded from the database
+    the first time ``agent`` asks for it (or created with the initial rating).
+
+    Register the store with ``TESSCore.add_listener``. Each applied match only
+    buffers the new ratings of its players (the latest one per player wins) and its
+    record; every ``flush_every`` matches, or on ``flush``, the buffer is written
+    with one ``executemany`` upsert per table inside a single transaction. The
+    database runs in WAL mode, so readers borrowing a connection from the pool
+    (``reader``) are never blocked by a flush.
+
+    Attributes:
+        _path (str): Path of the database file.
+        _store (RatingStore): The in-memory ratings.
+        _flush_every (int): Buffered matches that trigger a flush (0 to flush only on demand).
+        _writer (sqlite3.Connection): Connection used for flushes.
+        _pool (queue.Queue): Idle read connections.
+        _lock (threading.Lock): Guards the buffers and the writer.
+        _pending_ratings (Dict[str, float]): Buffered rating of each updated agent.
+        _pending_matches (List[tuple]): Buffered match rows.
+
+    Methods:
+        store (property): Returns the in-memory RatingStore.
+        agent(id): Returns a store-backed agent, loading it from the database if needed.
+        team(ids): Returns a Team of store-backed agents.
+        __call__(team_A, team_B, match_res, deltas_A, deltas_B): Buffers a match (TESSCore listener).
+        flush(): Writes the buffered ratings and matches in one transaction.
+        reader(): Borrows a read connection from the pool.
+        rating(id): Returns the persisted rating of an agent.
+        match(match_id): Returns a persisted match record.
+        close(): Flushes and closes every connection.
+    """
+
+    def __init__(
+            self, 
+            path: str, 
+            init_rating: float = 1500, 
+            warm_limit: int = None, 
+            pool_size: int = 4, 
+            flush_every: int = 1000
+    ):
+        """
+        Opens (creating if needed) the database and warm-loads the hottest agents.
+
+        Args:
+            path (str): Path of the database file.
+            init_rating (float, optional): Rating of agents not in the database yet (default: 1500).
+            warm_limit (int, optional): Number of most recently updated agents loaded on
+                startup (default: None, every agent).
+            pool_size (int, optional): Number of pooled read connections (default: 4).
+            flush_every (int, optional): Buffered matches that trigger a flush, 0 to
+                flush only on demand (default: 1000).
+        """
+        self._path = path
+        self._flush_every = flush_every
+        self._lock = threading.Lock()
+        self._pending_ratings = {}
+        self._pending_matches = []
+
+        # Step 1: Writer connection, WAL mode and schema
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(_SCHEMA)
+        self._writer.commit()
+
+        # Step 2: Pool of read connections, shareable across threads
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(sqlite3.connect(path, check_same_thread=False))
+
+        # Step 3: Warm-load the most recently updated agents, hottest first
+        sql = "SELECT id, rating FROM agents ORDER BY updated_at DESC"
+        params = ()
+        if warm_limit is not None:
+            sql += " LIMIT ?"
+            params = (warm_limit,)
+        rows = self._writer.execute(sql, params).fetchall()
+
+        self._store = RatingStore(init_rating=init_rating, capacity=max(len(rows), 1024))
+        for id, rating in rows:
+            self._store.add(id, rating)
+
+    def __enter__(
+            self
+    ) -> "SQLiteStore":
+        """
+        Returns the store itself; it is flushed and closed when the block exits.
+        """
+        return self
+
+    def __exit__(
+            self, 
+            *exc_info
+    ) -> None:
+        """
+        Flushes and closes the store.
+        """
+        self.close()
+
+    @property
+    def store(
+        self
+    ) -> RatingStore:
+        """
+        Returns the in-memory RatingStore holding the loaded agents.
+        """
+        return self._store
+
+    def agent(
+            self, 
+            id: str
+    ) -> StoreAgent:
+        """
+        Returns a store-backed agent, loading its rating from the database on a cache miss.
+
+        Agents unknown to the database are created with the initial rating (they are
+        persisted by the first flush after their first match).
+
+        Args:
+            id (str): Unique identifier for the agent.
+
+        Returns:
+            StoreAgent: A view on the agent's in-memory rating.
+        """
+        store = self._store
+        if id not in store:
+            with self.reader() as conn:
+                row = conn.execute("SELECT rating FROM agents WHERE id = ?", (id,)).fetchone()
+            store.add(id, None if row is None else row[0])
+
+        return store.agent(id)
+
+    def team(
+            self, 
+            ids: Iterable[str]
+    ) -> Team:
+        """
+        Returns a Team of store-backed agents (see ``agent``).
+        """
+        return Team([self.agent(id) for id in ids])
+
+    def __call__(
+            self, 
+            team_A: Team, 
+            team_B: Team, 
+            match_res: Union[MatchResult, IndexedMatchResult], 
+            deltas_A: List[float], 
+            deltas_B: List[float]
+    ) -> None:
+        """
+        Buffers the new ratings and the record of one match (signature of a TESSCore listener).
+
+        The rankings of an IndexedMatchResult are recorded by agent ID, taking each team's
+        agents in the order of its members (the order ``TESSCore.update_game`` applied them in).
+        """
+        if isinstance(match_res, IndexedMatchResult):
+            rankings_A = {agent.id: rank for agent, rank in zip(team_A.agents, match_res.ranks_A.tolist())}
+            rankings_B = {agent.id: rank for agent, rank in zip(team_B.agents, match_res.ranks_B.tolist())}
+        else:
+            rankings_A, rankings_B = match_res.rankings_A, match_res.rankings_B
+
+        now = time.time()
+        with self._lock:
+            for team in (team_A, team_B):
+                for agent in team.agents:
+                    self._pending_ratings[agent.id] = agent.rating
+
+            self._pending_matches.append((
+                match_res.match_id,  # None lets SQLite assign the next ID
+                match_res.team_A_outcome.value, 
+                json.dumps(rankings_A), 
+                json.dumps(rankings_B), 
+                now
+            ))
+            should_flush = self._flush_every and len(self._pending_matches) >= self._flush_every
+
+        if should_flush:
+            self.flush()
+
+    def flush(
+            self
+    ) -> None:
+        """
+        Writes the buffered ratings and matches with batched upserts in one transaction.
+
+        The buffers are cleared only once the transaction commits; if it fails, they are
+        kept and written by the next flush.
+        """
+        with self._lock:
+            if not self._pending_ratings and not self._pending_matches:
+                return
+
+            now = time.time()
+            ratings = [(id, rating, now) for id, rating in self._pending_ratings.items()]
+
+            with self._writer:  # One transaction, committed on success and rolled back on error
+                self._writer.executemany(_UPSERT_AGENT, ratings)
+                self._writer.executemany(_INSERT_MATCH, self._pending_matches)
+
+            self._pending_ratings = {}
+            self._pending_matches = []
+
+    @contextmanager
+    def reader(
+            self
+    ) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a read connection from the pool, waiting for one to be returned if all are busy.
+
+        Reads see the data of completed flushes, not the buffered updates.
+        """
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def rating(
+            self, 
+            id: str
+    ) -> float:
+        """
+        Returns the persisted rating of an agent (None if it was never flushed).
+        """
+        with self.reader() as conn:
+            row = conn.execute("SELECT rating FROM agents WHERE id = ?", (id,)).fetchone()
+
+        return None if row is None else row[0]
+
+    def match(
+            self, 
+            match_id: int
+    ) -> MatchResult:
+        """
+        Returns a persisted match record (None if it was never flushed).
+        """
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT outcome, rankings_A, rankings_B FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return MatchResult(
+            team_A_outcome=MatchOutcome(row[0]), 
+            rankings_A=json.loads(row[1]), 
+            rankings_B=json.loads(row[2]), 
+            match_id=match_id
+        )
+
+    def close(
+            self
+    ) -> None:
+        """
+        Flushes the buffered updates and closes the writer and every pooled connection.
+        """
+        self.flush()
+        self._writer.close()
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
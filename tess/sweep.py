@@ -0,0 +1,224 @@
+import itertools
+import multiprocessing
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, _segment_positions, batch_deltas
+
+# Probabilities are clipped to [eps, 1 - eps] before taking logarithms.
+_LOG_LOSS_EPS = 1e-15
+
+# Batch and initial ratings shared with the sweep worker processes.
+_worker_state = {}
+
+
+def param_grid(
+        Ks: Sequence[float], 
+        alphas: Sequence[float], 
+        scales: Sequence[float]
+) -> List[Tuple[float, float, float]]:
+    """
+    Returns every (K, alpha, scale) combination of the given values.
+    """
+    return list(itertools.product(Ks, alphas, scales))
+
+
+def random_params(
+        n: int, 
+        K_range: Tuple[float, float], 
+        alpha_range: Tuple[float, float], 
+        scale_range: Tuple[float, float], 
+        seed: int = None
+) -> List[Tuple[float, float, float]]:
+    """
+    Returns ``n`` (K, alpha, scale) combinations drawn uniformly from the given (low, high) ranges.
+    """
+    rng = np.random.default_rng(seed)
+    columns = [rng.uniform(low, high, n) for low, high in (K_range, alpha_range, scale_range)]
+
+    return [tuple(params) for params in np.column_stack(columns).tolist()]
+
+
+def _team_pairs(
+        batch: MatchBatch
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the member positions (i, j), i < j, of every pair of teammates in a batch.
+    """
+    starts = batch.team_offsets[:-1]
+    sizes = np.diff(batch.team_offsets)
+    team_of = np.repeat(np.arange(len(sizes)), sizes)
+    n = sizes[team_of]
+
+    pair_i = np.repeat(np.arange(len(team_of)), n)
+    pair_j = _segment_positions(starts[team_of], n)
+    keep = pair_i < pair_j
+
+    return pair_i[keep], pair_j[keep]
+
+
+def _sweep_block(
+        batch: MatchBatch, 
+        init_ratings: np.ndarray, 
+        params: np.ndarray, 
+        burn_in: int
+) -> np.ndarray:
+    """
+    Replays a batch once for P parameter sets side by side and scores their predictions.
+
+    Ratings are held as a (P, N) array; each wave of agent-disjoint matches is scored
+    against the ratings right before it and then applied with the batch kernel, whose
+    parameters broadcast along the first axis.
+
+    Args:
+        batch (MatchBatch): The match history, in chronological order.
+        init_ratings (np.ndarray): Rating of each agent before the first match.
+        params (np.ndarray): (K, alpha, scale) of each parameter set, shape (P, 3).
+        burn_in (int): Number of leading matches left out of the metrics.
+
+    Returns:
+        np.ndarray: Sum of log-losses, sum of Brier scores, number of scored matches,
+            correctly ordered teammate pairs and ranked teammate pairs, shape (P, 5).
+    """
+    K, alpha, scale = (params[:, column:column + 1] for column in range(3))
+    ratings = np.repeat(init_ratings[np.newaxis, :], len(params), axis=0)
+    totals = np.zeros((len(params), 5), dtype=np.float64)
+
+    for wave in batch.waves():
+        sub_batch = batch.take(wave)
+        scored = wave >= burn_in
+
+        if np.any(scored):
+            members = sub_batch.members
+            team_offsets = sub_batch.team_offsets
+            sizes = np.diff(team_offsets)
+
+            # Step 1: Team A's expected score before the match (as in TESSCore._compute_team_expected)
+            avg = np.add.reduceat(ratings[:, members], team_offsets[:-1], axis=1) / sizes
+            E_A = 1.0 / (1 + 10 ** ((avg[:, 1::2] - avg[:, 0::2]) / scale))
+            O_A = sub_batch.outcomes
+
+            E = np.clip(E_A[:, scored], _LOG_LOSS_EPS, 1 - _LOG_LOSS_EPS)
+            O = O_A[scored]
+            totals[:, 0] += np.sum(-(O * np.log(E) + (1 - O) * np.log(1 - E)), axis=1)
+            totals[:, 1] += np.sum((E_A[:, scored] - O) ** 2, axis=1)
+            totals[:, 2] += np.count_nonzero(scored)
+
+            # Step 2: Teammate pairs whose rating order agrees with their in-team ranking
+            # (the better-ranked player is higher rated; rating ties count as half)
+            pair_i, pair_j = _team_pairs(sub_batch)
+            team_of = np.repeat(np.arange(len(sizes)), sizes)
+            ranks = sub_batch.ranks
+            keep = scored[team_of[pair_i] // 2] & (ranks[pair_i] != ranks[pair_j])
+            pair_i, pair_j = pair_i[keep], pair_j[keep]
+
+            rating_gap = ratings[:, members[pair_i]] - ratings[:, members[pair_j]]
+            rank_sign = np.sign(ranks[pair_j] - ranks[pair_i])
+            agreement = np.sign(rating_gap) * rank_sign
+            totals[:, 3] += np.sum(agreement > 0, axis=1) + 0.5 * np.sum(agreement == 0, axis=1)
+            totals[:, 4] += len(pair_i)
+
+        # Step 3: Apply the wave for every parameter set
+        ratings[:, sub_batch.members] += batch_deltas(
+            ratings=ratings, 
+            batch=sub_batch, 
+            K=K, 
+            alpha=alpha, 
+            scale=scale
+        )
+
+    return totals
+
+
+def _init_worker(
+        batch: MatchBatch, 
+        init_ratings: np.ndarray, 
+        burn_in: int
+) -> None:
+    """
+    Stores the history in a worker process once, instead of sending it with every block.
+    """
+    _worker_state["args"] = (batch, init_ratings)
+    _worker_state["burn_in"] = burn_in
+
+
+def _worker_block(
+        params: np.ndarray
+) -> np.ndarray:
+    """
+    Runs ``_sweep_block`` for one block of parameter sets in a worker process.
+    """
+    batch, init_ratings = _worker_state["args"]
+
+    return _sweep_block(batch, init_ratings, params, _worker_state["burn_in"])
+
+
+def sweep(
+        batch: MatchBatch, 
+        params: Sequence[Tuple[float, float, float]], 
+        init_ratings: np.ndarray = None, 
+        init_rating: float = 1500, 
+        burn_in: int = 0, 
+        block_size: int = 32, 
+        processes: int = 1
+) -> List[Dict[str, float]]:
+    """
+    Evaluates many (K, alpha, scale) parameter sets over one match history.
+
+    Parameter sets are replayed ``block_size`` at a time as an extra array dimension,
+    so a block costs one pass over the history; blocks are spread over ``processes``
+    worker processes. Every match is scored with the ratings right before it:
+
+        - ``log_loss`` and ``brier``: mean log-loss and Brier score of team A's
+          expected score against its outcome (1, 0.5 or 0);
+        - ``rank_accuracy``: share of differently ranked teammate pairs in which the
+          better-ranked player had the higher rating (rating ties count as half).
+
+    Args:
+        batch (MatchBatch): The match history, in chronological order.
+        params (Sequence[Tuple[float, float, float]]): The (K, alpha, scale) sets to evaluate.
+        init_ratings (np.ndarray, optional): Rating of each agent before the first match
+            (default: ``init_rating`` for every agent of the batch).
+        init_rating (float, optional): Initial rating used when ``init_ratings`` is not given (default: 1500).
+        burn_in (int, optional): Number of leading matches left out of the metrics (default: 0).
+        block_size (int, optional): Number of parameter sets replayed side by side (default: 32).
+        processes (int, optional): Number of worker processes (default: 1, no workers).
+
+    Returns:
+        List[Dict[str, float]]: For each parameter set, in order, its ``K``, ``alpha``,
+            ``scale``, ``log_loss``, ``brier`` and ``rank_accuracy``.
+    """
+    if init_ratings is None:
+        n_agents = int(batch.members.max()) + 1 if len(batch.members) else 0
+        init_ratings = np.full(n_agents, init_rating, dtype=np.float64)
+
+    init_ratings = np.asarray(init_ratings, dtype=np.float64)
+    param_array = np.asarray(params, dtype=np.float64).reshape(-1, 3)
+    blocks = [param_array[i:i + block_size] for i in range(0, len(param_array), block_size)]
+
+    if processes > 1 and len(blocks) > 1:
+        with multiprocessing.Pool(
+            processes=min(processes, len(blocks)), 
+            initializer=_init_worker, 
+            initargs=(batch, init_ratings, burn_in)
+        ) as pool:
+            totals = pool.map(_worker_block, blocks)
+    else:
+        totals = [_sweep_block(batch, init_ratings, block, burn_in) for block in blocks]
+
+    results = []
+    for (K, alpha, scale), (log_loss, brier, n_scored, n_correct, n_pairs) in zip(
+        param_array.tolist(), 
+        np.concatenate(totals).tolist() if totals else []
+    ):
+        results.append({
+            "K": K, 
+            "alpha": alpha, 
+            "scale": scale, 
+            "log_loss": log_loss / n_scored if n_scored else float("nan"), 
+            "brier": brier / n_scored if n_scored else float("nan"), 
+            "rank_accuracy": n_correct / n_pairs if n_pairs else float("nan")
+        })
+
+    return results
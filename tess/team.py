@@ -1,8 +1,14 @@
-from typing import List, Dict
+from typing import List, Mapping, Sequence, Union
+
+import numpy as np
 
 from .agent import Agent
+from .instrumentation import Instrumentation
 from .match_outcome import MatchOutcome
 
+# Team size from which the in-team expectations are computed with NumPy.
+_VECTORIZE_MIN_SIZE = 16
+
 
 class Team:
     """
@@ -15,7 +21,11 @@ class Team:
         agents (property): Returns the list of agents in the team.
         average_rating(): Computes the team's average Elo rating.
         _computE_indiv_expected(agent, scale): Computes the expected score for an individual within the team.
-        update_ratings(E_team, team_outcome, rankings, K, alpha, scale): Updates the ratings of all team members.
+        _compute_indiv_expected_all(scale): Computes the expected scores of all team members in one pass.
+        compute_deltas(E_team, team_outcome, rankings, K, alpha, scale, instrumentation): 
+            Computes the rating deltas of all team members.
+        update_ratings(E_team, team_outcome, rankings, K, alpha, scale, instrumentation): 
+            Updates the ratings of all team members.
     """
 
     def __init__(
@@ -58,7 +68,7 @@ class Team:
         total = 0.0
 
         for other in self.agents:
-            if other.id == agent.id:
+            if other is agent:
                 continue  # Skip self-comparison
 
             # Compute expected probability of winning against another team member
@@ -66,6 +76,49 @@ class Team:
 
         return total / (n - 1) if n > 1 else 0.0
 
+    def _compute_indiv_expected_all(
+            self, 
+            scale: int
+    ) -> List[float]:
+        """
+        Computes the expected in-team score of every agent in one pass.
+
+        Gives the same values as calling ``_computE_indiv_expected`` for each agent, but
+        evaluates ``10 ** (rating / scale)`` once per agent and uses
+        ``1 / (1 + 10 ** ((r_j - r_i) / scale)) == q_i / (q_i + q_j)``. Since the
+        expectations of a pair sum to one, each pair is only evaluated once.
+
+        Args:
+            scale (int): The Elo scale factor.
+
+        Returns:
+            List[float]: The expected score of each agent, in the order of ``agents``.
+        """
+        ratings = [agent.rating for agent in self.agents]
+        n = len(ratings)
+
+        if n < 2:
+            return [0.0] * n
+
+        pivot = sum(ratings) / n  # Center the exponents to keep q in floating-point range
+
+        if n >= _VECTORIZE_MIN_SIZE:
+            q = 10 ** ((np.asarray(ratings, dtype=np.float64) - pivot) / scale)
+            pairwise = q[:, None] / (q[:, None] + q[None, :])
+            # The diagonal (self-comparison) contributes exactly 0.5 per agent.
+            return ((pairwise.sum(axis=1) - 0.5) / (n - 1)).tolist()
+
+        q = [10 ** ((rating - pivot) / scale) for rating in ratings]
+        totals = [0.0] * n
+        for i in range(n):
+            q_i = q[i]
+            for j in range(i + 1, n):
+                p = q_i / (q_i + q[j])  # Expected score of agent i against agent j
+                totals[i] += p
+                totals[j] += 1.0 - p
+
+        return [total / (n - 1) for total in totals]
+
     def avg_rating(
             self
     ) -> float:
@@ -80,66 +133,116 @@ class Team:
 
         return sum(agent.rating for agent in self.agents) / len(self.agents)
 
-    def update_ratings(
+    def compute_deltas(
             self, 
             E_team: float, 
             team_outcome: MatchOutcome, 
-            rankings: Dict[str, int],
+            rankings: Union[Mapping[str, int], Sequence[int]],
             K: float, 
             alpha: float, 
-            scale: int = 400
-    ) -> None:
+            scale: int = 400, 
+            instrumentation: Instrumentation = None
+    ) -> List[float]:
         """
-        Updates the Elo ratings for all agents in the team, ensuring that the individual
-        component is zero-sum.
+        Computes the rating delta of every agent in the team without applying it.
+        The individual component of the deltas is zero-sum.
         
         Args:
             E_team (float): The team's expected win probability.
             team_outcome (MatchOutcome): The actual outcome for the team.
-            rankings (Dict[str, int]): Mapping from agent IDs to their in-team rankings (1 is best).
+            rankings (Union[Mapping[str, int], Sequence[int]]): Mapping from agent IDs to their
+                in-team rankings (1 is best), or the rankings themselves in the order of
+                ``agents`` (a sequence or array of the same length), which skips the ID lookups.
             K (float): The Elo rating adjustment factor.
             alpha (float): Weight given to team performance vs. individual performance.
             scale (int): The Elo scaling factor.
+            instrumentation (Instrumentation, optional): Counts single-agent fallbacks and
+                missing-rank errors when given (default: None).
+
+        Returns:
+            List[float]: The delta of each agent, in the order of ``agents``.
             
         Procedure:
             1. Compute a common team component (team_delta) distributed equally.
             2. Compute preliminary individual adjustments for each agent.
             3. Adjust the individual components to be zero-sum within the team.
-            4. Update each agent's rating with the sum of the team component and adjusted individual component.
+            4. Combine the team component and adjusted individual component of each agent.
         """
         n = len(self.agents)
         outcome_value = team_outcome.value
 
         # If there's only one agent in the team, use a simplified update.
         if n < 2:
-            for agent in self.agents:
-                delta = K * (outcome_value - E_team)
-                agent.update_rating(delta)
-
-            return
+            if instrumentation is not None:
+                instrumentation.increment("single_agent_fallbacks")
+            return [K * (outcome_value - E_team) for _ in self.agents]
 
         # Step 1: Compute the team component (distributed equally)
         team_delta = K * alpha * (outcome_value - E_team) / n
 
         # Step 2: Compute preliminary individual adjustments for each agent
+        E_indivs = self._compute_indiv_expected_all(scale)
+        if isinstance(rankings, Mapping):
+            ranks = [rankings.get(agent.id) for agent in self.agents]
+        elif isinstance(rankings, (Sequence, np.ndarray)) and not isinstance(rankings, str):
+            if len(rankings) != n:
+                raise ValueError("Rankings must be aligned with the agents of the team.")
+            ranks = rankings  # Already aligned with the agents, no lookups needed
+        else:
+            raise TypeError("Rankings must be a mapping from agent IDs or a sequence aligned with the agents.")
         indiv_deltas = []
-        for agent in self.agents:
-            rank = rankings.get(agent.id)
+        for agent, E_indiv, rank in zip(self.agents, E_indivs, ranks):
             if rank is None:
+                if instrumentation is not None:
+                    instrumentation.increment("missing_rank_errors")
                 raise ValueError(f"Rank information missing for agent {agent.id}.")
 
             # S_indiv: actual performance based on ranking (normalized: best=1, worst=0)
             S_indiv = (n - rank) / (n - 1)
-            # E_indiv: expected performance computed from pairwise comparisons
-            E_indiv = self._computE_indiv_expected(agent, scale)
+            # E_indiv: expected performance from the pairwise comparisons computed above
             indiv_delta = K * (1 - alpha) * (S_indiv - E_indiv)
             indiv_deltas.append(indiv_delta)
 
         # Step 3: Adjust individual deltas to be zero-sum
         avg_indiv_delta = sum(indiv_deltas) / n
-        adjusted_indiv_deltas = [delta - avg_indiv_delta for delta in indiv_deltas]
 
-        # Step 4: Update each agent's rating with the combined delta
-        for i, agent in enumerate(self.agents):
-            final_delta = team_delta + adjusted_indiv_deltas[i]
-            agent.update_rating(final_delta)
+        # Step 4: Combine the team component with each adjusted individual delta
+        return [team_delta + (delta - avg_indiv_delta) for delta in indiv_deltas]
+
+    def update_ratings(
+            self, 
+            E_team: float, 
+            team_outcome: MatchOutcome, 
+            rankings: Union[Mapping[str, int], Sequence[int]],
+            K: float, 
+            alpha: float, 
+            scale: int = 400, 
+            instrumentation: Instrumentation = None
+    ) -> None:
+        """
+        Updates the Elo ratings for all agents in the team, ensuring that the individual
+        component is zero-sum (see ``compute_deltas``).
+        
+        Args:
+            E_team (float): The team's expected win probability.
+            team_outcome (MatchOutcome): The actual outcome for the team.
+            rankings (Union[Mapping[str, int], Sequence[int]]): Mapping from agent IDs to their
+                in-team rankings (1 is best), or the rankings in the order of ``agents``.
+            K (float): The Elo rating adjustment factor.
+            alpha (float): Weight given to team performance vs. individual performance.
+            scale (int): The Elo scaling factor.
+            instrumentation (Instrumentation, optional): Receives the counters of
+                ``compute_deltas`` when given (default: None).
+        """
+        deltas = self.compute_deltas(
+            E_team=E_team, 
+            team_outcome=team_outcome, 
+            rankings=rankings, 
+            K=K, 
+            alpha=alpha, 
+            scale=scale, 
+            instrumentation=instrumentation
+        )
+
+        for agent, delta in zip(self.agents, deltas):
+            agent.update_rating(delta)
@@ -1,7 +1,43 @@
-from .match_result import MatchResult
+import time
+from typing import Callable, List, Tuple, Union
+
+import numpy as np
+
+from .batch import MatchBatch, _member_deltas, batch_deltas
+from .instrumentation import Instrumentation
+from .match_result import IndexedMatchResult, MatchResult
+from .multi_team_result import MultiTeamResult
 from .team import Team
 
 
+def _team_rankings(
+        team_A: Team, 
+        team_B: Team, 
+        match_res: Union[MatchResult, IndexedMatchResult]
+) -> Tuple[Union[dict, List[int]], Union[dict, List[int]]]:
+    """
+    Returns the rankings of team A and team B in the form accepted by ``Team.compute_deltas``.
+
+    An IndexedMatchResult gives lists aligned with its members, so the teams must list
+    their agents in the order of ``members_A`` / ``members_B``. Each team must have as
+    many agents as members, and agents with a store row (``StoreAgent.index``) must be
+    exactly those rows in that order; plain Agents carry no index and are matched by
+    position only.
+
+    Raises:
+        ValueError: If a team does not match the members of the result.
+    """
+    if not isinstance(match_res, IndexedMatchResult):
+        return match_res.rankings_A, match_res.rankings_B
+
+    for name, team, members in (("A", team_A, match_res.members_A), ("B", team_B, match_res.members_B)):
+        indices = [getattr(agent, "index", None) for agent in team.agents]
+        if len(indices) != len(members) or (None not in indices and indices != members.tolist()):
+            raise ValueError(f"Team {name} must list the agents of members_{name}, in the same order.")
+
+    return match_res.ranks_A.tolist(), match_res.ranks_B.tolist()
+
+
 class TESSCore:
     """
     Team-based Elo Scoring System (TESS)
@@ -14,12 +50,24 @@ class TESSCore:
         _K (float): Rating adjustment factor that controls the impact of a match on ratings.
         _alpha (float): Weight factor determining how much individual rankings affect the rating change.
         _scale (int): Scaling factor for Elo calculations (typically 400).
+        _listeners (list): Callbacks called after every match applied by update_game.
+        _instrumentation (Instrumentation): Counters and phase timings, or None when disabled.
     
     Methods:
         _compute_team_expected(team_rating, opp_team_rating): 
             Computes the expected probability of a team winning based on ratings.
+        compute_deltas(team_A, team_B, match_res): 
+            Computes the rating deltas of all players in two teams without applying them.
         update_game(team_A, team_B, match_res): 
             Updates the ratings of all players in two teams after a match.
+        update_multi_game(teams, match_res): 
+            Updates the ratings of all players in any number of teams after a match.
+        add_listener(listener): 
+            Registers a callback called after every match applied by update_game.
+        instrument(instrumentation): 
+            Enables (or, with None, disables) counters and phase timings.
+        update_games_batch(ratings, batch): 
+            Applies a whole batch of matches to an array of ratings.
     """
 
     def __init__(
@@ -39,6 +87,8 @@ class TESSCore:
         self._K = K  # Elo adjustment factor
         self._alpha = alpha  # Weighting factor for team vs. individual performance
         self._scale = scale  # Scaling factor for Elo calculations
+        self._listeners = []  # Callbacks told about every match applied by update_game
+        self._instrumentation = None  # Opt-in counters and phase timings
 
     @property
     def K(
@@ -85,47 +135,306 @@ class TESSCore:
         """
         return 1.0 / (1 + 10 ** ((opp_team_rating - team_rating) / self._scale))
 
-    def update_game(
+    def compute_deltas(
             self, 
             team_A: Team, 
             team_B: Team,
-            match_res: MatchResult
-    ) -> None:
+            match_res: Union[MatchResult, IndexedMatchResult], 
+            instrumentation: Instrumentation = None
+    ) -> Tuple[List[float], List[float]]:
         """
-        Updates the Elo ratings of all players in team A and team B based on the match result.
+        Computes the rating deltas of all players in team A and team B without applying them.
 
         Args:
             team_A (Team): The first team participating in the match.
             team_B (Team): The second team participating in the match.
-            match_res (MatchResult): An object containing match outcomes and individual rankings.
+            match_res (Union[MatchResult, IndexedMatchResult]): An object containing match
+                outcomes and individual rankings. The rankings of an IndexedMatchResult are
+                taken in the order of each team's agents, without ID lookups, so the teams
+                must list their agents in the order of its members (checked for
+                store-backed agents).
+            instrumentation (Instrumentation, optional): Times each step and receives the
+                counters of ``Team.compute_deltas`` when given (default: None).
+
+        Returns:
+            Tuple[List[float], List[float]]: The deltas of team A's and team B's agents,
+                in the order of ``agents``.
 
         This function follows these steps:
         1. Compute the average ratings of both teams.
         2. Compute each team's expected probability of winning.
-        3. Update each player's rating based on the team result and individual rankings.
+        3. Compute each player's delta based on the team result and individual rankings.
         """
+        timed = instrumentation is not None
+        if timed:
+            clock = time.perf_counter_ns
+            start = clock()
+
         # Step 1: Compute average team ratings
         avg_A = team_A.avg_rating()
         avg_B = team_B.avg_rating()
 
+        if timed:
+            end = clock()
+            instrumentation.observe("team_averages", end - start)
+            start = end
+
         # Step 2: Compute expected win probabilities for each team
         E_team_A = self._compute_team_expected(team_rating=avg_A, opp_team_rating=avg_B)
         E_team_B = self._compute_team_expected(team_rating=avg_B, opp_team_rating=avg_A)
 
-        # Step 3: Update player ratings in each team
-        team_A.update_ratings(
+        if timed:
+            end = clock()
+            instrumentation.observe("expectations", end - start)
+            start = end
+
+        # Step 3: Compute player deltas in each team
+        rankings_A, rankings_B = _team_rankings(team_A, team_B, match_res)
+        deltas_A = team_A.compute_deltas(
             E_team=E_team_A, 
             team_outcome=match_res.team_A_outcome, 
-            rankings=match_res.rankings_A,
+            rankings=rankings_A,
             K=self._K, 
             alpha=self._alpha, 
-            scale=self._scale
+            scale=self._scale, 
+            instrumentation=instrumentation
         )
-        team_B.update_ratings(
+        deltas_B = team_B.compute_deltas(
             E_team=E_team_B, 
             team_outcome=match_res.team_B_outcome, 
-            rankings=match_res.rankings_B,
+            rankings=rankings_B,
             K=self._K, 
             alpha=self._alpha, 
-            scale=self._scale
+            scale=self._scale, 
+            instrumentation=instrumentation
         )
+
+        if timed:
+            instrumentation.observe("individual_deltas", clock() - start)
+
+        return deltas_A, deltas_B
+
+    def update_game(
+            self, 
+            team_A: Team, 
+            team_B: Team,
+            match_res: Union[MatchResult, IndexedMatchResult]
+    ) -> None:
+        """
+        Updates the Elo ratings of all players in team A and team B based on the match result.
+
+        Args:
+            team_A (Team): The first team participating in the match.
+            team_B (Team): The second team participating in the match.
+            match_res (Union[MatchResult, IndexedMatchResult]): An object containing match
+                outcomes and individual rankings. The rankings of an IndexedMatchResult are
+                taken in the order of each team's agents, without ID lookups, so the teams
+                must list their agents in the order of its members (checked for
+                store-backed agents).
+
+        Both teams' deltas are computed from the ratings before the match (see
+        ``compute_deltas``) and then applied to each player.
+        """
+        instrumentation = self._instrumentation
+        deltas_A, deltas_B = self.compute_deltas(team_A, team_B, match_res, instrumentation)
+
+        if instrumentation is not None:
+            start = time.perf_counter_ns()
+
+        for agent, delta in zip(team_A.agents, deltas_A):
+            agent.update_rating(delta)
+
+        for agent, delta in zip(team_B.agents, deltas_B):
+            agent.update_rating(delta)
+
+        if instrumentation is not None:
+            instrumentation.observe("application", time.perf_counter_ns() - start)
+            instrumentation.match_applied(len(team_A.agents) + len(team_B.agents))
+
+        self._notify_listeners(team_A, team_B, match_res, deltas_A, deltas_B)
+
+    def _notify_listeners(
+            self, 
+            team_A: Team, 
+            team_B: Team, 
+            match_res: Union[MatchResult, IndexedMatchResult], 
+            deltas_A: List[float], 
+            deltas_B: List[float]
+    ) -> None:
+        """
+        Calls every listener registered with ``add_listener`` with an applied match.
+        """
+        for listener in self._listeners:
+            listener(team_A, team_B, match_res, deltas_A, deltas_B)
+
+    def update_multi_game(
+            self, 
+            teams: List[Team], 
+            match_res: MultiTeamResult
+    ) -> List[List[float]]:
+        """
+        Updates the Elo ratings of all players in a match between any number of teams.
+
+        Every team plays every other team: its expected score is the mean of its pairwise
+        expectations against the other teams, and its actual score the mean of its pairwise
+        results (1 for a better placement, 0.5 for an equal one, 0 for a worse one). All
+        pairwise expectations are computed in one vectorized pass, the team and individual
+        components are then combined exactly as in ``update_game``, so the team components
+        sum to zero across teams and the individual components to zero within each team.
+        With two teams this is the same update as ``update_game``.
+
+        Listeners registered with ``add_listener`` expect two teams and are not called.
+
+        Args:
+            teams (List[Team]): The teams participating in the match.
+            match_res (MultiTeamResult): Placements and in-team rankings, in the order of ``teams``.
+
+        Returns:
+            List[List[float]]: The deltas applied to each team's agents, in the order of ``agents``.
+
+        Raises:
+            ValueError: If a team is empty, an agent plays in two teams, or a rank is missing.
+        """
+        if len(teams) != match_res.n_teams:
+            raise ValueError("The result must describe every team of the match.")
+        if any(not team.agents for team in teams):
+            raise ValueError("Every team in a match needs at least one agent.")
+        team_of = {}
+        for t, team in enumerate(teams):
+            for agent in team.agents:
+                if team_of.setdefault(agent.id, t) != t:
+                    raise ValueError(f"Agent {agent.id} plays in more than one team.")
+
+        # Step 1: Ratings and in-team rankings of all members, teams back to back
+        sizes = [len(team.agents) for team in teams]
+        team_offsets = np.zeros(len(teams) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=team_offsets[1:])
+        r = np.array([agent.rating for team in teams for agent in team.agents], dtype=np.float64)
+        ranks = np.empty(len(r), dtype=np.float64)
+        position = 0
+        for team, rankings in zip(teams, match_res.rankings):
+            for agent in team.agents:
+                rank = rankings.get(agent.id)
+                if rank is None:
+                    if self._instrumentation is not None:
+                        self._instrumentation.increment("missing_rank_errors")
+                    raise ValueError(f"Rank information missing for agent {agent.id}.")
+                ranks[position] = rank
+                position += 1
+
+        # Step 2: Average team ratings
+        avg = np.add.reduceat(r, team_offsets[:-1]) / sizes
+
+        # Step 3: Pairwise expectations and results, averaged over the opponents
+        E_pair = 1.0 / (1 + 10 ** ((avg[np.newaxis, :] - avg[:, np.newaxis]) / self._scale))
+        placements = np.asarray(match_res.placements)
+        S_pair = np.where(
+            placements[:, np.newaxis] < placements[np.newaxis, :], 
+            1.0, 
+            np.where(placements[:, np.newaxis] == placements[np.newaxis, :], 0.5, 0.0)
+        )
+        np.fill_diagonal(E_pair, 0.0)
+        np.fill_diagonal(S_pair, 0.0)
+        n_opponents = len(teams) - 1
+        E_team = E_pair.sum(axis=1) / n_opponents
+        O_team = S_pair.sum(axis=1) / n_opponents
+
+        # Step 4: Player deltas, applied to each team
+        deltas = _member_deltas(
+            r, avg, O_team, E_team, team_offsets, ranks, self._K, self._alpha, self._scale
+        ).tolist()
+
+        team_deltas = []
+        for team, start, end in zip(teams, team_offsets[:-1], team_offsets[1:]):
+            team_deltas.append(deltas[start:end])
+            for agent, delta in zip(team.agents, team_deltas[-1]):
+                agent.update_rating(delta)
+
+        if self._instrumentation is not None:
+            self._instrumentation.match_applied(len(r))
+
+        return team_deltas
+
+    @property
+    def instrumentation(
+        self
+    ) -> Instrumentation:
+        """
+        Returns the attached instrumentation (None when disabled).
+        """
+        return self._instrumentation
+
+    def instrument(
+            self, 
+            instrumentation: Instrumentation
+    ) -> None:
+        """
+        Attaches counters and phase timings to ``update_game`` (None detaches them).
+
+        While nothing is attached, ``update_game`` only pays for a few None checks.
+
+        Args:
+            instrumentation (Instrumentation): The instrumentation to attach, or None.
+        """
+        self._instrumentation = instrumentation
+
+    def add_listener(
+            self, 
+            listener: Callable[[Team, Team, MatchResult, List[float], List[float]], None]
+    ) -> None:
+        """
+        Registers a callback called after every match applied by ``update_game``.
+
+        The callback receives ``(team_A, team_B, match_res, deltas_A, deltas_B)``, the
+        deltas being those just applied to each team's agents, in the order of ``agents``.
+
+        Args:
+            listener (Callable): The callback.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(
+            self, 
+            listener: Callable[[Team, Team, MatchResult, List[float], List[float]], None]
+    ) -> None:
+        """
+        Removes a callback registered with ``add_listener``.
+        """
+        self._listeners.remove(listener)
+
+    def update_games_batch(
+            self, 
+            ratings: np.ndarray, 
+            batch: MatchBatch
+    ) -> np.ndarray:
+        """
+        Applies a batch of matches to an array of ratings, indexed by agent index.
+
+        The batch is split into waves of agent-disjoint matches (see ``MatchBatch.waves``)
+        and each wave is evaluated in one vectorized pass, so matches sharing agents are
+        still applied in order and the result matches calling ``update_game`` for every
+        match sequentially, up to floating-point rounding.
+
+        Args:
+            ratings (np.ndarray): Float64 ratings indexed by agent index, updated in place.
+            batch (MatchBatch): The matches to apply, in chronological order.
+
+        Returns:
+            np.ndarray: The updated ``ratings`` array.
+        """
+        for wave in batch.waves():
+            sub_batch = batch.take(wave)
+            deltas = batch_deltas(
+                ratings=ratings, 
+                batch=sub_batch, 
+                K=self._K, 
+                alpha=self._alpha, 
+                scale=self._scale
+            )
+            # Matches in a wave are agent-disjoint, so members are unique here.
+            ratings[sub_batch.members] += deltas
+
+        if self._instrumentation is not None:
+            self._instrumentation.matches_applied(len(batch), len(batch.members))
+
+        return ratings
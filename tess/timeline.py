@@ -0,0 +1,394 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .batch import MatchBatch, _segment_positions, batch_deltas
+from .match_result import MatchResult
+from .rating_store import RatingStore
+from .tess_core import TESSCore
+
+
+class _Column:
+    """
+    Growable numpy column supporting splices (append, insert, replace, delete).
+
+    Attributes:
+        _data (np.ndarray): Backing array; only the first ``_size`` entries are in use.
+        _size (int): Number of entries in use.
+    """
+
+    def __init__(
+            self, 
+            dtype, 
+            values: Sequence = ()
+    ):
+        """
+        Initializes the column with the given values.
+        """
+        self._data = np.empty(max(2 * len(values), 1024), dtype=dtype)
+        self._data[:len(values)] = values
+        self._size = len(values)
+
+    @property
+    def values(
+        self
+    ) -> np.ndarray:
+        """
+        Returns the entries in use (a view, not a copy).
+        """
+        return self._data[:self._size]
+
+    def splice(
+            self, 
+            start: int, 
+            stop: int, 
+            new: np.ndarray
+    ) -> None:
+        """
+        Replaces entries [start, stop) by ``new``, shifting the tail and growing the backing array as needed.
+        """
+        size = self._size + len(new) - (stop - start)
+        if size > len(self._data):
+            grown = np.empty(max(size, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:start] = self._data[:start]
+            grown[start + len(new):size] = self._data[stop:self._size]
+            self._data = grown
+        else:
+            # Slice assignment handles the overlapping move of the tail
+            self._data[start + len(new):size] = self._data[stop:self._size]
+
+        self._data[start:start + len(new)] = new
+        self._size = size
+
+
+class MatchTimeline:
+    """
+    Chronological log of the matches applied to a RatingStore, with retroactive edits.
+
+    The timeline applies matches to the store and keeps, for every match, its rows,
+    rankings, outcome, and for every player the rating right before the match and
+    the delta the match applied. A late match can then be inserted at its place in
+    time, and an applied match corrected or removed, by replaying only the suffix
+    after the edit:
+
+    1. Walking the suffix, a match is recomputed only if it is new or involves an
+       agent whose rating already differs from the stored history (the edited
+       match's players, then the players of every recomputed match). Other matches
+       keep their stored deltas and are not touched.
+    2. An agent that becomes dirty starts from its stored rating right before its
+       first recomputed match, which is still exact since the agent was unaffected
+       up to there, so no ratings before the edit have to be rebuilt.
+    3. The recomputed matches are evaluated in waves with the batch kernel directly
+       on the store's ratings, and their stored ratings and deltas are refreshed.
+
+    Work and temporary memory are proportional to the suffix after the edit, so
+    ``append`` and ``extend`` (an empty suffix) only evaluate the new matches. Every
+    agent receives its deltas in chronological order, so the final ratings are
+    identical to replaying the whole timeline with ``TESSCore.update_games_batch``
+    from the initial ratings. The timeline must be the only writer of the store's
+    ratings.
+
+    Attributes:
+        _tess (TESSCore): The rating system applying the matches.
+        _store (RatingStore): The ratings being updated.
+        _results (List[MatchResult]): The matches, in chronological order.
+        _offsets (_Column): Entry boundaries of each match (length M + 1).
+        _sizes_A (_Column): Number of team A members of each match.
+        _outcomes (_Column): Outcome value of team A of each match.
+        _members (_Column): Row of each entry (team A then team B of each match).
+        _ranks (_Column): In-team ranking of each entry.
+        _before (_Column): Rating of each entry's agent right before its match.
+        _deltas (_Column): Rating delta applied to each entry.
+
+    Methods:
+        append(match_res): Applies a new most recent match.
+        extend(matches): Applies several new most recent matches.
+        insert(position, match_res): Inserts a late match at its place in time.
+        replace(position, match_res): Corrects an applied match.
+        remove(position): Retracts an applied match.
+    """
+
+    def __init__(
+            self, 
+            tess: TESSCore, 
+            store: RatingStore = None
+    ):
+        """
+        Initializes an empty timeline over a store.
+
+        Args:
+            tess (TESSCore): The rating system applying the matches.
+            store (RatingStore, optional): The ratings to update (default: a new empty store).
+        """
+        self._tess = tess
+        self._store = RatingStore() if store is None else store
+        self._results = []
+        self._offsets = _Column(np.int64, [0])
+        self._sizes_A = _Column(np.int64)
+        self._outcomes = _Column(np.float64)
+        self._members = _Column(np.int64)
+        self._ranks = _Column(np.int64)
+        self._before = _Column(np.float64)
+        self._deltas = _Column(np.float64)
+
+    @property
+    def store(
+        self
+    ) -> RatingStore:
+        """
+        Returns the rating store.
+        """
+        return self._store
+
+    def __len__(
+            self
+    ) -> int:
+        """
+        Returns the number of matches in the timeline.
+        """
+        return len(self._results)
+
+    def __getitem__(
+            self, 
+            position: int
+    ) -> MatchResult:
+        """
+        Returns the match at a position in time.
+        """
+        return self._results[position]
+
+    def append(
+            self, 
+            match_res: MatchResult
+    ) -> None:
+        """
+        Applies a match played after every match of the timeline.
+        """
+        self.extend([match_res])
+
+    def extend(
+            self, 
+            matches: Sequence[MatchResult]
+    ) -> None:
+        """
+        Applies matches played after every match of the timeline, in chronological order.
+
+        Nothing follows them, so only the new matches are evaluated, from the store's ratings.
+        """
+        position = len(self)
+        self._splice(position, position, matches)
+        self._recompute(position, position + len(matches), [], [])
+
+    def insert(
+            self, 
+            position: int, 
+            match_res: MatchResult
+    ) -> None:
+        """
+        Inserts a late match before the match currently at ``position`` and updates all ratings.
+
+        Args:
+            position (int): Number of matches played before the late match.
+            match_res (MatchResult): The late match.
+        """
+        self._check_position(position, len(self) + 1)
+        self._splice(position, position, [match_res])
+        self._recompute(position, position + 1, [], [])
+
+    def replace(
+            self, 
+            position: int, 
+            match_res: MatchResult
+    ) -> None:
+        """
+        Replaces the match at ``position`` (e.g. corrected rankings or outcome) and updates all ratings.
+        """
+        self._check_position(position, len(self))
+        old_rows, old_before = self._match_rows(position)
+        self._splice(position, position + 1, [match_res])
+        self._recompute(position, position + 1, old_rows, old_before)
+
+    def remove(
+            self, 
+            position: int
+    ) -> None:
+        """
+        Removes the match at ``position`` and updates all ratings.
+        """
+        self._check_position(position, len(self))
+        old_rows, old_before = self._match_rows(position)
+        self._splice(position, position + 1, [])
+        self._recompute(position, position, old_rows, old_before)
+
+    def _check_position(
+            self, 
+            position: int, 
+            end: int
+    ) -> None:
+        """
+        Raises IndexError unless 0 <= position < end.
+        """
+        if not 0 <= position < end:
+            raise IndexError("timeline position out of range")
+
+    def _match_rows(
+            self, 
+            position: int
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Returns the rows of the players of the match at ``position`` and their ratings right before it.
+        """
+        offsets = self._offsets.values
+        start, stop = offsets[position], offsets[position + 1]
+
+        return self._members.values[start:stop].tolist(), self._before.values[start:stop].tolist()
+
+    def _splice(
+            self, 
+            start: int, 
+            stop: int, 
+            matches: Sequence[MatchResult]
+    ) -> None:
+        """
+        Replaces the matches [start, stop) by ``matches`` in every column (their ratings
+        and deltas are left at zero).
+        """
+        # Reject invalid matches before any agent is added
+        if any(not match_res.rankings_A or not match_res.rankings_B for match_res in matches):
+            raise ValueError("Every team in a match needs at least one member.")
+
+        if any(match_res.rankings_A.keys() & match_res.rankings_B.keys() for match_res in matches):
+            raise ValueError("An agent cannot play on both teams of a match.")
+
+        store = self._store
+        members, ranks, sizes_A, sizes = [], [], [], []
+
+        for match_res in matches:
+            for rankings in (match_res.rankings_A, match_res.rankings_B):
+                for id, rank in rankings.items():
+                    row = store.find(id)
+                    members.append(store.add(id) if row is None else row)
+                    ranks.append(rank)
+            sizes_A.append(len(match_res.rankings_A))
+            sizes.append(len(match_res.rankings_A) + len(match_res.rankings_B))
+
+        offsets = self._offsets.values
+        entry_start, entry_stop = int(offsets[start]), int(offsets[stop])
+        new_offsets = entry_start + np.cumsum(sizes, dtype=np.int64)
+        shift = entry_start + len(members) - entry_stop
+
+        self._offsets.splice(start + 1, stop + 1, new_offsets)
+        self._offsets.values[start + 1 + len(matches):] += shift
+        self._sizes_A.splice(start, stop, np.asarray(sizes_A, dtype=np.int64))
+        self._outcomes.splice(start, stop, np.asarray([m.team_A_outcome.value for m in matches], dtype=np.float64))
+        self._members.splice(entry_start, entry_stop, np.asarray(members, dtype=np.int64))
+        self._ranks.splice(entry_start, entry_stop, np.asarray(ranks, dtype=np.int64))
+        self._before.splice(entry_start, entry_stop, np.zeros(len(members), dtype=np.float64))
+        self._deltas.splice(entry_start, entry_stop, np.zeros(len(members), dtype=np.float64))
+        self._results[start:stop] = matches
+
+    def _suffix_batch(
+            self, 
+            position: int
+    ) -> MatchBatch:
+        """
+        Returns the matches from ``position`` on as a MatchBatch (views on the columns,
+        entries numbered from ``offsets[position]``).
+        """
+        offsets = self._offsets.values[position:]
+        base = offsets[0]
+        team_offsets = np.empty(2 * (len(offsets) - 1) + 1, dtype=np.int64)
+        team_offsets[0::2] = offsets - base
+        team_offsets[1::2] = offsets[:-1] - base + self._sizes_A.values[position:]
+
+        return MatchBatch(
+            self._members.values[base:], 
+            team_offsets, 
+            self._ranks.values[base:], 
+            self._outcomes.values[position:]
+        )
+
+    def _recompute(
+            self, 
+            position: int, 
+            forced_end: int, 
+            dirty_rows: List[int], 
+            dirty_ratings: List[float]
+    ) -> None:
+        """
+        Brings the stored ratings and deltas and the store's ratings in line with the
+        timeline after an edit at ``position``.
+
+        Args:
+            position (int): First match whose stored deltas may be stale.
+            forced_end (int): Matches [position, forced_end) are new and always recomputed.
+            dirty_rows (List[int]): Rows whose rating already differs from the stored history
+                at ``position`` (e.g. the players of a removed match).
+            dirty_ratings (List[float]): Rating of each dirty row right before ``position``.
+        """
+        store = self._store
+        offsets = self._offsets.values[position:]
+        base = int(offsets[0])
+        members = self._members.values[base:]
+        before = self._before.values[base:]
+        deltas = self._deltas.values[base:]
+
+        # Step 1: Walk the suffix; a match is recomputed if it is new or involves a dirty agent.
+        # Each dirty agent starts from its rating right before the edit: known for the
+        # dirty rows, otherwise the stored rating before its first old match in the suffix.
+        start_ratings = dict(zip(dirty_rows, dirty_ratings))
+        unknown = set()  # Players of new matches whose starting rating is not known yet
+        member_list = members.tolist()
+        offset_list = (offsets - base).tolist()
+        affected = []
+
+        for i in range(len(offset_list) - 1):
+            entries = range(offset_list[i], offset_list[i + 1])
+            if i < forced_end - position:
+                affected.append(i)
+                for e in entries:
+                    if member_list[e] not in start_ratings:
+                        start_ratings[member_list[e]] = None
+                        unknown.add(member_list[e])
+            elif any(member_list[e] in start_ratings for e in entries):
+                affected.append(i)
+                for e in entries:
+                    agent = member_list[e]
+                    if agent in unknown:
+                        unknown.discard(agent)
+                        start_ratings[agent] = float(before[e])
+                    elif agent not in start_ratings:
+                        start_ratings[agent] = float(before[e])
+
+        # Players of new matches without a later old match still have their rating from before the edit
+        for agent in unknown:
+            start_ratings[agent] = float(store.ratings[agent])
+
+        changed = np.fromiter(start_ratings, dtype=np.int64, count=len(start_ratings))
+        ratings = store.ratings
+        ratings[changed] = np.fromiter(start_ratings.values(), dtype=np.float64, count=len(start_ratings))
+
+        # Step 2: Recompute the affected matches in waves, from and into the store's ratings
+        affected = np.asarray(affected, dtype=np.int64)
+        if len(affected):
+            sub_batch = self._suffix_batch(position).take(affected)
+            for wave in sub_batch.waves():
+                wave_batch = sub_batch.take(wave)
+                wave_members = wave_batch.members
+                wave_deltas = batch_deltas(
+                    ratings=ratings, 
+                    batch=wave_batch, 
+                    K=self._tess.K, 
+                    alpha=self._tess.alpha, 
+                    scale=self._tess.scale
+                )
+
+                matches = affected[wave]
+                positions = _segment_positions(offsets[matches] - base, offsets[matches + 1] - offsets[matches])
+                before[positions] = ratings[wave_members]
+                deltas[positions] = wave_deltas
+                # Matches in a wave are agent-disjoint, so members are unique here.
+                ratings[wave_members] += wave_deltas
+
+        # Step 3: Publish the new ratings
+        store.notify(changed)
@@ -0,0 +1,67 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+from tess import Agent, MatchOutcome, MatchResult, Team, TESSCore
+
+
+def make_matches(
+        n_agents: int, 
+        n_matches: int, 
+        sizes=(1, 2, 3, 5, 8), 
+        seed: int = 0
+) -> List[MatchResult]:
+    """
+    Returns random matches between agents "p0" ... "p<n_agents - 1>", with shuffled in-team ranks.
+    """
+    rng = random.Random(seed)
+    outcomes = [MatchOutcome.WIN, MatchOutcome.DRAW, MatchOutcome.LOSS]
+    matches = []
+
+    for match_id in range(n_matches):
+        size_A, size_B = rng.choice(sizes), rng.choice(sizes)
+        ids = [f"p{i}" for i in rng.sample(range(n_agents), size_A + size_B)]
+        ranks_A = rng.sample(range(1, size_A + 1), size_A)
+        ranks_B = rng.sample(range(1, size_B + 1), size_B)
+        matches.append(MatchResult(
+            team_A_outcome=rng.choice(outcomes), 
+            rankings_A=dict(zip(ids[:size_A], ranks_A)), 
+            rankings_B=dict(zip(ids[size_A:], ranks_B)), 
+            match_id=match_id
+        ))
+
+    return matches
+
+
+def play_sequential(
+        tess: TESSCore, 
+        matches: List[MatchResult]
+) -> Dict[str, float]:
+    """
+    Applies the matches one by one with ``update_game`` and returns the rating of every agent.
+    """
+    agents = {}
+    for match_res in matches:
+        team_A = Team([agents.setdefault(id, Agent(id)) for id in match_res.rankings_A])
+        team_B = Team([agents.setdefault(id, Agent(id)) for id in match_res.rankings_B])
+        tess.update_game(team_A, team_B, match_res)
+
+    return {id: agent.rating for id, agent in agents.items()}
+
+
+def assert_ratings_close(
+        actual: Dict[str, float], 
+        expected: Dict[str, float]
+) -> None:
+    """
+    Asserts that two ID -> rating maps hold the same agents with equal ratings, up to rounding.
+    """
+    assert actual.keys() == expected.keys()
+    for id, rating in expected.items():
+        assert actual[id] == pytest.approx(rating, abs=1e-9), id
+
+
+@pytest.fixture
+def matches() -> List[MatchResult]:
+    return make_matches(n_agents=40, n_matches=400)
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+import pytest
+
+from tess import Agent, MatchBatch, MatchOutcome, MatchResult, MultiTeamResult, RatingStore, Team, TESSCore
+
+from conftest import assert_ratings_close, play_sequential
+
+
+def _batch_over(store, matches):
+    return MatchBatch.from_lists(
+        members_A=[[store.agent(id).index for id in m.rankings_A] for m in matches], 
+        members_B=[[store.agent(id).index for id in m.rankings_B] for m in matches], 
+        ranks_A=[list(m.rankings_A.values()) for m in matches], 
+        ranks_B=[list(m.rankings_B.values()) for m in matches], 
+        outcomes=[m.team_A_outcome.value for m in matches]
+    )
+
+
+@pytest.mark.parametrize("params", [{}, {"K": 20, "alpha": 0.4, "scale": 300}])
+def test_update_games_batch_matches_sequential(matches, params):
+    store = RatingStore()
+    batch = _batch_over(store, matches)  # Adds the agents before the ratings view is taken
+    TESSCore(**params).update_games_batch(store.ratings, batch)
+
+    ratings = {store.id_of(i): rating for i, rating in enumerate(store.ratings.tolist())}
+    assert_ratings_close(ratings, play_sequential(TESSCore(**params), matches))
+
+
+def test_waves_are_agent_disjoint_and_keep_order(matches):
+    store = RatingStore()
+    batch = _batch_over(store, matches)
+    offsets = batch.team_offsets
+
+    wave_of = np.empty(len(batch), dtype=np.int64)
+    for w, wave in enumerate(batch.waves()):
+        members = np.concatenate([batch.members[offsets[2 * i]:offsets[2 * i + 2]] for i in wave])
+        assert len(np.unique(members)) == len(members)
+        wave_of[wave] = w
+
+    last_wave = {}
+    for i in range(len(batch)):
+        for member in batch.members[offsets[2 * i]:offsets[2 * i + 2]].tolist():
+            assert wave_of[i] > last_wave.get(member, -1)
+            last_wave[member] = wave_of[i]
+
+
+def test_waves_reject_agent_listed_twice():
+    batch = MatchBatch.from_lists([[0, 1]], [[2, 0]], [[1, 2]], [[1, 2]], [1.0])
+
+    with pytest.raises(ValueError):
+        batch.waves()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 15, 16, 64])
+def test_indiv_expected_all_matches_pairwise(size):
+    rng = random.Random(size)
+    team = Team([Agent(str(i), rng.gauss(1500, 300)) for i in range(size)])
+
+    expected = [team._computE_indiv_expected(agent, 400) for agent in team.agents]
+    assert team._compute_indiv_expected_all(400) == pytest.approx(expected, abs=1e-12)
+
+
+def test_update_multi_game_with_two_teams_matches_update_game():
+    a, b, c = Agent("a", 1550), Agent("b", 1480), Agent("c", 1500)
+    x, y, z = Agent("a", 1550), Agent("b", 1480), Agent("c", 1500)
+    match_res = MatchResult(MatchOutcome.WIN, {"a": 2, "b": 1}, {"c": 1})
+
+    TESSCore().update_game(Team([a, b]), Team([c]), match_res)
+    TESSCore().update_multi_game([Team([x, y]), Team([z])], MultiTeamResult([0, 1], [{"a": 2, "b": 1}, {"c": 1}]))
+
+    assert [x.rating, y.rating, z.rating] == pytest.approx([a.rating, b.rating, c.rating], abs=1e-9)
+
+
+@pytest.mark.parametrize("teams, rankings", [
+    ([["a"], []], [{"a": 1}, {}]), 
+    ([["a"], ["b", "a"]], [{"a": 1}, {"b": 1, "a": 2}]), 
+])
+def test_update_multi_game_rejects_invalid_teams(teams, rankings):
+    agents = {}
+    teams = [Team([agents.setdefault(id, Agent(id)) for id in team]) for team in teams]
+
+    with pytest.raises(ValueError):
+        TESSCore().update_multi_game(teams, MultiTeamResult(list(range(len(teams))), rankings))
+
+    assert all(agent.rating == 1500 for agent in agents.values())
@@ -0,0 +1,51 @@
+import pytest
+
+from tess import Agent, DeltaJournal, MatchOutcome, MatchResult, Team, TESSCore
+
+from conftest import assert_ratings_close, make_matches, play_sequential
+
+
+def _play_journaled(tess, matches):
+    agents = {}
+    for match_res in matches:
+        team_A = Team([agents.setdefault(id, Agent(id)) for id in match_res.rankings_A])
+        team_B = Team([agents.setdefault(id, Agent(id)) for id in match_res.rankings_B])
+        tess.update_game(team_A, team_B, match_res)
+
+    return agents
+
+
+@pytest.mark.parametrize("undone", [0, 57, 199])
+def test_undo_matches_replay_without_the_match(undone):
+    matches = make_matches(n_agents=25, n_matches=200, seed=3)
+    tess = TESSCore()
+    journal = DeltaJournal(tess)
+    agents = _play_journaled(tess, matches)
+
+    journal.undo(undone)
+
+    expected = play_sequential(TESSCore(), matches[:undone] + matches[undone + 1:])
+    ratings = {id: agent.rating for id, agent in agents.items() if id in expected}
+    assert_ratings_close(ratings, expected)
+    assert undone not in journal and len(journal) == len(matches) - 1
+
+
+def test_undo_of_unknown_match_raises():
+    journal = DeltaJournal(TESSCore())
+
+    with pytest.raises(KeyError):
+        journal.undo(3)
+
+
+def test_duplicate_match_ids_are_renumbered():
+    tess = TESSCore()
+    journal = DeltaJournal(tess)
+    a, b = Agent("a"), Agent("b")
+
+    for match_id in (5, None, 6):
+        tess.update_game(Team([a]), Team([b]), MatchResult(MatchOutcome.WIN, {"a": 1}, {"b": 1}, match_id=match_id))
+
+    assert journal.last_match == 7
+    for match_id in (7, 6, 5):
+        journal.undo(match_id)
+    assert a.rating == pytest.approx(1500) and b.rating == pytest.approx(1500)
@@ -0,0 +1,175 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from tess import (
+    LeagueTable, MatchLogIngester, MatchLogReader, MatchLogWriter, RatingStore, TESSCore, load_snapshot, write_snapshot
+)
+from tess import snapshot
+
+from conftest import assert_ratings_close, play_sequential
+
+
+def _store_ratings(store):
+    return {store.id_of(i): rating for i, rating in enumerate(store.ratings.tolist())}
+
+
+def _write_v1_snapshot(path, ids, ratings, tess, meta):
+    """
+    Writes a version 1 snapshot (no decay state), laid out as ``write_snapshot`` did before version 2.
+    """
+    encoded = [id.encode("utf-8") for id in ids]
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    meta_offset = snapshot._HEADER_V1.size
+    ids_offset = snapshot._align(meta_offset + len(meta_bytes))
+    id_offsets = ids_offset + 8 * (len(ids) + 1) + np.concatenate(([0], np.cumsum([len(id) for id in encoded])))
+    ratings_offset = snapshot._align(int(id_offsets[-1]))
+
+    with open(path, "wb") as f:
+        f.write(snapshot._HEADER_V1.pack(
+            snapshot.SNAPSHOT_MAGIC, 1, 0, len(ids), tess.K, tess.alpha, tess.scale, 
+            meta_offset, len(meta_bytes), ids_offset, ratings_offset
+        ))
+        f.write(meta_bytes)
+        f.write(b"\0" * (ids_offset - f.tell()))
+        f.write(id_offsets.astype("<u8").tobytes())
+        f.write(b"".join(encoded))
+        f.write(b"\0" * (ratings_offset - f.tell()))
+        f.write(np.asarray(ratings, dtype="<f8").tobytes())
+
+
+def test_snapshot_round_trip(tmp_path, matches):
+    store = RatingStore()
+    tess = TESSCore(K=20, alpha=0.6, scale=300)
+    for match_res in matches:
+        tess.update_game(store.team(match_res.rankings_A), store.team(match_res.rankings_B), match_res)
+    path = str(tmp_path / "ratings.snap")
+
+    write_snapshot(path, store, tess, {"note": "é"})
+    loaded, loaded_tess, meta = load_snapshot(path)
+
+    assert meta == {"note": "é"}
+    assert (loaded_tess.K, loaded_tess.alpha, loaded_tess.scale) == (20, 0.6, 300)
+    assert _store_ratings(loaded) == _store_ratings(store)
+    assert loaded.decay_state() is None
+
+    loaded.agent("p0").update_rating(10)
+    assert load_snapshot(path)[0].agent("p0").rating == store.agent("p0").rating
+
+
+def test_snapshot_keeps_decay_state(tmp_path):
+    store = RatingStore()
+    for i, rating in enumerate([1600, 1400, 1550]):
+        store.add(f"p{i}", rating)
+    store.enable_decay(0.1, target=1500, grace_days=1)
+    store.advance_day(3)
+    store.touch([1])
+    store.advance_day(2)
+    path = str(tmp_path / "ratings.snap")
+
+    write_snapshot(path, store, TESSCore())
+    loaded, _, _ = load_snapshot(path)
+
+    for s in (store, loaded):
+        s.advance_day(4)
+        s.settle()
+    assert loaded.day == store.day
+    assert loaded.ratings.tolist() == store.ratings.tolist()
+
+
+def test_load_version_1_snapshot(tmp_path):
+    path = str(tmp_path / "v1.snap")
+    _write_v1_snapshot(path, ["a", "bé", "c"], [1510.5, 1490.0, 1500.25], TESSCore(K=16), {"offset": 3})
+
+    store, tess, meta = load_snapshot(path)
+
+    assert _store_ratings(store) == {"a": 1510.5, "bé": 1490.0, "c": 1500.25}
+    assert tess.K == 16 and meta == {"offset": 3}
+    assert store.decay_state() is None
+
+
+def test_match_log_round_trip_and_apply(tmp_path, matches):
+    path = str(tmp_path / "matches.bin")
+    with MatchLogWriter(path, chunk_size=64) as writer:
+        for match_res in matches[:250]:
+            writer.write(match_res)
+    with MatchLogWriter(path, chunk_size=64) as writer:  # Appends to the existing log
+        for match_res in matches[250:]:
+            writer.write(match_res)
+    with open(path, "ab") as f:
+        f.write(b"CHNK\x05")  # Chunk cut short by a crash
+
+    with MatchLogWriter(path):  # Truncates the incomplete chunk
+        pass
+    reader = MatchLogReader(path)
+    try:
+        registry = reader.registry()
+        for match_res, indexed in zip(matches, reader.results()):
+            restored = indexed.to_match_result(registry)
+            assert restored.team_A_outcome == match_res.team_A_outcome
+            assert restored.rankings_A == match_res.rankings_A
+            assert restored.rankings_B == match_res.rankings_B
+        assert len(reader) == len(matches)
+
+        store = reader.apply(TESSCore(), RatingStore())
+    finally:
+        reader.close()
+
+    assert_ratings_close(_store_ratings(store), play_sequential(TESSCore(), matches))
+
+
+def test_ingest_resumes_after_crash(tmp_path, matches, monkeypatch):
+    log = str(tmp_path / "matches.jsonl")
+    with open(log, "w") as f:
+        for match_res in matches:
+            f.write(json.dumps({
+                "outcome": match_res.team_A_outcome.name, 
+                "rankings_A": match_res.rankings_A, 
+                "rankings_B": match_res.rankings_B
+            }) + "\n")
+    checkpoint = str(tmp_path / "checkpoint.snap")
+
+    apply = MatchLogIngester._apply
+    calls = []
+
+    def crash_on_seventh_batch(self, pending, offset):
+        calls.append(len(pending))
+        if len(calls) == 7:
+            raise RuntimeError("crash")
+        apply(self, pending, offset)
+
+    monkeypatch.setattr(MatchLogIngester, "_apply", crash_on_seventh_batch)
+    with pytest.raises(RuntimeError):
+        MatchLogIngester(TESSCore(), checkpoint_path=checkpoint, checkpoint_every=100, batch_size=40).run(log)
+    monkeypatch.setattr(MatchLogIngester, "_apply", apply)
+
+    assert os.path.exists(checkpoint)
+    ingester = MatchLogIngester(TESSCore(), checkpoint_path=checkpoint, checkpoint_every=100, batch_size=40)
+    assert ingester.run(log) == len(matches)
+
+    assert_ratings_close(_store_ratings(ingester.store), play_sequential(TESSCore(), matches))
+
+
+def test_league_table_save_and_load(tmp_path, matches):
+    table = LeagueTable(init_rating=1200)
+    table.add_league("eu", K=24)
+    table.add_league("na", alpha=0.5, scale=300)
+    table.update_games([("eu" if i % 3 else "na", m) for i, m in enumerate(matches[:300])])
+    path = str(tmp_path / "leagues.snap")
+
+    table.save(path)
+    loaded = LeagueTable.load(path, init_rating=1200)
+
+    assert loaded.leagues == ["eu", "na"]
+    assert np.array_equal(loaded.league_column, table.league_column)
+    rest = [("eu" if i % 3 else "na", m) for i, m in enumerate(matches[300:])]
+    table.update_games(rest)
+    loaded.update_games(rest)
+    for league in ("eu", "na"):
+        assert loaded.ratings(league) == table.ratings(league)
+
+    write_snapshot(path, RatingStore(), TESSCore())
+    with pytest.raises(ValueError):
+        LeagueTable.load(path)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from tess import MatchBatch, MatchOutcome, MatchResult, MatchTimeline, RatingStore, ShardedTESS, TESSCore
+from tess.replay import replay_parallel
+
+from conftest import assert_ratings_close, make_matches, play_sequential
+
+
+def _store_ratings(store):
+    return {store.id_of(i): rating for i, rating in enumerate(store.ratings.tolist())}
+
+
+def test_replay_parallel_matches_sequential(matches):
+    store = RatingStore()
+    batch = MatchBatch.from_lists(
+        members_A=[[store.agent(id).index for id in m.rankings_A] for m in matches], 
+        members_B=[[store.agent(id).index for id in m.rankings_B] for m in matches], 
+        ranks_A=[list(m.rankings_A.values()) for m in matches], 
+        ranks_B=[list(m.rankings_B.values()) for m in matches], 
+        outcomes=[m.team_A_outcome.value for m in matches]
+    )
+    ratings = np.array(store.ratings)
+
+    replay_parallel(TESSCore(), ratings, batch, processes=2, min_parallel_wave=1)
+
+    expected = play_sequential(TESSCore(), matches)
+    assert_ratings_close({store.id_of(i): r for i, r in enumerate(ratings.tolist())}, expected)
+
+
+def test_sharded_tess_matches_sequential(matches):
+    sharded = ShardedTESS(TESSCore(), n_shards=3)
+    try:
+        sharded.update_games([(list(m.rankings_A), list(m.rankings_B), m) for m in matches[:200]])
+        for m in matches[200:220]:
+            sharded.update_game(list(m.rankings_A), list(m.rankings_B), m)
+        sharded.update_games([(list(m.rankings_A), list(m.rankings_B), m) for m in matches[220:]])
+
+        assert_ratings_close(sharded.ratings(), play_sequential(TESSCore(), matches))
+        with pytest.raises(KeyError):
+            sharded.rating("unknown")
+        assert "unknown" not in sharded.ratings()
+    finally:
+        sharded.close()
+
+
+def test_timeline_edits_match_replay_of_edited_history():
+    history = make_matches(n_agents=30, n_matches=150, seed=1)
+    late = make_matches(n_agents=30, n_matches=3, seed=2)
+    timeline = MatchTimeline(TESSCore())
+    timeline.extend(history[:100])
+    for match_res in history[100:]:
+        timeline.append(match_res)
+
+    timeline.insert(40, late[0])
+    history.insert(40, late[0])
+    timeline.replace(75, late[1])
+    history[75] = late[1]
+    timeline.remove(10)
+    del history[10]
+    timeline.insert(len(history), late[2])
+    history.append(late[2])
+
+    assert len(timeline) == len(history)
+    assert_ratings_close(_store_ratings(timeline.store), play_sequential(TESSCore(), history))
+
+
+def test_timeline_rejects_invalid_match_without_adding_agents():
+    timeline = MatchTimeline(TESSCore())
+
+    with pytest.raises(ValueError):
+        timeline.append(MatchResult(MatchOutcome.WIN, {"a": 1, "b": 2}, {"b": 1}))
+
+    assert len(timeline) == 0 and len(timeline.store) == 0
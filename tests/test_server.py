@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from tess import DeltaJournal, MatchOutcome, MatchResult, RatingServer, TESSCore
+
+from conftest import assert_ratings_close, make_matches, play_sequential
+
+
+def _serve(tess, scenario):
+    async def main():
+        server = RatingServer(tess, port=0, batch_window=0.01)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_micro_batches_match_sequential():
+    matches = make_matches(n_agents=30, n_matches=200, seed=4)
+    tess = TESSCore()
+    journal = DeltaJournal(tess)
+
+    async def scenario(server):
+        await asyncio.gather(*[server.submit(m) for m in matches])
+        return {id: server.store.agent(id).rating for id in play_sequential(TESSCore(), matches)}
+
+    assert_ratings_close(_serve(tess, scenario), play_sequential(TESSCore(), matches))
+    assert len(journal) == len(matches)
+
+
+def test_failed_batch_is_not_applied_twice():
+    calls = []
+
+    def fail_once(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise RuntimeError("subscriber failed")
+
+    async def scenario(server):
+        server.store.subscribe(fail_once)
+        match_res = MatchResult(MatchOutcome.WIN, {"a": 1}, {"b": 1})
+        with pytest.raises(RuntimeError):
+            await server.submit(match_res)
+        return server.store.agent("a").rating
+
+    assert _serve(TESSCore(), scenario) == 1516.0
+
+
+def test_invalid_match_is_rejected():
+    async def scenario(server):
+        with pytest.raises(ValueError):
+            await server.submit(MatchResult(MatchOutcome.WIN, {"a": 1, "b": 2}, {"b": 1}))
+        return len(server.store)
+
+    assert _serve(TESSCore(), scenario) == 0